@@ -0,0 +1,486 @@
+import asyncio
+import base64
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import as_completed
+from io import BytesIO
+from urllib.parse import quote
+
+import httpx
+import streamlit as st
+from PIL import Image, ImageOps
+
+from cache_anexos import obter_anexo
+
+# Bucket do Supabase Storage onde ficam os anexos dos registros
+BUCKET_ARQUIVOS = "arquivos"
+
+EXTENSOES_IMAGEM = ['.png', '.jpg', '.jpeg', '.gif', '.bmp', '.webp']
+
+# Miniaturas das imagens: arquivos/.../x.png -> miniaturas/arquivos/.../x.png.webp, no mesmo bucket
+# A imagem original só é baixada para gerar a miniatura (uma vez) ou quando o usuário pede.
+PASTA_MINIATURAS = "miniaturas"
+LADO_MINIATURA = 640
+QUALIDADE_MINIATURA = 80
+
+# Quantidade máxima de uploads simultâneos e tempo limite de cada um (em segundos)
+MAXIMO_UPLOADS_SIMULTANEOS = 4
+TEMPO_LIMITE_UPLOAD = 300
+
+# Arquivos maiores que isto são enviados em blocos pelo protocolo TUS do Storage, com retomada
+# O Supabase exige blocos de exatamente 6 MB (só o último pode ser menor).
+TAMANHO_BLOCO_RETOMAVEL = 6 * 1024 * 1024
+LIMITE_UPLOAD_SIMPLES = TAMANHO_BLOCO_RETOMAVEL
+VERSAO_TUS = "1.0.0"
+
+# Pasta dos anexos guardados pelo conteúdo: arquivos/sha256/<digest>/<nome original>
+# O mesmo arquivo enviado de novo cai na mesma pasta e não é enviado outra vez.
+PASTA_CONTEUDO = "arquivos/sha256"
+
+# Tamanho do bloco lido ao calcular o hash de um arquivo
+TAMANHO_BLOCO_HASH = 1024 * 1024
+
+# Quantidade máxima de digests já confirmados no Storage guardados no processo
+MAXIMO_BLOBS_CONHECIDOS = 10000
+
+# Loop assíncrono dos uploads, rodando numa thread própria, e clientes HTTP por (url, chave)
+# O loop e os clientes duram o processo inteiro, então as conexões são reaproveitadas entre execuções.
+loop_uploads = None
+clientes_http = {}
+trava_uploads = threading.Lock()
+
+# Digests já confirmados no Storage: digest -> caminho no bucket
+blobs_conhecidos = OrderedDict()
+trava_blobs = threading.Lock()
+
+# Função para baixar um arquivo do Supabase Storage
+# O conteúdo passa pelo cache em disco do processo, então o mesmo anexo não é baixado a cada execução.
+def baixar_arquivo(supabase, arquivo_path):
+    return obter_anexo(
+        supabase,
+        BUCKET_ARQUIVOS,
+        arquivo_path,
+        lambda: supabase.storage.from_(BUCKET_ARQUIVOS).download(arquivo_path)
+    )
+
+# Função para exibir um arquivo já baixado conforme a extensão
+# chave identifica o elemento na página (o mesmo arquivo pode aparecer em vários registros).
+def exibir_conteudo_arquivo(conteudo, arquivo_path, titulo, chave=None):
+    chave_botao = f"baixar_{chave}" if chave else None
+    extensao = os.path.splitext(arquivo_path)[1].lower()
+    nome_arquivo = os.path.basename(arquivo_path)
+
+    # Imagens
+    if extensao in EXTENSOES_IMAGEM:
+        image = Image.open(BytesIO(conteudo))
+        st.image(image, caption=titulo, use_container_width=True)
+
+    # PDFs
+    elif extensao == '.pdf':
+        st.download_button(f"📄 Baixar PDF - {titulo}", conteudo, nome_arquivo, "application/pdf", key=chave_botao)
+
+    # Planilhas
+    elif extensao in ['.xlsx', '.xls', '.csv']:
+        st.download_button(
+            f"📊 Baixar Planilha - {titulo}",
+            conteudo,
+            nome_arquivo,
+            "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+            key=chave_botao
+        )
+
+    # XML
+    elif extensao == '.xml':
+        st.download_button(f"📋 Baixar XML - {titulo}", conteudo, nome_arquivo, "application/xml", key=chave_botao)
+
+    # Outros tipos de arquivo
+    else:
+        st.download_button(f"📎 Baixar {titulo}", conteudo, nome_arquivo, "application/octet-stream", key=chave_botao)
+
+# Função para gerar a miniatura de uma imagem em WebP (ou JPEG, se o Pillow não tiver WebP)
+# Retorna (conteúdo, content-type).
+def gerar_miniatura(conteudo):
+    imagem = Image.open(BytesIO(conteudo))
+    imagem.draft("RGB", (LADO_MINIATURA, LADO_MINIATURA))  # JPEG: decodifica já reduzido
+    imagem = ImageOps.exif_transpose(imagem)
+    imagem.thumbnail((LADO_MINIATURA, LADO_MINIATURA))
+
+    saida = BytesIO()
+    try:
+        imagem.save(saida, "WEBP", quality=QUALIDADE_MINIATURA)
+        return saida.getvalue(), "image/webp"
+    except (KeyError, OSError):
+        saida = BytesIO()
+        imagem.convert("RGB").save(saida, "JPEG", quality=QUALIDADE_MINIATURA, optimize=True)
+        return saida.getvalue(), "image/jpeg"
+
+# Função para montar o caminho da miniatura de uma imagem
+def caminho_da_miniatura(arquivo_path):
+    return f"{PASTA_MINIATURAS}/{arquivo_path}.webp"
+
+# Função para obter a miniatura de uma imagem, gerando na primeira vez
+# A miniatura fica no cache em disco e no Storage; só na primeira visualização de todas
+# a imagem original é baixada, reduzida e a miniatura é guardada no bucket.
+def baixar_miniatura(supabase, arquivo_path):
+    caminho_miniatura = caminho_da_miniatura(arquivo_path)
+    armazenamento = supabase.storage.from_(BUCKET_ARQUIVOS)
+
+    def obter_ou_gerar():
+        try:
+            miniatura = armazenamento.download(caminho_miniatura)
+            if miniatura:
+                return miniatura
+        except Exception:
+            pass
+
+        original = armazenamento.download(arquivo_path)
+        if not original:
+            return None
+        miniatura, tipo_conteudo = gerar_miniatura(original)
+        try:
+            armazenamento.upload(caminho_miniatura, miniatura, {"content-type": tipo_conteudo, "upsert": "true"})
+        except Exception:
+            pass  # Sem a cópia no Storage a miniatura é gerada de novo em outro processo
+        return miniatura
+
+    return obter_anexo(supabase, BUCKET_ARQUIVOS, caminho_miniatura, obter_ou_gerar)
+
+# Função para exibir uma imagem pela miniatura, com a original só quando o usuário pedir
+# chave identifica a linha que exibe a imagem: registros com o mesmo arquivo têm chaves diferentes.
+def exibir_imagem(supabase, arquivo_path, titulo, chave=None):
+    chave = chave or f"{arquivo_path}|{titulo}"
+    if "originais_carregados" not in st.session_state:
+        st.session_state.originais_carregados = set()
+
+    if chave in st.session_state.originais_carregados:
+        exibir_conteudo_arquivo(baixar_arquivo(supabase, arquivo_path), arquivo_path, titulo, chave)
+        return
+
+    try:
+        miniatura = baixar_miniatura(supabase, arquivo_path)
+    except Exception:
+        miniatura = None  # Imagem que o Pillow não abre: cai no download do original
+
+    if miniatura:
+        st.image(miniatura, caption=titulo, use_container_width=True)
+    else:
+        st.warning(f"Pré-visualização de {titulo} indisponível.")
+    if st.button(f"🔍 Ver original - {titulo}", key=f"original_{chave}"):
+        st.session_state.originais_carregados.add(chave)
+        st.rerun()
+
+# Função para baixar e exibir um arquivo do Supabase Storage
+# Imagens aparecem pela miniatura; os demais arquivos são baixados para o botão de download.
+# chave (opcional) separa os elementos de cada linha quando o mesmo arquivo aparece mais de uma vez.
+def exibir_arquivo(supabase, arquivo_path, titulo, chave=None):
+    try:
+        if os.path.splitext(arquivo_path)[1].lower() in EXTENSOES_IMAGEM:
+            exibir_imagem(supabase, arquivo_path, titulo, chave)
+            return
+
+        conteudo = baixar_arquivo(supabase, arquivo_path)
+        if conteudo:
+            exibir_conteudo_arquivo(conteudo, arquivo_path, titulo, chave)
+        else:
+            st.warning(f"{titulo} não encontrado no armazenamento.")
+    except Exception as e:
+        st.error(f"❌ Erro ao carregar arquivo: {str(e)}")
+
+# Função para exibir um anexo só quando o usuário pedir
+# Enquanto o botão não é clicado nada é baixado; depois disso o anexo fica
+# marcado na sessão e continua visível nas próximas execuções da página.
+def exibir_arquivo_sob_demanda(supabase, arquivo_path, titulo, chave):
+    if "anexos_carregados" not in st.session_state:
+        st.session_state.anexos_carregados = set()
+
+    if chave not in st.session_state.anexos_carregados:
+        if not st.button(f"📎 Carregar {titulo}", key=f"carregar_{chave}"):
+            return
+        st.session_state.anexos_carregados.add(chave)
+
+    exibir_arquivo(supabase, arquivo_path, titulo, chave)
+
+# Função para obter o loop assíncrono dos uploads, criando a thread na primeira chamada
+def obter_loop_uploads():
+    global loop_uploads
+    with trava_uploads:
+        if loop_uploads is None:
+            loop_uploads = asyncio.new_event_loop()
+            threading.Thread(target=loop_uploads.run_forever, name="uploads-storage", daemon=True).start()
+        return loop_uploads
+
+# Função para obter o cliente HTTP assíncrono do Storage (roda dentro do loop dos uploads)
+def obter_cliente_http(url, chave_api):
+    cliente = clientes_http.get((url, chave_api))
+    if cliente is None:
+        cliente = httpx.AsyncClient(
+            base_url=f"{url.rstrip('/')}/storage/v1",
+            headers={"Authorization": f"Bearer {chave_api}", "apikey": chave_api},
+            limits=httpx.Limits(max_connections=MAXIMO_UPLOADS_SIMULTANEOS, max_keepalive_connections=MAXIMO_UPLOADS_SIMULTANEOS),
+            timeout=TEMPO_LIMITE_UPLOAD
+        )
+        clientes_http[(url, chave_api)] = cliente
+    return cliente
+
+# Função para extrair a mensagem de erro de uma resposta do Storage
+def erro_da_resposta_http(response):
+    try:
+        corpo = response.json()
+        return corpo.get("message") or corpo.get("error") or response.text
+    except Exception:
+        return response.text or f"HTTP {response.status_code}"
+
+# Função assíncrona para enviar um arquivo (retorna None ou a mensagem de erro)
+async def enviar_um_arquivo(url, chave_api, semaforo, arquivo_path, conteudo, tipo_conteudo):
+    async with semaforo:
+        try:
+            cliente = obter_cliente_http(url, chave_api)
+            response = await cliente.post(
+                f"/object/{BUCKET_ARQUIVOS}/{quote(arquivo_path)}",
+                content=conteudo,
+                headers={"Content-Type": tipo_conteudo or "application/octet-stream"}
+            )
+            if response.status_code >= 400 and not objeto_ja_existe(response):
+                return erro_da_resposta_http(response)
+            return None
+        except Exception as e:
+            return str(e)
+
+# Função para saber se o Storage recusou o envio porque o objeto já existe
+# Com os caminhos pelo conteúdo, isso quer dizer que o mesmo arquivo já foi guardado.
+def objeto_ja_existe(response):
+    if response.status_code == 409:
+        return True
+    erro = str(erro_da_resposta_http(response)).lower()
+    return "already exists" in erro or "duplicate" in erro
+
+# Função para montar o cabeçalho Upload-Metadata do TUS (pares chave valor-em-base64)
+def metadados_tus(arquivo_path, tipo_conteudo):
+    metadados = {
+        "bucketName": BUCKET_ARQUIVOS,
+        "objectName": arquivo_path,
+        "contentType": tipo_conteudo or "application/octet-stream"
+    }
+    return ",".join(f"{nome} {base64.b64encode(valor.encode('utf-8')).decode('ascii')}" for nome, valor in metadados.items())
+
+# Função assíncrona para consultar até onde um upload retomável já chegou (None se expirou)
+async def offset_upload_retomavel(cliente, upload_url):
+    response = await cliente.head(upload_url, headers={"Tus-Resumable": VERSAO_TUS})
+    if response.status_code >= 400:
+        return None
+    return int(response.headers.get("Upload-Offset", 0))
+
+# Função assíncrona para enviar um arquivo grande em blocos (retorna None ou a mensagem de erro)
+# estado guarda a URL do upload e o offset confirmado. Se o envio falhar no meio, o mesmo
+# estado passado de novo faz o envio continuar do último bloco aceito pelo Storage.
+async def enviar_arquivo_retomavel(url, chave_api, semaforo, arquivo_path, origem, tamanho, tipo_conteudo, estado):
+    async with semaforo:
+        try:
+            cliente = obter_cliente_http(url, chave_api)
+
+            offset = None
+            if estado.get("upload_url"):
+                offset = await offset_upload_retomavel(cliente, estado["upload_url"])
+
+            if offset is None:
+                # Upload novo (ou o anterior expirou no Storage)
+                response = await cliente.post(
+                    "/upload/resumable",
+                    headers={
+                        "Tus-Resumable": VERSAO_TUS,
+                        "Upload-Length": str(tamanho),
+                        "Upload-Metadata": metadados_tus(arquivo_path, tipo_conteudo),
+                        "x-upsert": "false"
+                    }
+                )
+                if objeto_ja_existe(response):
+                    return None
+                if response.status_code >= 400:
+                    return erro_da_resposta_http(response)
+                estado["upload_url"] = str(response.url.join(response.headers["Location"]))
+                offset = 0
+
+            estado["offset"] = offset
+            while offset < tamanho:
+                origem.seek(offset)
+                bloco = origem.read(TAMANHO_BLOCO_RETOMAVEL)
+                response = await cliente.patch(
+                    estado["upload_url"],
+                    content=bloco,
+                    headers={
+                        "Tus-Resumable": VERSAO_TUS,
+                        "Upload-Offset": str(offset),
+                        "Content-Type": "application/offset+octet-stream"
+                    }
+                )
+                if response.status_code >= 400:
+                    return erro_da_resposta_http(response)
+                offset = int(response.headers.get("Upload-Offset", offset + len(bloco)))
+                estado["offset"] = offset
+            return None
+        except Exception as e:
+            return str(e)
+
+# Função para obter o tamanho de um conteúdo em bytes ou de um arquivo aberto
+def tamanho_origem(origem):
+    if isinstance(origem, (bytes, bytearray)):
+        return len(origem)
+    tamanho = getattr(origem, "size", None)
+    if tamanho is None:
+        tamanho = origem.seek(0, os.SEEK_END)
+    return tamanho
+
+# Função para ler todo o conteúdo de um arquivo aberto (ou devolver os bytes recebidos)
+def ler_conteudo(origem):
+    if isinstance(origem, (bytes, bytearray)):
+        return origem
+    origem.seek(0)
+    return origem.read()
+
+# Função para escolher o modo de envio: simples para arquivos pequenos, em blocos para os grandes
+def criar_envio(url, chave_api, semaforo, arquivo_path, origem, tipo_conteudo, estado):
+    tamanho = tamanho_origem(origem)
+    if isinstance(origem, (bytes, bytearray)) or tamanho <= LIMITE_UPLOAD_SIMPLES:
+        return enviar_um_arquivo(url, chave_api, semaforo, arquivo_path, ler_conteudo(origem), tipo_conteudo)
+    return enviar_arquivo_retomavel(url, chave_api, semaforo, arquivo_path, origem, tamanho, tipo_conteudo, estado)
+
+# Função para enviar vários arquivos ao Storage ao mesmo tempo
+# envios é uma lista de (caminho no bucket, conteúdo em bytes ou arquivo aberto, content-type).
+# Arquivos abertos maiores que LIMITE_UPLOAD_SIMPLES vão em blocos, lidos direto do arquivo;
+# estados_retomada (caminho -> dicionário) guarda o progresso deles para uma nova tentativa.
+# ao_concluir(caminho, erro) é chamada na thread de quem chamou, à medida que cada envio
+# termina, para mostrar o progresso.
+# Retorna um dicionário caminho -> mensagem de erro (None quando o envio deu certo).
+def enviar_arquivos(url, chave_api, envios, ao_concluir=None, maximo_simultaneos=MAXIMO_UPLOADS_SIMULTANEOS, estados_retomada=None):
+    loop = obter_loop_uploads()
+    semaforo = asyncio.Semaphore(maximo_simultaneos)
+    estados_retomada = {} if estados_retomada is None else estados_retomada
+    futuros = {
+        asyncio.run_coroutine_threadsafe(
+            criar_envio(url, chave_api, semaforo, arquivo_path, origem, tipo_conteudo, estados_retomada.setdefault(arquivo_path, {})),
+            loop
+        ): arquivo_path
+        for arquivo_path, origem, tipo_conteudo in envios
+    }
+
+    resultados = {}
+    for futuro in as_completed(futuros):
+        arquivo_path = futuros[futuro]
+        resultados[arquivo_path] = futuro.result()
+        if ao_concluir:
+            ao_concluir(arquivo_path, resultados[arquivo_path])
+    return resultados
+
+# Função para calcular o SHA-256 de um arquivo aberto, lendo em blocos
+def calcular_digest(arquivo):
+    digest = hashlib.sha256()
+    arquivo.seek(0)
+    for bloco in iter(lambda: arquivo.read(TAMANHO_BLOCO_HASH), b""):
+        digest.update(bloco)
+    arquivo.seek(0)
+    return digest.hexdigest()
+
+# Função para montar o caminho no bucket de um arquivo guardado pelo conteúdo
+def caminho_do_blob(digest, nome_arquivo):
+    return f"{PASTA_CONTEUDO}/{digest}/{os.path.basename(nome_arquivo)}"
+
+# Função para guardar um digest já confirmado no Storage
+def registrar_blob(digest, arquivo_path):
+    with trava_blobs:
+        blobs_conhecidos[digest] = arquivo_path
+        blobs_conhecidos.move_to_end(digest)
+        while len(blobs_conhecidos) > MAXIMO_BLOBS_CONHECIDOS:
+            blobs_conhecidos.popitem(last=False)
+
+# Função assíncrona para procurar no Storage um arquivo já guardado com o digest (None se não houver)
+async def buscar_blob(url, chave_api, semaforo, digest):
+    async with semaforo:
+        try:
+            cliente = obter_cliente_http(url, chave_api)
+            response = await cliente.post(
+                f"/object/list/{BUCKET_ARQUIVOS}",
+                json={"prefix": f"{PASTA_CONTEUDO}/{digest}", "limit": 1, "offset": 0}
+            )
+            if response.status_code >= 400:
+                return None
+            for objeto in response.json():
+                if objeto.get("id"):  # Itens sem id são pastas
+                    return f"{PASTA_CONTEUDO}/{digest}/{objeto['name']}"
+            return None
+        except Exception:
+            return None
+
+# Função para descobrir quais digests já estão no Storage (digest -> caminho no bucket)
+# Os digests já confirmados neste processo nem vão ao Storage; os outros são consultados ao mesmo tempo.
+def localizar_blobs(url, chave_api, digests, maximo_simultaneos=MAXIMO_UPLOADS_SIMULTANEOS):
+    with trava_blobs:
+        encontrados = {digest: blobs_conhecidos[digest] for digest in digests if digest in blobs_conhecidos}
+
+    pendentes = [digest for digest in digests if digest not in encontrados]
+    if pendentes:
+        async def buscar_todos():
+            semaforo = asyncio.Semaphore(maximo_simultaneos)
+            return await asyncio.gather(*(buscar_blob(url, chave_api, semaforo, digest) for digest in pendentes))
+
+        caminhos = asyncio.run_coroutine_threadsafe(buscar_todos(), obter_loop_uploads()).result()
+        for digest, arquivo_path in zip(pendentes, caminhos):
+            if arquivo_path:
+                registrar_blob(digest, arquivo_path)
+                encontrados[digest] = arquivo_path
+
+    return encontrados
+
+# Função para enviar arquivos recebidos pelo st.file_uploader, guardando cada conteúdo uma vez só
+# Cada arquivo vai para arquivos/sha256/<digest>/<nome>; se o digest já está no Storage o envio
+# é pulado e o caminho existente é devolvido, e arquivos repetidos no lote são enviados uma vez.
+# O progresso dos envios em blocos fica em st.session_state.uploads_retomaveis, pelo digest:
+# ao tentar de novo o mesmo arquivo, a URL do upload é reaproveitada e o envio continua do
+# último bloco confirmado pelo Storage. ao_concluir(caminho, erro) é chamada uma vez por arquivo.
+# Retorna uma lista de (arquivo, caminho no bucket, mensagem de erro ou None), na ordem recebida.
+def enviar_uploads(url, chave_api, arquivos, ao_concluir=None):
+    if "uploads_retomaveis" not in st.session_state:
+        st.session_state.uploads_retomaveis = {}
+    retomaveis = st.session_state.uploads_retomaveis
+
+    digests = [calcular_digest(arquivo) for arquivo in arquivos]
+    existentes = localizar_blobs(url, chave_api, set(digests))
+
+    caminhos = []
+    envios = []
+    estados = {}
+    for arquivo, digest in zip(arquivos, digests):
+        arquivo_path = existentes.get(digest)
+        if arquivo_path is None:
+            estado = retomaveis.setdefault(digest, {"caminho": caminho_do_blob(digest, arquivo.name)})
+            arquivo_path = estado["caminho"]
+            if arquivo_path not in estados:
+                estados[arquivo_path] = estado
+                envios.append((arquivo_path, arquivo, arquivo.type))
+        caminhos.append(arquivo_path)
+
+    quantidade_por_caminho = {arquivo_path: caminhos.count(arquivo_path) for arquivo_path in set(caminhos)}
+
+    def concluir(arquivo_path, erro):
+        if ao_concluir:
+            for _ in range(quantidade_por_caminho[arquivo_path]):
+                ao_concluir(arquivo_path, erro)
+
+    resultados = dict.fromkeys(caminhos)
+    for arquivo_path in quantidade_por_caminho:
+        if arquivo_path not in estados:
+            concluir(arquivo_path, None)
+    if envios:
+        resultados.update(enviar_arquivos(url, chave_api, envios, concluir, estados_retomada=estados))
+
+    for digest, arquivo_path in zip(digests, caminhos):
+        if resultados[arquivo_path]:
+            # Só os envios em blocos que falharam continuam guardados para a próxima tentativa
+            if not estados[arquivo_path].get("upload_url"):
+                retomaveis.pop(digest, None)
+        else:
+            retomaveis.pop(digest, None)
+            registrar_blob(digest, arquivo_path)
+
+    return [(arquivo, arquivo_path, resultados[arquivo_path]) for arquivo, arquivo_path in zip(arquivos, caminhos)]
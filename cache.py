@@ -0,0 +1,108 @@
+import inspect
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+
+import streamlit as st
+
+# Tempo padrão (em segundos) que uma consulta fica guardada
+TTL_PADRAO = 60
+
+# Quantidade máxima de consultas guardadas; as menos usadas saem primeiro
+MAXIMO_ENTRADAS = 512
+
+# Nome do parâmetro do cliente Supabase nas funções de leitura; o cliente não entra na chave do cache,
+# para que a mesma consulta feita por outro cliente (ou por outra execução do app) aproveite o resultado.
+PARAMETRO_CLIENTE = "supabase"
+
+# Cache compartilhado pelo processo: chave -> (expira_em, tabelas, valor)
+# A chave inclui o usuário e as empresas da sessão, então cada usuário só vê as próprias consultas.
+entradas_cache = OrderedDict()
+trava_cache = threading.Lock()
+estado_local = threading.local()
+
+# Função para montar o escopo do usuário logado que entra na chave do cache
+def escopo_usuario():
+    try:
+        return (st.session_state.get("username"), st.session_state.get("empresa_ids", frozenset()))
+    except Exception:
+        return (None, ())
+
+# Função para buscar uma entrada válida no cache (retorna encontrado, valor)
+def obter_do_cache(chave):
+    with trava_cache:
+        entrada = entradas_cache.get(chave)
+        if entrada is None:
+            return False, None
+        expira_em, _, valor = entrada
+        if expira_em < time.monotonic():
+            del entradas_cache[chave]
+            return False, None
+        entradas_cache.move_to_end(chave)
+        return True, valor
+
+# Função para guardar uma entrada no cache, descartando as menos usadas se passar do limite
+def guardar_no_cache(chave, valor, tabelas, ttl=TTL_PADRAO):
+    with trava_cache:
+        entradas_cache[chave] = (time.monotonic() + ttl, frozenset(tabelas), valor)
+        entradas_cache.move_to_end(chave)
+        while len(entradas_cache) > MAXIMO_ENTRADAS:
+            entradas_cache.popitem(last=False)
+
+# Função para invalidar todas as consultas que leem alguma das tabelas informadas
+def invalidar_cache(*tabelas):
+    with trava_cache:
+        for chave in [chave for chave, (_, tabelas_entrada, _) in entradas_cache.items() if tabelas_entrada.intersection(tabelas)]:
+            del entradas_cache[chave]
+
+# Função para esvaziar o cache inteiro
+def limpar_cache():
+    with trava_cache:
+        entradas_cache.clear()
+
+# Função para impedir que o resultado da chamada em andamento seja guardado
+# As funções de leitura chamam isto nos caminhos de erro, para não guardar uma consulta que falhou.
+def nao_guardar_resultado():
+    pilha = getattr(estado_local, "pilha", None)
+    if pilha:
+        pilha[-1] = False
+
+# Função para montar a chave do cache de uma chamada, sem o cliente Supabase
+# Os parâmetros são normalizados pela assinatura, então f(a, b=1) e f(a=a) usam a mesma chave.
+def chave_da_chamada(funcao, assinatura, args, kwargs):
+    parametros = assinatura.bind(*args, **kwargs)
+    parametros.apply_defaults()
+    valores = tuple((nome, valor) for nome, valor in parametros.arguments.items() if nome != PARAMETRO_CLIENTE)
+    return (funcao.__module__, funcao.__qualname__, valores, escopo_usuario())
+
+# Decorador para guardar o resultado de uma função de leitura, por parâmetros e escopo do usuário
+# As funções de escrita chamam invalidar_cache com as mesmas tabelas.
+# O parâmetro do cliente (supabase), se a função tiver, fica fora da chave.
+def em_cache(*tabelas, ttl=TTL_PADRAO):
+    def decorador(funcao):
+        assinatura = inspect.signature(funcao)
+
+        @wraps(funcao)
+        def funcao_em_cache(*args, **kwargs):
+            try:
+                chave = chave_da_chamada(funcao, assinatura, args, kwargs)
+                encontrado, valor = obter_do_cache(chave)
+            except TypeError:  # Parâmetros inválidos ou que não podem ser chave do cache
+                return funcao(*args, **kwargs)
+            if encontrado:
+                return valor
+
+            if not hasattr(estado_local, "pilha"):
+                estado_local.pilha = []
+            estado_local.pilha.append(True)
+            try:
+                valor = funcao(*args, **kwargs)
+            finally:
+                guardar = estado_local.pilha.pop()
+
+            if guardar:
+                guardar_no_cache(chave, valor, tabelas, ttl)
+            return valor
+        return funcao_em_cache
+    return decorador
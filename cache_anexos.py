@@ -0,0 +1,158 @@
+import atexit
+import hashlib
+import os
+import shutil
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+
+# Pasta base e tamanho máximo (em bytes) do cache de anexos em disco
+DIRETORIO_BASE_CACHE = os.getenv("CACHE_ANEXOS_DIR", tempfile.gettempdir())
+MAXIMO_BYTES_CACHE = int(os.getenv("CACHE_ANEXOS_MB", "256")) * 1024 * 1024
+
+# Tempo (em segundos) em que um anexo guardado é usado sem perguntar ao Storage se mudou
+TEMPO_REVALIDACAO = 300
+
+# Caminhos cujo conteúdo nunca muda (guardados pelo hash), que não precisam ser revalidados
+PREFIXOS_IMUTAVEIS = ("arquivos/sha256/", "miniaturas/arquivos/sha256/")
+
+# Índice do cache, compartilhado pelas sessões do processo, do menos para o mais usado:
+# (bucket, caminho) -> {"versao", "arquivo", "tamanho", "validado_em"}
+indice_anexos = OrderedDict()
+bytes_em_cache = 0
+diretorio_cache = None
+estatisticas = {"acertos": 0, "faltas": 0, "revalidacoes": 0, "descartes": 0}
+trava_anexos = threading.Lock()
+
+# Função para obter a pasta do cache deste processo, criando na primeira chamada
+# Cada processo tem a sua pasta, apagada ao sair, para não sobrar arquivo sem índice.
+def obter_diretorio_cache():
+    global diretorio_cache
+    if diretorio_cache is None:
+        os.makedirs(DIRETORIO_BASE_CACHE, exist_ok=True)
+        diretorio_cache = tempfile.mkdtemp(prefix="anexos_", dir=DIRETORIO_BASE_CACHE)
+        atexit.register(shutil.rmtree, diretorio_cache, True)
+    return diretorio_cache
+
+# Função para obter a versão atual de um objeto no Storage (etag ou data de modificação)
+# Retorna None se o Storage não informar; nesse caso o anexo guardado continua valendo.
+def versao_objeto(supabase, bucket, arquivo_path):
+    try:
+        info = supabase.storage.from_(bucket).info(arquivo_path)
+    except Exception:
+        return None
+    metadados = info.get("metadata") or {}
+    return info.get("etag") or metadados.get("eTag") or info.get("last_modified") or info.get("updated_at")
+
+# Função para somar um evento nas estatísticas do cache
+def contar(evento):
+    with trava_anexos:
+        estatisticas[evento] += 1
+
+# Função para remover uma entrada do índice e o arquivo dela (chamar com a trava)
+def remover_entrada(chave):
+    global bytes_em_cache
+    entrada = indice_anexos.pop(chave, None)
+    if entrada is None:
+        return
+    bytes_em_cache -= entrada["tamanho"]
+    try:
+        os.remove(entrada["arquivo"])
+    except OSError:
+        pass
+
+# Função para ler um anexo guardado (None se o arquivo sumiu do disco)
+def ler_entrada(chave, entrada):
+    try:
+        with open(entrada["arquivo"], "rb") as arquivo:
+            return arquivo.read()
+    except OSError:
+        with trava_anexos:
+            if indice_anexos.get(chave) is entrada:
+                remover_entrada(chave)
+        return None
+
+# Função para guardar um anexo no disco, descartando os menos usados se passar do limite
+def guardar_entrada(chave, versao, conteudo):
+    global bytes_em_cache
+    if len(conteudo) > MAXIMO_BYTES_CACHE:
+        return
+
+    nome = hashlib.sha256(f"{chave[0]}/{chave[1]}\0{versao}".encode("utf-8")).hexdigest()
+    caminho = os.path.join(obter_diretorio_cache(), nome)
+
+    # Grava num temporário e renomeia, para nenhuma sessão ler um arquivo pela metade
+    descritor, temporario = tempfile.mkstemp(dir=obter_diretorio_cache())
+    with os.fdopen(descritor, "wb") as arquivo:
+        arquivo.write(conteudo)
+    os.replace(temporario, caminho)
+
+    with trava_anexos:
+        entrada_antiga = indice_anexos.pop(chave, None)
+        if entrada_antiga is not None:
+            bytes_em_cache -= entrada_antiga["tamanho"]
+            if entrada_antiga["arquivo"] != caminho:
+                try:
+                    os.remove(entrada_antiga["arquivo"])
+                except OSError:
+                    pass
+
+        indice_anexos[chave] = {"versao": versao, "arquivo": caminho, "tamanho": len(conteudo), "validado_em": time.monotonic()}
+        bytes_em_cache += len(conteudo)
+
+        while bytes_em_cache > MAXIMO_BYTES_CACHE:
+            remover_entrada(next(iter(indice_anexos)))
+            estatisticas["descartes"] += 1
+
+# Função para obter um anexo do cache em disco, baixando do Storage só quando preciso
+# baixar() é chamada na falta; anexos fora dos caminhos imutáveis são revalidados pela
+# versão (etag/data de modificação) depois de TEMPO_REVALIDACAO segundos.
+def obter_anexo(supabase, bucket, arquivo_path, baixar):
+    chave = (bucket, arquivo_path)
+    imutavel = arquivo_path.startswith(PREFIXOS_IMUTAVEIS)
+
+    with trava_anexos:
+        entrada = indice_anexos.get(chave)
+        if entrada is not None:
+            indice_anexos.move_to_end(chave)
+
+    versao = None
+    if entrada is not None:
+        valida = imutavel or time.monotonic() - entrada["validado_em"] < TEMPO_REVALIDACAO
+        if not valida:
+            contar("revalidacoes")
+            versao = versao_objeto(supabase, bucket, arquivo_path)
+            valida = versao is None or versao == entrada["versao"]
+            if valida:
+                entrada["validado_em"] = time.monotonic()
+
+        if valida:
+            conteudo = ler_entrada(chave, entrada)
+            if conteudo is not None:
+                contar("acertos")
+                return conteudo
+
+    contar("faltas")
+    if versao is None and not imutavel:
+        versao = versao_objeto(supabase, bucket, arquivo_path)
+    conteudo = baixar()
+    if conteudo:
+        guardar_entrada(chave, versao, conteudo)
+    return conteudo
+
+# Função para consultar os números do cache (para ajustar CACHE_ANEXOS_MB)
+def estatisticas_cache_anexos():
+    with trava_anexos:
+        return {
+            **estatisticas,
+            "entradas": len(indice_anexos),
+            "bytes": bytes_em_cache,
+            "maximo_bytes": MAXIMO_BYTES_CACHE
+        }
+
+# Função para esvaziar o cache de anexos
+def limpar_cache_anexos():
+    with trava_anexos:
+        for chave in list(indice_anexos):
+            remover_entrada(chave)
@@ -0,0 +1,58 @@
+from datetime import datetime
+
+from registros import erro_da_resposta
+
+# Quantidade de mensagens carregadas ao abrir o chat e a cada "mensagens anteriores"
+TAMANHO_PAGINA_CHAT = 50
+
+# Quantidade máxima de mensagens novas trazidas numa atualização
+MAXIMO_MENSAGENS_NOVAS = 200
+
+# Função para formatar a data de uma mensagem para exibição (dd/mm/aaaa hh:mm, sem o fuso)
+def formatar_data_mensagem(created_at):
+    try:
+        return datetime.fromisoformat(created_at).strftime('%d/%m/%Y %H:%M')
+    except (TypeError, ValueError):
+        return str(created_at)
+
+# Função para preparar as mensagens recebidas do Supabase
+# A data é formatada uma vez só, ao chegar, e não a cada execução da página.
+def preparar_mensagens(linhas):
+    for linha in linhas:
+        linha["data_formatada"] = formatar_data_mensagem(linha.get("created_at"))
+    return linhas
+
+# Função para buscar as mensagens mais novas que o cursor (created_at, id), da mais antiga para a mais nova
+def buscar_mensagens_novas(supabase, cursor, limite=MAXIMO_MENSAGENS_NOVAS):
+    created_at, mensagem_id = cursor
+    response = supabase.table("messages").select("*") \
+        .or_(f'created_at.gt."{created_at}",and(created_at.eq."{created_at}",id.gt.{mensagem_id})') \
+        .order("created_at").order("id").limit(limite).execute()
+
+    erro = erro_da_resposta(response)
+    if erro:
+        raise Exception(erro)
+
+    return preparar_mensagens(response.data or [])
+
+# Função para buscar uma página de mensagens mais antigas que o cursor (None = as mais recentes)
+# Retorna as mensagens da mais antiga para a mais nova e se ainda existem mensagens anteriores.
+def buscar_mensagens_antigas(supabase, cursor=None, tamanho_pagina=TAMANHO_PAGINA_CHAT):
+    query = supabase.table("messages").select("*")
+    if cursor:
+        created_at, mensagem_id = cursor
+        query = query.or_(f'created_at.lt."{created_at}",and(created_at.eq."{created_at}",id.lt.{mensagem_id})')
+
+    # Uma linha a mais só para saber se existem mensagens anteriores
+    response = query.order("created_at", desc=True).order("id", desc=True).limit(tamanho_pagina + 1).execute()
+
+    erro = erro_da_resposta(response)
+    if erro:
+        raise Exception(erro)
+
+    linhas = response.data or []
+    return preparar_mensagens(linhas[:tamanho_pagina][::-1]), len(linhas) > tamanho_pagina
+
+# Função para obter o cursor (created_at, id) de uma mensagem
+def cursor_da_mensagem(mensagem):
+    return (mensagem["created_at"], mensagem["id"])
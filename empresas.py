@@ -0,0 +1,202 @@
+import bisect
+import difflib
+import re
+import threading
+import time
+import unicodedata
+
+import streamlit as st
+
+from registros import erro_da_resposta
+
+# Tempo (em segundos) que o catálogo de empresas fica guardado no processo
+TTL_CATALOGO = 300
+
+# Quantidade de empresas lida por consulta ao carregar o catálogo
+TAMANHO_PAGINA_CATALOGO = 1000
+
+# Quantidade máxima de empresas enviadas a um seletor; acima disso o seletor pede uma busca
+LIMITE_OPCOES = 50
+
+# Semelhança mínima (0 a 1) para uma palavra digitada com erro ainda encontrar a empresa
+SEMELHANCA_MINIMA = 0.75
+
+# Catálogo de empresas compartilhado pelo processo:
+#   "por_id": {id: nome}, "por_nome": {nome: id}, "nomes": nomes em ordem alfabética,
+#   "indice": [(nome normalizado, id)] e "palavras": [(palavra normalizada, id)], ordenados para a busca,
+#   e "vocabulario": as palavras distintas, para a busca aproximada
+catalogo = None
+catalogo_carregado_em = 0
+trava_catalogo = threading.Lock()
+
+# Função para ler todas as empresas cadastradas, em páginas
+def ler_empresas(supabase):
+    empresas = []
+    inicio = 0
+    while True:
+        response = supabase.table("empresas").select("id, nome").order("id").range(inicio, inicio + TAMANHO_PAGINA_CATALOGO - 1).execute()
+        erro = erro_da_resposta(response)
+        if erro:
+            raise Exception(erro)
+        empresas.extend(response.data or [])
+        if len(response.data or []) < TAMANHO_PAGINA_CATALOGO:
+            return empresas
+        inicio += TAMANHO_PAGINA_CATALOGO
+
+# Função para normalizar um nome para a busca (maiúsculas, sem acentos e sem pontuação)
+def normalizar_nome(texto):
+    sem_acentos = unicodedata.normalize("NFKD", texto).encode("ascii", "ignore").decode("ascii")
+    return " ".join(re.sub(r"[^A-Z0-9]+", " ", sem_acentos.upper()).split())
+
+# Função para obter o catálogo de empresas, relendo do banco depois de TTL_CATALOGO segundos
+def obter_catalogo(supabase):
+    global catalogo, catalogo_carregado_em
+    with trava_catalogo:
+        if catalogo is not None and time.monotonic() - catalogo_carregado_em < TTL_CATALOGO:
+            return catalogo
+
+    empresas = ler_empresas(supabase)
+    novo_catalogo = {
+        "por_id": {empresa["id"]: empresa["nome"] for empresa in empresas},
+        "por_nome": {empresa["nome"]: empresa["id"] for empresa in empresas},
+        "nomes": sorted(empresa["nome"] for empresa in empresas),
+        "indice": sorted((normalizar_nome(empresa["nome"]), empresa["id"]) for empresa in empresas),
+        "palavras": sorted({(palavra, empresa["id"]) for empresa in empresas for palavra in normalizar_nome(empresa["nome"]).split()})
+    }
+    novo_catalogo["vocabulario"] = list(dict.fromkeys(palavra for palavra, _ in novo_catalogo["palavras"]))
+    with trava_catalogo:
+        catalogo = novo_catalogo
+        catalogo_carregado_em = time.monotonic()
+    return novo_catalogo
+
+# Função para descartar o catálogo guardado (chamar depois de cadastrar empresas)
+def invalidar_catalogo():
+    global catalogo
+    with trava_catalogo:
+        catalogo = None
+
+# Função para obter o id de uma empresa pelo nome (None se não estiver cadastrada)
+def id_da_empresa(supabase, nome):
+    return obter_catalogo(supabase)["por_nome"].get(nome)
+
+# Função para converter nomes de empresas em ids (nomes não cadastrados são ignorados)
+def ids_das_empresas(supabase, nomes):
+    por_nome = obter_catalogo(supabase)["por_nome"]
+    return [por_nome[nome] for nome in dict.fromkeys(nomes) if nome in por_nome]
+
+# Função para converter ids de empresas em nomes, em ordem alfabética
+def nomes_das_empresas(supabase, empresa_ids):
+    por_id = obter_catalogo(supabase)["por_id"]
+    return sorted(por_id[empresa_id] for empresa_id in empresa_ids if empresa_id in por_id)
+
+# Função para listar os nomes de todas as empresas cadastradas, em ordem alfabética
+def todas_as_empresas(supabase):
+    return obter_catalogo(supabase)["nomes"]
+
+# Função para listar os ids de uma lista ordenada de (chave, id) cujas chaves começam com o prefixo
+def ids_com_prefixo(lista, prefixo):
+    inicio = bisect.bisect_left(lista, (prefixo,))
+    ids = []
+    for chave, empresa_id in lista[inicio:]:
+        if not chave.startswith(prefixo):
+            break
+        ids.append(empresa_id)
+    return ids
+
+# Função para buscar empresas pelo nome, em ordem de relevância
+# Primeiro os nomes que começam com o termo, depois os que têm palavras começando com cada palavra
+# do termo e, por último, os que têm palavras parecidas (erros de digitação).
+# empresa_ids limita a busca às empresas informadas (None = catálogo inteiro). Retorna os nomes.
+def buscar_empresas(supabase, termo, empresa_ids=None, limite=LIMITE_OPCOES):
+    atual = obter_catalogo(supabase)
+    permitidas = None if empresa_ids is None else set(empresa_ids)
+    termo = normalizar_nome(termo or "")
+    if not termo:
+        nomes = atual["nomes"] if permitidas is None else nomes_das_empresas(supabase, permitidas)
+        return nomes[:limite]
+
+    encontrados = dict.fromkeys(ids_com_prefixo(atual["indice"], termo))
+
+    palavras_termo = termo.split()
+    por_palavra = [set(ids_com_prefixo(atual["palavras"], palavra)) for palavra in palavras_termo]
+    encontrados.update(dict.fromkeys(sorted(set.intersection(*por_palavra), key=atual["por_id"].get)))
+
+    if sum(1 for empresa_id in encontrados if permitidas is None or empresa_id in permitidas) < limite:
+        parecidos = []
+        for palavra, ids in zip(palavras_termo, por_palavra):
+            for parecida in difflib.get_close_matches(palavra, atual["vocabulario"], n=10, cutoff=SEMELHANCA_MINIMA):
+                ids = ids | set(ids_com_prefixo(atual["palavras"], parecida))
+            parecidos.append(ids)
+        encontrados.update(dict.fromkeys(sorted(set.intersection(*parecidos), key=atual["por_id"].get)))
+
+    nomes = [atual["por_id"][empresa_id] for empresa_id in encontrados if permitidas is None or empresa_id in permitidas]
+    return nomes[:limite]
+
+# Função para exibir um seletor de uma empresa entre as do usuário
+# Com mais de LIMITE_OPCOES empresas, só os resultados da busca vão para o navegador.
+def selecionar_empresa(supabase, rotulo, empresa_ids, chave):
+    nomes = nomes_das_empresas(supabase, empresa_ids)
+    if len(nomes) > LIMITE_OPCOES:
+        termo = st.text_input(f"Buscar {rotulo[0].lower()}{rotulo[1:]}", key=f"{chave}_busca", placeholder="Digite parte do nome (ex.: AGUIA)")
+        nomes = buscar_empresas(supabase, termo, empresa_ids)
+    return st.selectbox(rotulo, nomes, key=chave)
+
+# Função para copiar a seleção do multiselect para a chave guardada pela página (callback do widget)
+def copiar_selecao(chave_widget, chave):
+    st.session_state[chave] = list(st.session_state[chave_widget])
+
+# Função para exibir um seletor de várias empresas do catálogo, com busca
+# A seleção fica em st.session_state[chave]; as opções são as selecionadas mais os resultados da busca.
+# O multiselect usa a chave f"{chave}_selecao", então seletores com o mesmo rótulo convivem na página,
+# e a página pode trocar ou apagar st.session_state[chave] para mudar a seleção.
+# Não funciona dentro de st.form (a busca só seria aplicada ao enviar o formulário).
+def selecionar_empresas(supabase, rotulo, chave, padrao=()):
+    chave_widget = f"{chave}_selecao"
+    if chave not in st.session_state:
+        st.session_state[chave] = list(padrao)
+    st.session_state[chave_widget] = list(st.session_state[chave])
+
+    termo = st.text_input(f"Buscar {rotulo[0].lower()}{rotulo[1:]}", key=f"{chave}_busca", placeholder="Digite parte do nome (ex.: AGUIA)")
+    opcoes = list(dict.fromkeys(st.session_state[chave] + buscar_empresas(supabase, termo)))
+    st.multiselect(rotulo, opcoes, key=chave_widget, on_change=copiar_selecao, args=(chave_widget, chave))
+    return st.session_state[chave]
+
+# Função para montar o filtro de empresas das consultas agregadas
+# Retorna None quando as empresas cobrem o catálogo inteiro (sem filtro) ou a tupla de ids.
+def filtro_empresas(supabase, empresa_ids):
+    if set(empresa_ids) >= set(obter_catalogo(supabase)["por_id"]):
+        return None
+    return tuple(sorted(empresa_ids))
+
+# Função para cadastrar empresas pelo nome (as já cadastradas são ignoradas)
+def cadastrar_empresas(supabase, nomes):
+    nomes = [nome.strip() for nome in dict.fromkeys(nomes) if nome and nome.strip()]
+    if not nomes:
+        return
+    response = supabase.table("empresas").upsert([{"nome": nome} for nome in nomes], on_conflict="nome", ignore_duplicates=True).execute()
+    erro = erro_da_resposta(response)
+    if erro:
+        raise Exception(erro)
+    invalidar_catalogo()
+
+# Função para buscar os ids das empresas de um usuário
+def empresas_do_usuario(supabase, username):
+    empresa_ids = []
+    inicio = 0
+    while True:
+        response = supabase.table("usuarios_empresas").select("empresa_id").eq("username", username).range(inicio, inicio + TAMANHO_PAGINA_CATALOGO - 1).execute()
+        erro = erro_da_resposta(response)
+        if erro:
+            raise Exception(erro)
+        empresa_ids.extend(linha["empresa_id"] for linha in response.data or [])
+        if len(response.data or []) < TAMANHO_PAGINA_CATALOGO:
+            return empresa_ids
+        inicio += TAMANHO_PAGINA_CATALOGO
+
+# Função para definir as empresas de um usuário (função definir_empresas_usuario no Postgres)
+# Remove as que saíram e inclui as novas num único comando, sem listar ids na URL.
+def definir_empresas_usuario(supabase, username, empresa_ids):
+    response = supabase.rpc("definir_empresas_usuario", {"p_username": username, "p_empresa_ids": list(empresa_ids)}).execute()
+    erro = erro_da_resposta(response)
+    if erro:
+        raise Exception(erro)
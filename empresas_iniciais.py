@@ -0,0 +1,3 @@
+# Lista inicial de empresas, usada só para semear a tabela empresas de um banco novo
+# (comando "python inicializacao.py" no deploy). Depois disso as empresas são mantidas no banco.
+lista_empresas = ["2B COMBUSTIVEL LTDA", "A REDE GESTAO PATRIMONIAL LTDA", "A.M CHEQUER IMOVEIS LTDA", "A.R. PARTICIPACOES LTDA", "ABEL CONSTRUTORA LTDA", "ABEL SEMINOVOS LTDA", "ACOLOG LOGISTICA LTDA", "ACOS SERVICOS DE PROMOCAO LTDA", "ACR GESTAO PATRIMONIAL LTDA", "ADCAR SERVICO DE ESCRITORIO E APOIO ADMINISTRATIVO LTDA", "ADR MOBILIDADE E SERVICOS LTDA", "ADS COMERCIO E IMPORTACAO E EXPORTACAO EIRELI", "AESA PARTICIPAÇÕES LTDA", "AGM ESQUADRIAS LTDA", "AGP03 EMPREENDIMENTOS IMOBILIARIOS SPE LTDA", "AGP03 EMPREENDIMENTOS IMOBILIARIOS SPE LTDA FILIAL 02-82", "AGP03 EMPREENDIMENTOS IMOBILIARIOS SPE LTDA SCP RESIDENCIAL CAPARAO", "AGP05 ARGON EMPREENDIMENTOS IMOBILIARIOS SPE LTDA", "AGROPECUARIA BONANZA LTDA", "AGT01 MORADA NOVA DE MINAS SPE LTDA", "AGT01 MORADA NOVA DE MINAS SPE LTDA FILIAL 02-52", "AGUIA 8 COMERCIO DE COMBUSTIVEIS LTDA", "AGUIA IV COMERCIO DE COMBUSTIVEIS LTDA", "AGUIA IX COMERCIO DE COMBUSTIVEIS LTDA", "AGUIA V COMERCIO DE COMBUSTIVEIS LTDA", "ALLOTECH CONSULTORIA EM PRODUCAO INDUSTRIAL LTDA", "ALVES E SANTOS PARTICIPACOES LTDA", "AMH COMERCIO E SERVICOS LTDA", "AML HOLDING S/A", "AMMC PARTICIPACOES LTDA", "AMPLUS PARTICIPACOES SA", "AMX GESTÃO PATRIMONIAL LTDA", "ANF EMPREENDIMENTOS E PARTICIPACOES LTDA", "ANITA CHEQUER PARTICIPACOES LTDA", "ANITA CHEQUER PATRIMONIAL LTDA", "APL ADMINISTRACAO E PARTICIPACOES LTDA", "APMG PARTICIPACOES S/A", "ARCI PARTICIPACOES LTDA", "ARCI PATRIMONIAL LTDA", "ARGON ENGENHARIA LTDA", "ARNDT PATRIMONIAL LTDA", "ARNDT REFORMAS E MANUTENCOES LTDA", "ARNDT, TRAVASSOS E MORRISON SPE LTDA", "ARTMIX HOLDING LTDA", "AUMAR PRESTACAO DE SERVICOS ADMINISTRATIVOS LTDA", "AUTO POSTO ALELUIA LTDA", "AUTO POSTO ALELUIA LTDA FILIAL 02-46", "AUTO POSTO CENTENARIO LTDA", "AUTO POSTO DAS LAJES LTDA", "AUTO POSTO DOM BOSCO LTDA", "AUTO POSTO MAQUINE LTDA", "AUTO POSTO MARIO CAMPOS COMERCIO DE COMBUSTIVEIS LTDA", "AUTO POSTO PORTAL DO NORTE LTDA", "AUTO POSTO VERONA LTDA", "AUTOREDE LOCADORA DE VEICULOS LTDA", "AUTOREDE PARTICIPACOES LTDA", "AXJ PARTICIPACOES EIRELI", "AXP GESTAO PATRIMONIAL LTDA", "AZEVEDO & CIA", "BARAO VPP CONVENIENCIAS LTDA", "BARTELS DERMATOLOGIA ESTETICA E LASER LTDA", "BEL DISTRIBUIDOR DE LUBRIFICANTES LTDA", "BEL DISTRIBUIDOR DE LUBRIFICANTES LTDA FILIAL 02-79", "BEL LUBRIFICANTES ESPECIAIS LTDA", "BELTMORE PARTICIPACOES LTDA", "BEMX - PARTICIPACOES E EMPREENDIMENTOS LTDA", "BIOCLINTECH CIENTIFICA LTDA", "BIOCLINTECH LTDA", "BIOCLINTECH MANUTENCAO LTDA", "BLUE SKY PARTICIPACOES LTDA", "BMC EDITORA LTDA", "BMGL PARTICIPACOES E EMPREENDIMENTOS IMOBILIARIOS LTDA", "BOA VISTA ASSESSORIA LTDA", "BOA VISTA BOCAIUVA HOTEL LTDA", "BORA EMBALAGENS LTDA", "BRANT EMPREENDIMENTOS LTDA", "BRASIL CONCRETO LTDA", "BRAZIL MANIA LTDA", "BRB TRANSPORTES LTDA", "BRM COMERCIO DE VEICULOS LTDA", "BRM COMERCIO DE VEICULOS LTDA FILIAL 02-24", "BROMELIAS GESTAO PATRIMONIAL LTDA", "BURITIS CONVENIENCIA LTDA", "BV DISTRIBUIDORA LTDA", "CAD COMERCIAL DE MAQUINAS LTDA", "CAMPO ALEGRE PARTICIPACOES LTDA", "CAPITAO COMERCIO DE COMBUSTIVEIS LTDA", "CASA NOVA SPE LTDA", "CASA SEMPRE VIVA COMERCIO DE MATERIAIS DE CONSTRUCAO LTDA", "CASCALHO PARTICIPACOES LTDA", "CATIRA INTERMEDIACOES DE NEGOCIOS LTDA", "CCA COMERCIAL DE COMBUSTIVEIS AUTOMOTIVOS LTDA", "CDI NUCLEAR LTDA", "CDVM LTDA", "CELT -COMERCIO DE COMBUSTIVEIS E LUBRIFICANTES LTDA", "CENTER POSTO LTDA", "CENTER POSTO LTDA FILIAL 02-12", "CENTRO DE DIAGNOSTICO POR IMAGEM LTDA", "CENTRO DE DIAGNOSTICO POR IMAGEM LTDA FILIAL 02-49", "CENTRO DE DIAGNOSTICO POR IMAGEM LTDA FILIAL 04-00", "CENTRO DE DIAGNOSTICO POR IMAGEM LTDA FILIAL 05-91", "CENTRO DE DIAGNOSTICO POR IMAGEM LTDA FILIAL 07-53", "CENTRO DE DIAGNOSTICO POR IMAGEM LTDA FILIAL 09-15", "CENTRO DE DIAGNOSTICO POR IMAGEM LTDA FILIAL 10-59", "CENTRO DE DIAGNOSTICO POR IMAGEM LTDA FILIAL 11-30", "CENTRO DE DIAGNOSTICO POR IMAGEM LTDA FILIAL 14-82", "CENTRO DE DIAGNOSTICO POR IMAGEM LTDA FILIAL 17-25", "CENTRO DE DIAGNOSTICO POR IMAGEM LTDA FILIAL 19-97", "CENTRO DE DIAGNOSTICO POR IMAGEM LTDA FILIAL 20-20", "CGA SERVICOS MEDICOS LTDA", "CGI - EMPREENDIMENTOS COMERCIAL LTDA", "CHAVE DE OURO EMPREENDIMENTOS IMOBILIARIOS EIRELI", "CHEL LTDA", "CHEQUER & COELHO LTDA", "CIA ITABIRITO INDUSTRIAL FIACAO E TECELAGEM DE ALGODAO", "CIAZA CONSTRUTORA LTDA", "CLAM CONSULTORIA LTDA", "CLAM ENGENHARIA LTDA", "CLAM ENGENHARIA LTDA FILIAL 03-00", "CLAM ESG LTDA", "CLAM MEIO AMBIENTE LTDA", "CLAM MEIO AMBIENTE LTDA FILIAL 02-49", "CLAM MONITORAMENTO AMBIENTAL LTDA", "CLAM MONITORAMENTO AMBIENTAL LTDA", "CLAM PARTICIPACOES E INVESTIMENTOS S/A", "CLINICA LEV SAVASSI LTDA", "CLINICA RADIOLOGICA ELDORADO LTDA", "CLINICA UNIAO SERVICOS MEDICOS LTDA", "COELHO CONVENIENCIA LTDA", "COELHO E PEREIRA EIRELI", "COLISEU SERVICOS ADMINISTRATIVOS LTDA", "COMERCIAL AVIAMENTOS LTDA", "COMERCIAL FOCCUS LTDA", "COMERCIAL GIULIANO LIMITADA", "COMERCIAL OLIVEIRA & BRANT LTDA", "COMERCIAL OLIVEIRA & BRANT LTDA", "COMERCIO LANCHE KARRAO LTDA", "CONSORCIO ENGEBRAS ILCON SES 0620240094", "CONSORCIO GERASUN SOLAR", "CONSTANTINO MATIAS NOGUEIRA - IMOVEIS", "CONSTANTINO MATIAS NOGUEIRA - PATRIMONIAL LTDA", "CONSTRUTORA AGMAR LTDA", "CONSTRUTORA AGMAR LTDA 07", "CONSTRUTORA AGMAR LTDA FILIAL 02-10", "CONSTRUTORA E INCORPORADORA SPLIT LTDA", "CONTABILIDADE LTDA", "CONVENIENCIA DOIS IRMAOS - EIRELI", "CONVENIENCIA DOIS IRMAOS LTDA", "CORRETORA DE SEGUROS BELO HORIZONTE LTDA", "CRISTAL VALLE ADMINISTRACAO LTDA", "CRISTAL VALLE INDUSTRIA E COMERCIO DE VIDROS LTDA", "CSV GESTAO PATRIMONIAL LTDA", "CVQ I SPE LTDA", "CVQ II SPE LTDA", "D.L.A. SERVICOS ADMINISTRATIVOS LTDA", "DEBURR COMERCIO DE COSMETICOS LTDA", "DEL PAPEIS LTDA", "DEL PAPEIS LTDA FILIAL 03-84", "DELMA - COMERCIO DE COMBUSTIVEIS LTDA", "DH ORIGINAL IMPORTACAO E EXPORTACAO LTDA", "DISTRIBUIDORA BIOCLIN DIAGNOSTICA LTDA", "DJB PARTICIPACOES LTDA", "DOBRAFLEX CORTE E DOBRA DE METAIS LTDA", "DVS PARTICIPACOES LTDA", "E.D. TECNOLOGIA DIGITAL BH LTDA", "EAGLE ADMINISTRACAO LTDA", "EDIFICIO REDE OFFICE I", "ELETROFERRAGENS RM EIRELI", "EMAG CONSTRUTORA LTDA", "EMAG CONSTRUTORA LTDA", "EMIS MINAS DISTRIBUIDORA DE PRODUTOS FARMACEUTICOS LTDA", "EMP - AVALIACAO EM RECURSOS HUMANOS LTDA", "EMPIRE DJB PATRIMONIAL LTDA", "ENERGY TRANSPORTES LTDA", "ENGEBRAS CONSTRUTORA LTDA", "ESMIG INDUSTRIA DE ESCADAS LTDA", "ESMIG INDUSTRIA DE ESCADAS LTDA FILIAL 03-89", "ESTACIONAMENTO AGMAR LTDA", "ESTACIONAMENTO AGMAR LTDA FILIAL 02-06", "ESTACIONAMENTO AGMAR LTDA FILIAL 03-89", "ESTACIONAMENTO AGMAR LTDA FILIAL 04-60", "ESTIVA PARTICIPACOES LTDA","EAT FRUTZ ALIMENTOS LTDA" , "EVELINE DE PAULA BARTELS", "EVERYBODY - CENTRO DE PERFORMANCE E FISIOTERAPIA LTDA", "EVOLUTION CONSULTORIA E GESTAO EMPRESARIAL S/A", "EXPRESSO FERRENSE LTDA", "FAST GESTAO DE RECURSOS LTDA", "FAST TEAM SERVICOS DE ESTETICA AUTOMOTIVA LTDA", "FASTPLOT SERVICOS DE ESTETICA AUTOMOTIVA LTDA", "FATIMA ADMINISTRACAO LTDA", "FCF CONSULTORIA LTDA", "FCK PREMOLDADOS LTDA FILIAL 02", "FCK PREMOLDADOS LTDA FILIAL 03", "FCK PREMOLDADOS LTDA", "FCK TRANSPORTES LTDA", "FEAG - FERRAGENS AGMAR PARA FACHADA EIRELI", "FERREIRA ADMINISTRACAO LTDA", "FERRO E ACO TAKONO LTDA", "FERRO E ACO TAKONO LTDA FILIAL 0028-03", "FERRO E ACO TAKONO LTDA FILIAL 06-06", "FERRO E ACO TAKONO LTDA FILIAL 07-89", "FERRO E ACO TAKONO LTDA FILIAL 08-60", "FERRO E ACO TAKONO LTDA FILIAL 10-84", "FERRO E ACO TAKONO LTDA FILIAL 11-65", "FERRO E ACO TAKONO LTDA FILIAL 12-46", "FERRO E ACO TAKONO LTDA FILIAL 13-27", "FERRO E ACO TAKONO LTDA FILIAL 14-08", "FERRO E ACO TAKONO LTDA FILIAL 15-99", "FERRO E ACO TAKONO LTDA FILIAL 16-70", "FERRO E ACO TAKONO LTDA FILIAL 18-31", "FERRO E ACO TAKONO LTDA FILIAL 19-12", "FERRO E ACO TAKONO LTDA FILIAL 20-56", "FERRO E ACO TAKONO LTDA FILIAL 21-37", "FERRO E ACO TAKONO LTDA FILIAL 22-18", "FERRO E ACO TAKONO LTDA FILIAL 23-07", "FERRO E ACO TAKONO LTDA FILIAL 24-80", "FERRO E ACO TAKONO LTDA FILIAL 25-60", "FERRO E ACO TAKONO LTDA FILIAL 26-41", "FERRO E ACO TAKONO LTDA FILIAL 27-22", "FIX MANUTENCAO PREDIAL LTDA", "FIX MANUTENCOES LTDA", "FLARA GESTAO PATRIMONIAL LTDA", "FMPL PARTICIPACOES LTDA", "FORTRESS GESTAO PARTICIPACOES LTDA", "FRADE PARTICIPACOES LTDA", "FS PROCESSAMENTO DE DADOS LTDA", "GAMA SERV LTDA", "GECORP GESTAO DE BENEFICIOS E CORRETORA DE SEGUROS LTDA", "GENETICENTER - CENTRO DE GENETICA LTDA", "GERTH CONSULTORIA E PROMOCOES DE VENDAS LTDA", "GFF ENGENHARIA LTDA", "GIBRALTAR HOLDING LTDA", "GIOVANNI CARLECH GUIMARAES MARQUEZANI", "GMAC ESTACIONAMENTOS LTDA", "GMB ASSESSORIA LTDA", "GNV SETE BELO LTDA", "GPK PARTICIPACOES LTDA", "GR COMBUSTIVEIS LTDA", "GRB INDUSTRIA E COMERCIO DE EQUIPAMENTOS LTDA", "GRB INDUSTRIA E COMERCIO DE EQUIPAMENTOS LTDA FILIAL 03-50", "GRB INDUSTRIA E COMERCIO DE EQUIPAMENTOS LTDA FILIAL 04-31", "GRB INDUSTRIA E COMERCIO DE EQUIPAMENTOS LTDA FILIAL 05-12", "GROUND GESTAO PATRIMONIAL LTDA", "GSC GESTAO PATRIMONIAL LTDA", "GUIMARAES & VIEIRA DE MELLO SOCIEDADE DE ADVOGADOS", "GUIMARAES E VIEIRA DE MELLO ADVOGADOS", "GVM ADMINISTRACAO E CONSULTORIA LTDA", "GVM CONSORCIO", "GVM CORRETORA DE SEGUROS LTDA", "GWS ENGENHARIA LTDA", "GWS TECH LTDA", "H.C.-COMERCIO DE ALIMENTOS LTDA 04", "H.C.-COMERCIO DE ALIMENTOS LTDA 05", "HAND SHOP SUPRIMENTOS MEDICOS E TERAPEUTICOS LTDA", "HC COMERCIO DE ALIMENTOS LTDA", "HC COMERCIO DE ALIMENTOS LTDA FILIAL 03-63", "HOLDING MAIS MABC LTDA", "HOTEL SAO BENTO LTDA", "HPX PARTICIPACOES LTDA", "HSP GESTAO PATRIMONIAL LTDA", "HVAR INCORPORACOES LTDA", "I9 GESTAO E PARTICIPACOES LTDA", "IB COMBUSTIVEL LTDA", "IB TRANSPORTES & EMPREENDIMENTOS LTDA", "INCONFIDENTES PARTICIPACOES LTDA", "INCORPORADORA MONTE VERDE SPE LTDA", "INDUSTRIA DE TRANSFORMADORES KING LIMITADA", "INFLUXO SOCIEDADE DE PROFISSIONAIS", "INSTITUTO PERSONA INTELIGENCIA EMOCIONAL LTDA", "INTERWEG ADM E CORRETORA DE SEGUROS LTDA", "INTERWEG CORRETORA DE SEGUROS E BENEFICIOS LTDA", "J.V.V. GESTAO PATRIMONIAL LTDA", "JACL PARTICIPACOES LTDA", "JARDINO MALL LTDA", "JCA SERVICOS DE RADIOLOGIA LTDA", "JCM PARTICIPACOES LTDA", "JHCL GESTAO PATRIMONIAL LTDA", "JJA LOCACOES LTDA", "JKV GESTAO PATRIMONIAL LTDA", "JPAMACEDO E PARTICIPACOES LTDA", "JR LAVA JATO EIRELI", "JVC PARTICIPACOES LTDA", "JVP GESTAO PATRIMONIAL LTDA", "K10 PARTICIPACOES LTDA", "KALAB LOPES GESTAO PATRIMONIAL LTDA", "KALAB NEGOCIOS IMOBILIARIOS LTDA", "L.O. IMPORT EXPORT LTDA", "LABORATORIO DE PATOLOGIA CIRURGICA E CITOPATOLOGIA LTDA", "LABORATORIO DE PATOLOGIA CIRURGICA E CITOPATOLOGIA LTDA FILIAL 03-44", "LETOM EMPREENDIMENTOS LTDA", "LGX - PARTICIPACOES E ADMINISTRACAO LTDA", "LINK INDUSTRIA E COMERCIO DE MAQUINAS PARA MINERACAO LTDA", "LINK INDUSTRIA E COMERCIO DE MAQUINAS PARA MINERACAO LTDA FILIAL 03-05", "LOCS LOCADORA DE VEICULOS LTDA", "LS ENTERPRISE SOLLUTIONS LTDA", "M A B COSTA LTDA", "M L SILVEIRA SERVICOS CORPORATIVOS EIRELI", "MADA CLINICA ODONTOLOGICA LTDA", "MAIS CONSTRUCOES LTDA", "MAIS NEGOCIOS E REPRESENTACOES LTDA", "MAQUINAS RABELLO ITABAYANA LIMITADA", "MAR UP CONSULTORIA GESTAO E REPRESENTACAO COMERCIAL LTDA", "MAR9 TRATAMENTO DE DADOS LTDA", "MARCHALENTA AUTO SERVICOS LTDA", "MARCHALIVRE SERVICOS E PECAS LTDA", "MARCO GRILLI COMERCIO DE OBJETOS DE ARTE LTDA", "MARIA CHEQUER PARTICIPACOES LTDA", "MARIA CHEQUER PATRIMONIAL LTDA", "MARIANA CARLECH GUIMARAES MARQUEZANI", "MARICABI GESTAO PATRIMONIAL LTDA", "MASSIME DISTRIBUIDORA DE MEDICAMENTOS LTDA", "MASTER AUTO POSTO LTDA", "MASTER EMPREENDIMENTOS E PARTICIPACOES LTDA", "MASTER PISOS MATERIAL DE CONSTRUCAO EIRELI", "MATTA NUNES REPRESENTACOES COMERCIAIS E GESTAO DE NEGOCIOS LTDA", "MAX GESTAO PATRIMONIAL LTDA", "MD EMPREENDIMENTOS S.A", "MEDWAY SOLUCOES PARA A SAUDE LTDA", "MENDONCA E FERREIRA PARTICIPACOES LTDA", "MENDONCA E FERREIRA PATRIMONIAL LTDA", "MENDONCA E FILHOS GESTAO PATRIMONIAL LTDA", "MENDONCA PARTICIPACOES LTDA", "MEROS GESTAO PATRIMONIAL LTDA", "MG CONVENIENCIA LTDA", "MG CONVENIENCIA LTDA FILIAL 02-57", "MICRONIC COMERCIO E INDUSTRIA LTDA", "MILENE GUIMARAES MARQUEZANI", "MINAS GERAIS ADMINISTRADORA DE IMOVEIS LTDA", "MINEIRAO POSTO DE SERVICOS LTDA", "MLM HOLDING EIRELI", "MM COMERCIO DE DERIVADOS DE PETROLEO LTDA", "MMORAES PARTICIPACOES LTDA", "MONTE VERDE EDIFICACOES I SPE LTDA", "MONTE VERDE URBANIZACOES SPE LTDA", "MP INCORPORACOES LTDA", "MRI MOVIMENTACAO E RECUPERACAO INDUSTRIAL LTDA", "MRLIZ CONSULTORIA LTDA", "MTL PARTICIPACOES LTDA", "MULT SERVICOS ADMINISTRATIVOS LTDA", "MWA PARTICIPACOES LTDA", "MWA PATRIMONIAL LTDA", "NACIONAL RENOVAVEIS LTDA", "NATUREZA X COMERCIO LTDA", "NOSSA OBRA VAREJO DIGITAL LTDA", "NRSM REFORMAS LTDA", "NVB SERVICOS LTDA", "OLE PARTICIPACOES LTDA", "OLIVEIRA SANTOS ADVOGADOS", "OPEN-5 LTDA", "OPEN-5 LTDA 02", "OPX PARTICIPACOES LTDA", "ORGANIZACAO COMERCIAL MARINHO LTDA", "ORGANIZACOES SOUKI EIRELI", "ORGANIZACOES SOUKI EIRELI FILIAL 03-32", "ORIENT AUTOMOVEIS PECAS E SERVICOS LTDA", "ORIENT AUTOMOVEIS PECAS E SERVICOS LTDA FILIAL 03-43", "ORIENT AUTOMOVEIS PECAS E SERVICOS LTDA FILIAL 04-24", "ORIENTE FARMACEUTICA COMERCIO IMPORTACAO E EXPORTACAO LTDA", "PADUA COMERCIO E INDUSTRIA LTDA", "PAIVA BRANT LTDA", "PAIVA EMPREENDIMENTOS E GESTAO DE IMOVEIS PROPRIOS LTDA", "PCFORYOU LTDA", "PEMAX INTERMEDIACAO E NEGOCIOS LTDA", "PERFORMANCE GESTAO EMPRESARIAL LTDA", "PETRODATA PROCESSAMENTO DE DADOS LTDA", "PLATAFORMA AM3 LTDA", "PNEUS JUA COMERCIO DE PNEUS LTDA", "PONTUAUTO CENTRO AUTOMOTIVO LTDA", "POP EMPREENDIMENTOS E PARTICIPACOES S/A", "POSTO AEROPORTO LTDA", "POSTO AGUIA COMERCIO DE COMBUSTIVEIS LTDA", "POSTO ALAMO LTDA", "POSTO ALLGAS LTDA", "POSTO AVENIDA BRASIL COMERCIO DE COMBUSTIVEIS LTDA", "POSTO BALNEARIO AGUA LIMPA LTDA", "POSTO BARAO VPP LTDA", "POSTO BERIMBAU LTDA", "POSTO BURITIS LTDA", "POSTO CATEDRAL LTDA", "POSTO CENTER NORTE LTDA", "POSTO COELHO LTDA", "POSTO DANUBIO LTDA", "POSTO DE COMBUSTIVEIS CENTER SUL LTDA", "POSTO DE COMBUSTIVEIS SANTO AGOSTINHO LTDA", "POSTO DE COMBUSTIVEL PETROLANDIA LTDA", "POSTO DE COMBUSTIVEL VILA CRUZEIRO LIMITADA", "POSTO ESTORIL LTDA", "POSTO FORMULA BR LTDA", "POSTO HUGO WERNECK LTDA", "POSTO IPE COMERCIO DE COMBUSTIVEIS LTDA", "POSTO IRMAOS AULER LTDA", "POSTO JUPITER LTDA", "POSTO LESTE LTDA", "POSTO MARIO WERNECK LIMITADA", "POSTO MAURITANIA LTDA", "POSTO MINAS SHOPPING LTDA", "POSTO MINASLANDIA LTDA", "POSTO MONTE VERDE LTDA", "POSTO MUSTANG LTDA", "POSTO NOGUEIRINHA LTDA", "POSTO OCEANO AZUL LTDA", "POSTO OCEANO LTDA", "POSTO PANAMERA LTDA", "POSTO PARQUE BURITIS LTDA", "POSTO PARQUE JARDIM LTDA", "POSTO PICA PAU LTDA", "POSTO POETA LTDA", "POSTO PORTAL DE BETIM LTDA", "POSTO PORTAL DE CONTAGEM LTDA", "POSTO PORTAL DOS CAICARAS LTDA", "POSTO SIGMA LTDA", "POSTO SOBERANO AUTORAMA LTDA", "POSTO SOBERANO KARRAO LTDA", "POSTO SOBERANO SETE DE SETEMBRO LTDA", "POSTO TATIANA LTDA", "POSTO TROVAO LTDA", "POSTO VIA FERNAO DIAS LTDA", "POSTO VILA CHALE LTDA", "POSTO VILA DA SERRA LTDA", "POSTO VILA PICA PAU LTDA", "POSTO ZEPPE GRAND PRIX LTDA", "POSTO ZEPPE MG LTDA", "POSTO ZEPPE OASIS LTDA", "POSTO ZEPPE SAO JOSE LTDA", "POSTO ZEPPELIN LTDA", "PPML INDUSTRIA E COMERCIO DE ROUPAS EIRELI", "PRESERVAR PARTICIPACOES LTDA", "PRIMA LINEA AUTOMOVEIS LTDA", "PRIMOLA FRAGRANCIAS LTDA FILIAL 04-30", "PROFIT FOODS LTDA", "PROJETOUM COMERCIO E REPRESENTACOES LTDA", "PROJETOUM COMERCIO E REPRESENTACOES LTDA FILIAL 0002-27", "PROPELLER LTDA", "PROSERVICE LTDA", "PROSPECTIVA SOCIEDADE DE PROFISSIONAIS", "PURA SAUDE ALIMENTOS LTDA", "PURA SAUDE ALIMENTOS LTDA FILIAL 02-88", "QUADRIJET ALPHAVILLE COMERCIO LTDA", "QUEOPZ GESTAO PATRIMONIAL LTDA", "QUIBASA QUIMICA BASICA LTDA", "QUIBASA QUIMICA BASICA LTDA FILIAL 02-98", "QUIBASA QUIMICA BASICA LTDA FILIAL 03-79", "QUICK CONVENIENCIAS LTDA", "QUICK LUBE COMERCIO DE PRODUTOS E FRANQUIAS LTDA", "RACCO EQUIPAMENTOS E SERVICOS EIRELI", "RACCO SERVICOS DE PUBLICIDADE E COMUNICACAO LTDA", "RC INVEST PARTICIPACOES LTDA", "RECICLAGEM PASSARELA LTDA", "REDE A PUBLICIDADE E PROPAGANDA LTDA", "REDE OFFICE INCORPORACOES LTDA", "RESIDENCIAL ANDORINHAS SPE LTDA", "RESIDENCIAL PACIFICO RIBEIRAO DAS NEVES SPE LTDA", "RESIDENCIAL PACIFICO RIBEIRAO DAS NEVES SPE LTDA FILIAL 02-72", "RESIDENCIAL VILA AMAZONAS SPE LTDA","RESIDENCIAL VILA AMAZONAS SPE LTDA FILIAL 02-91", "RESIDENCIAL VILA ATLANTICO SABARA SPE LTDA", "RESIDENCIAL VILA ATLANTICO SABARA SPE LTDA", "RESIDENCIAL VILA CONCEICAO SPE LTDA", "RESIDENCIAL VILA CONCEICAO SPE LTDA FILIAL 02-01", "RESIDENCIAL VILA MORGANTI I SCP", "RESIDENCIAL VILA MORGANTI I SPE LTDA", "RESIDENCIAL VILA MORGANTI I SPE LTDA FILIAL 02-05", "RESIDENCIAL VILA SAO JOSE I SPE LTDA", "RESIDENCIAL VILA SAO JOSE I SPE LTDA FILIAL 02-64", "RESIDENCIAL VILA SAO JOSE II SPE LTDA", "RESIDENCIAL VILA SAO JOSE II SPE LTDA FILIAL 0002-01", "RESIDENCIAL VILA SAO JOSE SCP", "RETES IMAGENS SERVICOS E CONSULTORIA LTDA", "RFX ADMINISTRACAO DE RECURSOS LTDA", "RFX CONSULTORIA E GESTAO DE NEGOCIOS LTDA", "RFX DISTRIBUIDORA DE PRODUTOS AUTOMOTIVOS LTDA", "RFX GESTAO PATRIMONIAL LTDA", "RFX LOGISTICA E TRANSPORTES DE COMBUSTIVEIS LTDA", "RFX TREINAMENTO PROFISSIONAL LTDA", "RGGC EMPREENDIMENTOS LTDA", "RH CENTRO DE SAUDE LTDA", "RICARDO SANTOS BRANT", "ROCKET GESTAO PATRIMONIAL LTDA", "ROL COMERCIO DE DERIVADOS DE PETROLEO LTDA", "RPB COMERCIO DE COMBUSTIVEL LTDA", "RSM COMERCIO E GERENCIAMENTO DE RESIDUOS GUAXUPE EIRELI", "SAINT EMILION AUTOMOVEIS PECAS E SERVICOS LTDA", "SAINT EMILION AUTOMOVEIS PECAS E SERVICOS LTDA", "SAINT EMILION AUTOMOVEIS PECAS E SERVICOS LTDA", "SAINT EMILION AUTOMOVEIS PECAS E SERVICOS LTDA", "SANTA CLARA AGROPECUARIA LTDA", "SANTA MARIA ECOLOGIC EQUIPAMENTOS LTDA", "SANTA MARIA ECOLOGIC LTDA", "SANTA MARIA ECOLOGIC 02", "SANTA MARIA ECOLOGIC 04", "SANTA MARIA ECOLOGIC 05", "SANTA MARIA ECOLOGIC 06", "SANTA MARIA ECOLOGIC 08", "SANTA MARIA ECOLOGIC 09", "SANTA MARIA ECOLOGIC 10", "SANTA MARIA ECOLOGIC 11", "SANTA MARIA ECOLOGIC 13", "SANTA MARIA ECOLOGIC 14", "SANTA MARIA ECOLOGIC 15", "SANTA MARIA ECOLOGIC RESIDUOS LTDA", "SANTORINI POSTO DE SERVICOS LTDA", "SARAMENHA ENGENHARIA LTDA", "SCP AUDITORIA DE IMPOSTOS E CONTRIBUICOES", "SCP CLAM ENGENHARIA LTDA", "SCP CLINICA RADIOLOGICA ELDORADO LTDA", "SCP DIAGNOSTICO BETIMBARREIRO LTDA", "SCP RESIDENCIAL VILA CONCEICAO", "SCP VILA PACIFICO SANCRUZA", "SE LOTEAMENTOS LTDA", "SETEC- CONSULTORIA EMPRESARIAL LTDA", "SICAL INDUSTRIAL LTDA", "SIMEX ENTREGAS E MOVIMENTACAO DE CARGAS LTDA", "SIX TRACKS LTDA", "SOBERANO LOJAS DE CONVENIENCIA LTDA", "SOBERANO LUBRIFICANTES LTDA", "SOBERANO SERVICOS LTDA", "SOBERANO TRANSPORTES LTDA", "SOLAR VOLT SOLUCOES COMERCIO E INSTALACAO PARA ENERGIA LTDA", "SOLUCAO CORTE E DOBRA DE METAIS LTDA", "SOLVE OPERACAO, MANUTENCAO E COMISSIONAMENTO DE SISTEMAS FOTOVOLTAICOS LTDA", "SOLVIA SOLUCOES VIARIAS LTDA", "SP IMPORTS LTDA", "SP IMPORTS LTDA FILIAL 02-70", "SP IMPORTS LTDA FILIAL 03-50", "SPE JARDINS DOS BURITIS LTDA", "SPE JARDINS DOS BURITIS LTDA FILIAL 02-60", "SPE LA BRESSE LTDA", "SPE MARIA FAUSTINA LTDA", "SPE MIRANTE DO LAGO SETE LAGOAS LTDA", "SSME EMPREENDIMENTOS IMOBILIARIOS LTDA FILIAL 02-76", "SSME EMPREENDIMENTOS IMOBILIARIOS LTDA", "SSME FLORESTAL LTDA", "SSME FLORESTAL LTDA FILIAL 0002-43", "SSME FLORESTAL LTDA FILIAL 0003-24", "SSME FLORESTAL LTDA FILIAL 0005-96", "SSME FLORESTAL LTDA FILIAL 0006-77", "SSME FLORESTAL LTDA FILIAL 0007-58", "SSME FLORESTAL LTDA FILIAL 0008-39", "SSME FLORESTAL LTDA FILIAL 0009-10", "SSME FLORESTAL LTDA FILIAL 0010-53", "SSME FLORESTAL LTDA FILIAL 0011-34", "SSME FLORESTAL LTDA FILIAL 0012-15", "SSME FLORESTAL LTDA FILIAL 0013-04", "SSME FLORESTAL LTDA FILIAL 0014-87", "SUDESTE ADMINISTRADORA DE SERVICOS LTDA", "SUDESTE ENGENHARIA E COMERCIO LTDA", "SUDESTE ENGENHARIA E COMERCIO LTDA FILIAL 02-39", "SUDESTE ENGENHARIA E COMERCIO LTDA FILIAL 03-10", "SUDESTE PARTICIPACOES LTDA", "SV LOGISTICA LTDA", "SV RANCHO VELHO GERACAO DE ENERGIA SPE LTDA", "SWA PARTICIPACOES LTDA", "SWA PATRIMONIAL LTDA", "TAKONO DISTRIBUICAO LTDA", "TASK SOFTWARE LTDA", "TAX CLOUD SOLUCOES LTDA", "TCX COMERCIO E INDUSTRIA DE EQUIPAMENTOS PECAS E SERVICOS LTDA", "TEBAS ADMINISTRACAO LTDA", "TECHNEACO ENGENHARIA LTDA", "TECHNEACO ENGENHARIA LTDA FILIAL 02-58", "TECNOCAP RECAPAGEM E PNEUS LTDA", "THAISSA CALAB CURSOS LTDA", "THAISSA CALAB ODONTOLOGIA LTDA", "TIMBIRAS PARTICIPACOES LTDA", "TK LOCACAO DE EQUIPAMENTOS LTDA", "TK PATRIMONIAL LTDA", "TLUANER PARTICIPACOES S/A", "TMJ MARCA E PATENTE LTDA", "TOP RAJA CAR LOCADORA DE VEICULOS LTDA", "TOPAZIO IMPERIAL MINERACAO COMERCIO E INDUSTRIA LTDA", "TRANSPORTADORA DONIZETE LTDA", "TRANSPORTES BOA VISTA LOGISTICA LTDA", "TRIACO ESTRUTURAS METALICAS LTDA", "TURMALINA INCORPORACOES SPE LTDA", "USA DIAGNOSTICA LTDA", "VALADAO E SANTOS PARTICIPACOES LTDA", "VALUMA COBRANCA E NEGOCIOS LTDA", "VCA COMERCIO LTDA", "VCS COMERCIO LTDA", "VEIGA ESTRUTURAS METALICAS LTDA", "VENETO EMPREENDIMENTO COMERCIAL LTDA", "VEREDAS DA SERRA COMBUSTIVEL LTDA", "VERO LATTE COMERCIO DE ALIMENTOS LTDA", "VERO LATTE COMERCIO DE ALIMENTOS LTDA", "VERO LATTE COMERCIO DE ALIMENTOS LTDA", "VIA MONDO APS LTDA", "VIA MONDO APS LTDA", "VIA MONDO AUTOMOVEIS E PECAS LTDA", "VIA MONDO AUTOMOVEIS E PECAS LTDA", "VIA MONDO AUTOMOVEIS E PECAS LTDA", "VIA MONDO AUTOMOVEIS E PECAS LTDA", "VIA MONDO AUTOMOVEIS E PECAS LTDA", "VIA MONDO AUTOMOVEIS E PECAS LTDA", "VIA MONDO AUTOMOVEIS E PECAS LTDA", "VIA MONDO AUTOMOVEIS E PECAS LTDA", "VIA MONDO AUTOMOVEIS E PECAS LTDA - FILIAL 08-80", "VIA MONDO AUTOMOVEIS E PECAS LTDA - FILIAL 09-61", "VIA MONDO DISTRIBUIDORA DE PECAS E ACESSORIOS AUTOMOTIVOS LTDA",  "VIA MONDO DISTRIBUIDORA DE PECAS E ACESSORIOS AUTOMOTIVOS LTDA", "VIA MONDO FANDI LTDA", "VIA MONDO LOCADORA LTDA", "VIA MONDO LOCADORA LTDA FILIAL 02-94", "VIA MONDO LOCADORA LTDA FILIAL 03-75", "VIA MONDO MULTIMARCAS LTDA", "VIA MONDO TRANSPORTES LTDA", "VIEIRA ADMINISTRACAO LTDA", "VILA CLARA VITORIA LTDA", "VJ PARTICIPACOES LTDA", "VJ PATRIMONIAL LTDA", "VN EMPREENDIMENTOS LTDA", "VSX VALVULAS E EQUIPAMENTOS LTDA", "WOLF PARTICIPACOES S/A", "WRN PARTICIPACOES LTDA", "ZOX GESTAO PATRIMONIAL LTDA"]
@@ -0,0 +1,81 @@
+import re
+import threading
+import time
+
+# Tempo (em segundos) até uma tabela ou bucket ausente ser verificado de novo
+TEMPO_REVERIFICACAO_AUSENTE = 60
+
+REGEX_RELACAO_INEXISTENTE = re.compile(r'relation "(?:\w+\.)?(\w+)" does not exist')
+
+# Resultado das verificações, compartilhado pelo processo: nome -> (existe, verificado_em)
+tabelas_verificadas = {}
+buckets_verificados = {}
+trava_esquema = threading.Lock()
+
+# Função para saber se um erro do Supabase é de tabela inexistente
+def erro_relacao_inexistente(erro):
+    return "relation" in str(erro) and "does not exist" in str(erro)
+
+# Função para ler uma verificação guardada (None se nunca foi feita ou se precisa ser refeita)
+def resultado_guardado(verificacoes, nome):
+    with trava_esquema:
+        resultado = verificacoes.get(nome)
+    if resultado is None:
+        return None
+    existe, verificado_em = resultado
+    if not existe and time.monotonic() - verificado_em > TEMPO_REVERIFICACAO_AUSENTE:
+        return None
+    return existe
+
+# Função para guardar o resultado de uma verificação
+def guardar_resultado(verificacoes, nome, existe):
+    with trava_esquema:
+        verificacoes[nome] = (existe, time.monotonic())
+
+# Função para verificar se uma tabela existe, consultando o Supabase só na primeira vez
+def tabela_existe(supabase, nome_tabela):
+    existe = resultado_guardado(tabelas_verificadas, nome_tabela)
+    if existe is not None:
+        return existe
+
+    try:
+        supabase.table(nome_tabela).select("*").limit(1).execute()
+        existe = True
+    except Exception as e:
+        if not erro_relacao_inexistente(e):
+            raise e
+        existe = False
+
+    guardar_resultado(tabelas_verificadas, nome_tabela, existe)
+    return existe
+
+# Função para verificar se um bucket do Storage existe, consultando o Supabase só na primeira vez
+def bucket_existe(supabase, nome_bucket):
+    existe = resultado_guardado(buckets_verificados, nome_bucket)
+    if existe is not None:
+        return existe
+
+    buckets = supabase.storage.list_buckets()
+    existe = any(
+        (bucket.get('name') if isinstance(bucket, dict) else getattr(bucket, 'name', None)) == nome_bucket
+        for bucket in buckets
+    )
+
+    guardar_resultado(buckets_verificados, nome_bucket, existe)
+    return existe
+
+# Função para verificar várias tabelas de uma vez (usada na inicialização)
+def verificar_tabelas(supabase, nomes_tabelas):
+    return {nome_tabela: tabela_existe(supabase, nome_tabela) for nome_tabela in nomes_tabelas}
+
+# Função para descartar verificações quando uma consulta falha com "relation does not exist"
+# A próxima chamada de tabela_existe volta a consultar o Supabase.
+def registrar_falha_esquema(erro):
+    if not erro_relacao_inexistente(erro):
+        return
+    tabela = REGEX_RELACAO_INEXISTENTE.search(str(erro))
+    with trava_esquema:
+        if tabela:
+            tabelas_verificadas.pop(tabela.group(1), None)
+        else:
+            tabelas_verificadas.clear()
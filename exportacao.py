@@ -0,0 +1,277 @@
+import csv
+import gzip
+import hashlib
+import io
+import re
+import tempfile
+import threading
+import time
+from datetime import date, datetime, timedelta
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+import streamlit as st
+
+from armazenamento import BUCKET_ARQUIVOS, enviar_arquivos
+from registros import erro_da_resposta
+
+# Quantidade de registros lida por chamada (o PostgREST do Supabase devolve no máximo 1000 linhas)
+TAMANHO_PAGINA_EXPORTACAO = 1000
+
+# Quantidade de linhas de cada grupo do Parquet (só um grupo fica na memória por vez)
+LINHAS_POR_GRUPO_PARQUET = 50000
+
+# Arquivos gerados até este tamanho são baixados direto pela página; os maiores vão para o Storage
+LIMITE_DOWNLOAD_DIRETO = 8 * 1024 * 1024
+
+# Pastas do bucket onde ficam as exportações e os ZIPs organizados grandes, e validade (em segundos) do link de download
+PASTA_EXPORTACOES = "exportacoes"
+PASTA_ORGANIZADOS = "organizados"
+VALIDADE_LINK_EXPORTACAO = 60 * 60
+
+# Os arquivos enviados ficam em <pasta>/<hash do usuário>/<AAAAMMDD_HHMMSS>_<nome>; depois que o
+# link vence eles são apagados, no máximo uma vez por INTERVALO_LIMPEZA_ENTREGAS segundos por processo
+FORMATO_PREFIXO_ENTREGA = "%Y%m%d_%H%M%S"
+INTERVALO_LIMPEZA_ENTREGAS = 60 * 60
+
+# Quantidade de objetos por chamada ao listar e ao apagar no Storage
+TAMANHO_PAGINA_STORAGE = 1000
+
+# Instante da última limpeza bem-sucedida de cada pasta neste processo, e pastas sendo limpas agora
+ultima_limpeza = {}
+limpezas_em_andamento = set()
+trava_limpeza = threading.Lock()
+
+# Formatos de exportação: nome exibido -> (extensão, content-type)
+FORMATOS_EXPORTACAO = {
+    "CSV": (".csv", "text/csv"),
+    "CSV compactado (gzip)": (".csv.gz", "application/gzip"),
+    "Parquet": (".parquet", "application/vnd.apache.parquet")
+}
+
+# Colunas exportadas, na ordem do arquivo, com o tipo usado no Parquet
+COLUNAS_EXPORTACAO = [
+    ("id", pa.int64()),
+    ("data", pa.timestamp("us", tz="UTC")),
+    ("empresa", pa.string()),
+    ("empresa_id", pa.int64()),
+    ("tipo_nota", pa.string()),
+    ("erro", pa.string()),
+    ("arquivo_erro", pa.string()),
+    ("status", pa.string()),
+    ("arquivo", pa.string()),
+    ("tipo_arquivo", pa.string()),
+    ("usuario", pa.string())
+]
+
+# Função para ler os registros de um período em páginas, pela ordem (data, id)
+# Cada página continua do último registro da anterior (função registros_das_empresas no Postgres),
+# então só uma página fica na memória por vez. empresa_ids None = todas as empresas.
+def paginas_registros(supabase, empresa_ids, data_inicio=None, data_fim=None, tamanho_pagina=TAMANHO_PAGINA_EXPORTACAO):
+    cursor = (None, None)
+    while True:
+        response = supabase.rpc("registros_das_empresas", {
+            "p_empresa_ids": list(empresa_ids) if empresa_ids is not None else None,
+            "p_data_inicio": data_inicio.isoformat() if data_inicio else None,
+            "p_data_fim": data_fim.isoformat() if data_fim else None,
+            "p_depois_data": cursor[0],
+            "p_depois_id": cursor[1],
+            "p_limite": tamanho_pagina
+        }).execute()
+
+        erro = erro_da_resposta(response)
+        if erro:
+            raise Exception(erro)
+
+        pagina = response.data or []
+        if pagina:
+            yield pagina
+        if len(pagina) < tamanho_pagina:
+            return
+        cursor = (pagina[-1]["data"], pagina[-1]["id"])
+
+# Função para escrever as páginas em CSV (compactado com gzip, se pedido) num arquivo binário aberto
+# Retorna a quantidade de linhas escritas.
+def escrever_csv(paginas, arquivo, compactar=False, ao_progredir=None):
+    destino = gzip.GzipFile(fileobj=arquivo, mode="wb") if compactar else arquivo
+    texto = io.TextIOWrapper(destino, encoding="utf-8", newline="")
+    escritor = csv.DictWriter(texto, fieldnames=[nome for nome, _ in COLUNAS_EXPORTACAO], extrasaction="ignore")
+    escritor.writeheader()
+
+    linhas = 0
+    for pagina in paginas:
+        escritor.writerows(pagina)
+        linhas += len(pagina)
+        if ao_progredir:
+            ao_progredir(linhas)
+
+    texto.flush()
+    texto.detach()
+    if compactar:
+        destino.close()  # Fecha só o gzip, gravando o final; o arquivo continua aberto
+    return linhas
+
+# Função para montar uma tabela do Arrow com as colunas da exportação
+def tabela_parquet(linhas):
+    return pa.table({
+        nome: pa.array([linha.get(nome) for linha in linhas], type=pa.string() if pa.types.is_timestamp(tipo) else tipo).cast(tipo)
+        for nome, tipo in COLUNAS_EXPORTACAO
+    })
+
+# Função para escrever as páginas em Parquet num arquivo binário aberto
+# As linhas são juntadas em grupos de LINHAS_POR_GRUPO_PARQUET antes de gravar.
+# Retorna a quantidade de linhas escritas.
+def escrever_parquet(paginas, arquivo, ao_progredir=None):
+    linhas = 0
+    grupo = []
+    with pq.ParquetWriter(arquivo, pa.schema(COLUNAS_EXPORTACAO), compression="zstd") as escritor:
+        for pagina in paginas:
+            grupo.extend(pagina)
+            linhas += len(pagina)
+            if len(grupo) >= LINHAS_POR_GRUPO_PARQUET:
+                escritor.write_table(tabela_parquet(grupo))
+                grupo = []
+            if ao_progredir:
+                ao_progredir(linhas)
+        if grupo or not linhas:
+            escritor.write_table(tabela_parquet(grupo))
+    return linhas
+
+# Função para montar a pasta de um usuário no Storage (hash do username, que pode ter qualquer caractere)
+def pasta_do_usuario(username):
+    return hashlib.sha256(username.encode("utf-8")).hexdigest()[:16]
+
+# Função para deixar um nome de arquivo só com caracteres seguros num caminho do Storage
+def nome_seguro(nome):
+    return re.sub(r"[^A-Za-z0-9._-]+", "_", nome).strip("_") or "arquivo"
+
+# Função para apagar da pasta os arquivos entregues cujo link já venceu
+# A data de envio vem do prefixo do nome; objetos fora do padrão são ignorados.
+# Retorna a quantidade de arquivos apagados.
+def limpar_entregas_vencidas(supabase, pasta, agora=None):
+    agora = agora or datetime.now()
+    armazenamento = supabase.storage.from_(BUCKET_ARQUIVOS)
+    vencidos = []
+    for usuario in listar_storage(armazenamento, pasta):
+        prefixo = f"{pasta}/{usuario['name']}"
+        for objeto in listar_storage(armazenamento, prefixo):
+            try:
+                enviado_em = datetime.strptime(objeto["name"][:15], FORMATO_PREFIXO_ENTREGA)
+            except ValueError:
+                continue
+            if (agora - enviado_em).total_seconds() > VALIDADE_LINK_EXPORTACAO:
+                vencidos.append(f"{prefixo}/{objeto['name']}")
+
+    for inicio in range(0, len(vencidos), TAMANHO_PAGINA_STORAGE):
+        armazenamento.remove(vencidos[inicio:inicio + TAMANHO_PAGINA_STORAGE])
+    return len(vencidos)
+
+# Função para listar todos os objetos de um prefixo do Storage, página por página
+def listar_storage(armazenamento, prefixo):
+    deslocamento = 0
+    while True:
+        pagina = armazenamento.list(prefixo, {"limit": TAMANHO_PAGINA_STORAGE, "offset": deslocamento, "sortBy": {"column": "name", "order": "asc"}})
+        yield from pagina
+        if len(pagina) < TAMANHO_PAGINA_STORAGE:
+            return
+        deslocamento += len(pagina)
+
+# Função para limpar a pasta se a última limpeza no processo já passou de INTERVALO_LIMPEZA_ENTREGAS
+# Uma falha na limpeza não impede a entrega: o erro é registrado e a próxima entrega tenta de novo.
+def limpar_entregas_se_preciso(supabase, pasta):
+    with trava_limpeza:
+        ultima = ultima_limpeza.get(pasta)
+        if pasta in limpezas_em_andamento or (ultima is not None and time.monotonic() - ultima < INTERVALO_LIMPEZA_ENTREGAS):
+            return
+        limpezas_em_andamento.add(pasta)
+    try:
+        limpar_entregas_vencidas(supabase, pasta)
+        with trava_limpeza:
+            ultima_limpeza[pasta] = time.monotonic()
+    except Exception as e:
+        print(f"❌ Erro ao apagar as entregas vencidas de {pasta}: {str(e)}")
+    finally:
+        with trava_limpeza:
+            limpezas_em_andamento.discard(pasta)
+
+# Função para entregar um arquivo gerado (aberto, em disco ou em memória) para download
+# Até LIMITE_DOWNLOAD_DIRETO o conteúdo volta em bytes para st.download_button; acima disso o arquivo
+# é enviado em blocos ao Storage, sem ser lido inteiro, e volta um link temporário.
+# Retorna um dicionário com nome, tamanho, tipo_conteudo e "conteudo" (bytes) ou "link".
+def entregar_arquivo(supabase, url, chave_api, username, arquivo, nome, tipo_conteudo, pasta=PASTA_EXPORTACOES):
+    tamanho = arquivo.seek(0, io.SEEK_END)
+    arquivo.seek(0)
+    entrega = {"nome": nome, "tamanho": tamanho, "tipo_conteudo": tipo_conteudo}
+    if tamanho <= LIMITE_DOWNLOAD_DIRETO:
+        entrega["conteudo"] = arquivo.read()
+        return entrega
+
+    limpar_entregas_se_preciso(supabase, pasta)
+    arquivo_path = f"{pasta}/{pasta_do_usuario(username)}/{datetime.now().strftime(FORMATO_PREFIXO_ENTREGA)}_{nome_seguro(nome)}"
+    erro = enviar_arquivos(url, chave_api, [(arquivo_path, arquivo, tipo_conteudo)])[arquivo_path]
+    if erro:
+        raise Exception(f"Falha ao enviar o arquivo: {erro}")
+
+    link = supabase.storage.from_(BUCKET_ARQUIVOS).create_signed_url(arquivo_path, VALIDADE_LINK_EXPORTACAO, {"download": nome})
+    entrega["link"] = link["signedURL"]
+    return entrega
+
+# Função para exibir o botão de download de um arquivo entregue por entregar_arquivo
+def exibir_download(entrega, rotulo):
+    if "conteudo" in entrega:
+        st.download_button(rotulo, data=entrega["conteudo"], file_name=entrega["nome"], mime=entrega["tipo_conteudo"])
+    else:
+        st.link_button(rotulo, entrega["link"])
+        st.caption(f"O link vale por {VALIDADE_LINK_EXPORTACAO // 60} minutos.")
+
+# Função para exportar os registros de um período (com data_fim incluída) para um arquivo
+# O arquivo é escrito em disco, página por página, e entregue por entregar_arquivo.
+# ao_progredir(linhas) é chamada a cada página lida.
+# Retorna o dicionário de entregar_arquivo com a quantidade de linhas.
+def exportar_registros(supabase, url, chave_api, username, empresa_ids, data_inicio, data_fim, formato, ao_progredir=None):
+    extensao, tipo_conteudo = FORMATOS_EXPORTACAO[formato]
+    periodo = "_".join(data.strftime("%Y%m%d") for data in (data_inicio, data_fim) if data)
+    nome = f"registros_{periodo or 'todos'}_{datetime.now().strftime('%H%M%S')}{extensao}"
+    paginas = paginas_registros(supabase, empresa_ids, data_inicio, data_fim + timedelta(days=1) if data_fim else None)
+
+    with tempfile.TemporaryFile() as arquivo:
+        if formato == "Parquet":
+            linhas = escrever_parquet(paginas, arquivo, ao_progredir)
+        else:
+            linhas = escrever_csv(paginas, arquivo, formato != "CSV", ao_progredir)
+
+        exportacao = entregar_arquivo(supabase, url, chave_api, username, arquivo, nome, tipo_conteudo)
+    exportacao["linhas"] = linhas
+    return exportacao
+
+# Função para exibir o formulário de exportação de registros e o download do último arquivo gerado
+# empresa_ids None = todas as empresas. chave separa o estado de cada página que usa o formulário.
+def exibir_exportacao(supabase, url, chave_api, empresa_ids, chave):
+    with st.form(f"{chave}_form"):
+        hoje = date.today()
+        periodo = st.date_input("Período", value=(hoje, hoje), format="DD/MM/YYYY")
+        formato = st.selectbox("Formato", list(FORMATOS_EXPORTACAO))
+        gerar = st.form_submit_button("📦 Gerar exportação")
+
+    if gerar:
+        data_inicio, data_fim = (periodo[0], periodo[-1]) if isinstance(periodo, (tuple, list)) and periodo else (periodo, periodo)
+        progresso = st.empty()
+        st.session_state.pop(chave, None)
+        try:
+            st.session_state[chave] = exportar_registros(
+                supabase, url, chave_api, st.session_state.username, empresa_ids, data_inicio, data_fim, formato,
+                lambda linhas: progresso.caption(f"{linhas} registro(s) exportado(s)...")
+            )
+        except Exception as e:
+            st.error(f"❌ Erro ao exportar registros: {str(e)}")
+        progresso.empty()
+
+    exportacao = st.session_state.get(chave)
+    if not exportacao:
+        return
+    if not exportacao["linhas"]:
+        st.info("Nenhum registro encontrado no período.")
+        return
+
+    st.caption(f"{exportacao['linhas']} registro(s), {exportacao['tamanho'] / 1024 / 1024:.1f} MB")
+    exibir_download(exportacao, "📥 Baixar exportação")
@@ -0,0 +1,165 @@
+import argparse
+import os
+import threading
+import time
+from datetime import date
+
+from dotenv import load_dotenv
+from supabase import create_client
+
+from empresas import cadastrar_empresas, definir_empresas_usuario, ids_das_empresas, todas_as_empresas
+from esquema import verificar_tabelas
+from listas import lista_funcionalidades
+from registros import erro_da_resposta, recalcular_registros_diarios
+from senhas import hash_password
+
+# Dados do usuário padrão
+USUARIO_ADMIN = "JHENNIFER"
+SENHA_ADMIN = "Refinnehj262"
+
+# Tabelas verificadas na inicialização (o resultado fica guardado em esquema)
+TABELAS_APLICACAO = ["users", "registros", "messages", "empresas", "usuarios_empresas"]
+
+# Espera (em segundos) antes de tentar de novo uma inicialização que falhou
+INTERVALO_NOVA_TENTATIVA = 60
+
+# Estado da inicialização no processo: se já deu certo e quando falhou pela última vez
+inicializado = False
+falhou_em = None
+trava_inicializacao = threading.Lock()
+
+# Função para semear a tabela empresas com a lista inicial, só se ela ainda estiver vazia
+# Roda pela linha de comando; depois disso as empresas são mantidas no banco pelas Configurações,
+# e um novo deploy não desfaz empresas renomeadas ou apagadas.
+def semear_empresas(supabase):
+    try:
+        response = supabase.table("empresas").select("id").limit(1).execute()
+        erro = erro_da_resposta(response)
+        if erro:
+            raise Exception(erro)
+        if response.data:
+            print("Tabela empresas já preenchida; nada a semear.")
+            return True
+
+        from empresas_iniciais import lista_empresas
+        cadastrar_empresas(supabase, lista_empresas)
+        print(f"Empresas iniciais cadastradas: {len(set(lista_empresas))}.")
+        return True
+    except Exception as e:
+        print(f"❌ Erro ao semear empresas: {str(e)}")
+        return False
+
+# Função para criar ou atualizar o usuário administrador com todas as empresas e permissões
+# As empresas vêm da tabela empresas (semeada por semear_empresas e mantida pela aplicação).
+def garantir_usuario_admin(supabase):
+    empresas_cadastradas = todas_as_empresas(supabase)
+    novas_empresas = ",".join(empresas_cadastradas)
+    novas_permissoes = ",".join(lista_funcionalidades)
+
+    # Verificar se o usuário existe e criar/atualizar se necessário
+    response = supabase.table("users").select("username").eq("username", USUARIO_ADMIN).execute()
+    erro = erro_da_resposta(response)
+    if erro:
+        print(f"❌ Erro ao verificar usuário: {erro}")
+        return False
+
+    if not response.data:
+        # Usuário não encontrado, criar um novo
+        response = supabase.table("users").insert({
+            "username": USUARIO_ADMIN,
+            "password": hash_password(SENHA_ADMIN),
+            "empresas": novas_empresas,
+            "permissoes": novas_permissoes
+        }).execute()
+        mensagem_sucesso = "Novo usuário criado com sucesso!"
+    else:
+        # Usuário encontrado, atualizar dados
+        response = supabase.table("users").update({
+            "empresas": novas_empresas,
+            "permissoes": novas_permissoes
+        }).eq("username", USUARIO_ADMIN).execute()
+        mensagem_sucesso = "Usuário atualizado com sucesso!"
+
+    erro = erro_da_resposta(response)
+    if erro:
+        print(f"❌ Erro ao salvar usuário: {erro}")
+        return False
+
+    # Ligar todas as empresas ao administrador pelo id
+    definir_empresas_usuario(supabase, USUARIO_ADMIN, ids_das_empresas(supabase, empresas_cadastradas))
+
+    print(mensagem_sucesso)
+    return True
+
+# Função para adicionar as colunas de empresas e permissões na tabela users, se faltarem
+def check_and_add_columns(supabase):
+    response = supabase.rpc("get_columns", {"p_table_name": "users"}).execute()
+    columns = [col["column_name"] for col in response.data]
+
+    # Adicionar colunas se não existirem
+    if "empresas" not in columns:
+        supabase.postgrest.rpc("alter_p_table_name_users", {"query": "ALTER p_table_name users ADD COLUMN empresas TEXT DEFAULT ''"}).execute()
+    if "permissoes" not in columns:
+        supabase.postgrest.rpc("alter_p_table_name_users", {"query": "ALTER p_table_name users ADD COLUMN permissoes TEXT DEFAULT ''"}).execute()
+
+# Função com todas as etapas de inicialização do banco de dados
+def inicializar(supabase):
+    try:
+        check_and_add_columns(supabase)
+        print("Verificação concluída!")
+        sucesso = garantir_usuario_admin(supabase)
+        verificar_tabelas(supabase, TABELAS_APLICACAO)
+        return sucesso
+    except Exception as e:
+        print(f"❌ Erro na inicialização: {str(e)}")
+        return False
+
+# Função para rodar a inicialização até ela dar certo uma vez no processo
+# O Streamlit reexecuta main.py a cada interação, mas este módulo é importado uma vez só.
+# Depois de uma falha (banco fora do ar, por exemplo) as execuções seguintes recebem False
+# sem tentar de novo até passar INTERVALO_NOVA_TENTATIVA segundos.
+# Com INICIALIZAR_NA_APLICACAO=0 a aplicação não faz nada e a inicialização fica a cargo
+# do comando "python inicializacao.py" no deploy. A lista inicial de empresas só é semeada por esse comando.
+def inicializar_uma_vez(supabase):
+    global inicializado, falhou_em
+
+    if inicializado or os.getenv("INICIALIZAR_NA_APLICACAO", "1") == "0":
+        return True
+
+    with trava_inicializacao:
+        if inicializado:
+            return True
+        if falhou_em is not None and time.monotonic() - falhou_em < INTERVALO_NOVA_TENTATIVA:
+            return False
+        if inicializar(supabase):
+            inicializado = True
+            falhou_em = None
+        else:
+            falhou_em = time.monotonic()
+        return inicializado
+
+# Função para recalcular os totais diários dos registros pela linha de comando
+def recalcular_totais(supabase, data_inicio=None, data_fim=None):
+    try:
+        linhas = recalcular_registros_diarios(supabase, data_inicio, data_fim)
+        print(f"Totais diários recalculados: {linhas} linha(s).")
+        return True
+    except Exception as e:
+        print(f"❌ Erro ao recalcular totais diários: {str(e)}")
+        return False
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Inicialização e manutenção do banco de dados.")
+    parser.add_argument("--recalcular-totais", action="store_true", help="recalcula a tabela registros_diarios em vez de inicializar")
+    parser.add_argument("--inicio", type=date.fromisoformat, help="primeiro dia a recalcular (AAAA-MM-DD)")
+    parser.add_argument("--fim", type=date.fromisoformat, help="último dia a recalcular (AAAA-MM-DD)")
+    argumentos = parser.parse_args()
+
+    load_dotenv()
+    cliente = create_client(os.getenv("SUPABASE_URL"), os.getenv("SUPABASE_KEY"))
+
+    if argumentos.recalcular_totais:
+        sucesso = recalcular_totais(cliente, argumentos.inicio, argumentos.fim)
+    else:
+        sucesso = semear_empresas(cliente) and inicializar(cliente)
+    raise SystemExit(0 if sucesso else 1)
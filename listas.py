@@ -0,0 +1,2 @@
+# Lista de funcionalidades disponíveis
+lista_funcionalidades = ["Página Inicial" , "Chat" , "Organizar Arquivos Fiscais", "Controle Importação", "Registros Importação", "Indicadores", "Configurações"]
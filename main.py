@@ -4,34 +4,55 @@ from dotenv import load_dotenv
 import os
 import pandas as pd
 import plotly.express as px
-import shutil
 import zipfile
-import tempfile
-from io import BytesIO
-import hashlib
 import webbrowser
 import urllib.parse
-from datetime import date, datetime
-from PIL import Image
+from datetime import datetime
+from armazenamento import enviar_uploads, exibir_arquivo_sob_demanda
+from cache import em_cache, invalidar_cache, nao_guardar_resultado
+from cache_anexos import estatisticas_cache_anexos
+from chat import MAXIMO_MENSAGENS_NOVAS, buscar_mensagens_antigas, buscar_mensagens_novas, cursor_da_mensagem, preparar_mensagens
+from empresas import cadastrar_empresas, definir_empresas_usuario, empresas_do_usuario, filtro_empresas, id_da_empresa, ids_das_empresas, nomes_das_empresas, selecionar_empresa, selecionar_empresas, todas_as_empresas
+from esquema import bucket_existe, registrar_falha_esquema, tabela_existe
+from exportacao import PASTA_ORGANIZADOS, entregar_arquivo, exibir_download, exibir_exportacao
+from inicializacao import inicializar_uma_vez
+from listas import lista_funcionalidades
+from organizador import NOME_LISTA_FALHAS, interpretar_workers, organizar_arquivos
+from registros import STATUS_REGISTRO, TAMANHOS_PAGINA, TIPOS_NOTA, buscar_indicadores, buscar_pagina_registros, inserir_registros_em_lote, montar_registro
+from senhas import hash_password, precisa_rehash, verificar_senha, verificar_senha_ficticia
+from sessao import encerrar_sessao, iniciar_sessao, marcar_usuario_alterado, separar_lista, validar_sessao
+from tempo_real import INTERVALO_TEMPO_REAL, alteracao_afeta, alteracoes_da_sessao, assinar_sessao, iniciar_tempo_real, publicar_local
+from usuarios import alterar_acessos_em_lote, buscar_pagina_usuarios
 
 load_dotenv()
 
 url = os.getenv("SUPABASE_URL")
 key = os.getenv("SUPABASE_KEY")
 
-supabase: Client = create_client(url, key)
+# Processos usados na classificação do organizador (vazio = um por núcleo, 1 = sequencial)
+# Um valor inválido cai no padrão e o aviso aparece no organizador.
+try:
+    workers_organizador = interpretar_workers(os.getenv("ORGANIZADOR_WORKERS"))
+    aviso_workers_organizador = None
+except ValueError as e:
+    workers_organizador = None
+    aviso_workers_organizador = str(e)
 
-# Função para verificar se uma tabela existe no Supabase
+# Função para criar o cliente Supabase uma única vez por processo
+# O Streamlit executa o script de novo a cada interação; o mesmo cliente (e seu pool HTTP) é reaproveitado.
+@st.cache_resource
+def criar_cliente_supabase(url, key):
+    return create_client(url, key)
+
+supabase: Client = criar_cliente_supabase(url, key)
+
+# Função para verificar se uma tabela existe no Supabase (consultado uma vez por processo)
 def check_table_exists(table_name):
-    try:
-        response = supabase.table(table_name).select("*").limit(1).execute()
-        return True
-    except Exception as e:
-        if "relation" in str(e) and "does not exist" in str(e):
-            return False
-        raise e
+    return tabela_existe(supabase, table_name)
 
 # Função para carregar as mensagens do Supabase
+# As mensagens já carregadas ficam em st.session_state.chat (da mais antiga para a mais nova);
+# a cada execução só são buscadas as mensagens mais novas que a última da sessão.
 def load_messages():
     try:
         # Verificar se a tabela messages existe
@@ -39,14 +60,46 @@ def load_messages():
             st.warning("A tabela 'messages' ainda não foi criada no Supabase. Por favor, crie a tabela com as seguintes colunas: id, username, message, created_at")
             return []
 
-        response = supabase.table("messages").select("*").order("created_at", desc=True).limit(50).execute()
-        if not response or (hasattr(response, 'error') and response.error):
-            st.error(f"❌ Erro ao carregar mensagens: {response.error.message if hasattr(response, 'error') else 'Erro desconhecido'}")
-            return []
-        return response.data
+        if "chat" not in st.session_state or not st.session_state.chat["mensagens"]:
+            mensagens, tem_anteriores = buscar_mensagens_antigas(supabase)
+            st.session_state.chat = {"mensagens": mensagens, "tem_anteriores": tem_anteriores}
+        else:
+            mensagens = st.session_state.chat["mensagens"]
+            novas = buscar_mensagens_novas(supabase, cursor_da_mensagem(mensagens[-1]))
+            while novas:
+                mensagens.extend(novas)
+                if len(novas) < MAXIMO_MENSAGENS_NOVAS:
+                    break
+                novas = buscar_mensagens_novas(supabase, cursor_da_mensagem(mensagens[-1]))
+        return st.session_state.chat["mensagens"]
     except Exception as e:
+        registrar_falha_esquema(e)
         st.error(f"❌ Erro ao carregar mensagens: {str(e)}")
-        return []
+        return st.session_state.chat["mensagens"] if "chat" in st.session_state else []
+
+# Função para carregar a página de mensagens anteriores à mais antiga da sessão
+def load_older_messages():
+    try:
+        mensagens = st.session_state.chat["mensagens"]
+        anteriores, tem_anteriores = buscar_mensagens_antigas(supabase, cursor_da_mensagem(mensagens[0]))
+        st.session_state.chat = {"mensagens": anteriores + mensagens, "tem_anteriores": tem_anteriores}
+        return True
+    except Exception as e:
+        registrar_falha_esquema(e)
+        st.error(f"❌ Erro ao carregar mensagens anteriores: {str(e)}")
+        return False
+
+# Função para juntar ao chat da sessão as mensagens recebidas pelo tempo real
+def aplicar_mensagens_recebidas():
+    if "chat" not in st.session_state:
+        return
+    mensagens = st.session_state.chat["mensagens"]
+    ids_carregados = {mensagem["id"] for mensagem in mensagens}
+    for alteracao in alteracoes_da_sessao("messages"):
+        mensagem = alteracao["registro"]
+        if alteracao["evento"] == "INSERT" and mensagem and mensagem.get("id") not in ids_carregados:
+            mensagens.extend(preparar_mensagens([mensagem]))
+            ids_carregados.add(mensagem.get("id"))
 
 # Função para salvar as mensagens no Supabase
 def save_message(username, message):
@@ -66,71 +119,19 @@ def save_message(username, message):
         if not response or (hasattr(response, 'error') and response.error):
             st.error(f"❌ Erro ao salvar mensagem: {response.error.message if hasattr(response, 'error') else 'Erro desconhecido'}")
             return False
+        publicar_local("messages", "INSERT", response.data[0] if response.data else None)
         return True
     except Exception as e:
+        registrar_falha_esquema(e)
         st.error(f"❌ Erro ao salvar mensagem: {str(e)}")
         return False
 
-# Lista de empresas disponíveis
-lista_empresas = ["2B COMBUSTIVEL LTDA", "A REDE GESTAO PATRIMONIAL LTDA", "A.M CHEQUER IMOVEIS LTDA", "A.R. PARTICIPACOES LTDA", "ABEL CONSTRUTORA LTDA", "ABEL SEMINOVOS LTDA", "ACOLOG LOGISTICA LTDA", "ACOS SERVICOS DE PROMOCAO LTDA", "ACR GESTAO PATRIMONIAL LTDA", "ADCAR SERVICO DE ESCRITORIO E APOIO ADMINISTRATIVO LTDA", "ADR MOBILIDADE E SERVICOS LTDA", "ADS COMERCIO E IMPORTACAO E EXPORTACAO EIRELI", "AESA PARTICIPAÇÕES LTDA", "AGM ESQUADRIAS LTDA", "AGP03 EMPREENDIMENTOS IMOBILIARIOS SPE LTDA", "AGP03 EMPREENDIMENTOS IMOBILIARIOS SPE LTDA FILIAL 02-82", "AGP03 EMPREENDIMENTOS IMOBILIARIOS SPE LTDA SCP RESIDENCIAL CAPARAO", "AGP05 ARGON EMPREENDIMENTOS IMOBILIARIOS SPE LTDA", "AGROPECUARIA BONANZA LTDA", "AGT01 MORADA NOVA DE MINAS SPE LTDA", "AGT01 MORADA NOVA DE MINAS SPE LTDA FILIAL 02-52", "AGUIA 8 COMERCIO DE COMBUSTIVEIS LTDA", "AGUIA IV COMERCIO DE COMBUSTIVEIS LTDA", "AGUIA IX COMERCIO DE COMBUSTIVEIS LTDA", "AGUIA V COMERCIO DE COMBUSTIVEIS LTDA", "ALLOTECH CONSULTORIA EM PRODUCAO INDUSTRIAL LTDA", "ALVES E SANTOS PARTICIPACOES LTDA", "AMH COMERCIO E SERVICOS LTDA", "AML HOLDING S/A", "AMMC PARTICIPACOES LTDA", "AMPLUS PARTICIPACOES SA", "AMX GESTÃO PATRIMONIAL LTDA", "ANF EMPREENDIMENTOS E PARTICIPACOES LTDA", "ANITA CHEQUER PARTICIPACOES LTDA", "ANITA CHEQUER PATRIMONIAL LTDA", "APL ADMINISTRACAO E PARTICIPACOES LTDA", "APMG PARTICIPACOES S/A", "ARCI PARTICIPACOES LTDA", "ARCI PATRIMONIAL LTDA", "ARGON ENGENHARIA LTDA", "ARNDT PATRIMONIAL LTDA", "ARNDT REFORMAS E MANUTENCOES LTDA", "ARNDT, TRAVASSOS E MORRISON SPE LTDA", "ARTMIX HOLDING LTDA", "AUMAR PRESTACAO DE SERVICOS ADMINISTRATIVOS LTDA", "AUTO POSTO ALELUIA LTDA", "AUTO POSTO ALELUIA LTDA FILIAL 02-46", "AUTO POSTO CENTENARIO LTDA", "AUTO POSTO DAS LAJES LTDA", "AUTO POSTO DOM BOSCO LTDA", "AUTO POSTO MAQUINE LTDA", "AUTO POSTO MARIO CAMPOS COMERCIO DE COMBUSTIVEIS LTDA", "AUTO POSTO PORTAL DO NORTE LTDA", "AUTO POSTO VERONA LTDA", "AUTOREDE LOCADORA DE VEICULOS LTDA", "AUTOREDE PARTICIPACOES LTDA", "AXJ PARTICIPACOES EIRELI", "AXP GESTAO PATRIMONIAL LTDA", "AZEVEDO & CIA", "BARAO VPP CONVENIENCIAS LTDA", "BARTELS DERMATOLOGIA ESTETICA E LASER LTDA", "BEL DISTRIBUIDOR DE LUBRIFICANTES LTDA", "BEL DISTRIBUIDOR DE LUBRIFICANTES LTDA FILIAL 02-79", "BEL LUBRIFICANTES ESPECIAIS LTDA", "BELTMORE PARTICIPACOES LTDA", "BEMX - PARTICIPACOES E EMPREENDIMENTOS LTDA", "BIOCLINTECH CIENTIFICA LTDA", "BIOCLINTECH LTDA", "BIOCLINTECH MANUTENCAO LTDA", "BLUE SKY PARTICIPACOES LTDA", "BMC EDITORA LTDA", "BMGL PARTICIPACOES E EMPREENDIMENTOS IMOBILIARIOS LTDA", "BOA VISTA ASSESSORIA LTDA", "BOA VISTA BOCAIUVA HOTEL LTDA", "BORA EMBALAGENS LTDA", "BRANT EMPREENDIMENTOS LTDA", "BRASIL CONCRETO LTDA", "BRAZIL MANIA LTDA", "BRB TRANSPORTES LTDA", "BRM COMERCIO DE VEICULOS LTDA", "BRM COMERCIO DE VEICULOS LTDA FILIAL 02-24", "BROMELIAS GESTAO PATRIMONIAL LTDA", "BURITIS CONVENIENCIA LTDA", "BV DISTRIBUIDORA LTDA", "CAD COMERCIAL DE MAQUINAS LTDA", "CAMPO ALEGRE PARTICIPACOES LTDA", "CAPITAO COMERCIO DE COMBUSTIVEIS LTDA", "CASA NOVA SPE LTDA", "CASA SEMPRE VIVA COMERCIO DE MATERIAIS DE CONSTRUCAO LTDA", "CASCALHO PARTICIPACOES LTDA", "CATIRA INTERMEDIACOES DE NEGOCIOS LTDA", "CCA COMERCIAL DE COMBUSTIVEIS AUTOMOTIVOS LTDA", "CDI NUCLEAR LTDA", "CDVM LTDA", "CELT -COMERCIO DE COMBUSTIVEIS E LUBRIFICANTES LTDA", "CENTER POSTO LTDA", "CENTER POSTO LTDA FILIAL 02-12", "CENTRO DE DIAGNOSTICO POR IMAGEM LTDA", "CENTRO DE DIAGNOSTICO POR IMAGEM LTDA FILIAL 02-49", "CENTRO DE DIAGNOSTICO POR IMAGEM LTDA FILIAL 04-00", "CENTRO DE DIAGNOSTICO POR IMAGEM LTDA FILIAL 05-91", "CENTRO DE DIAGNOSTICO POR IMAGEM LTDA FILIAL 07-53", "CENTRO DE DIAGNOSTICO POR IMAGEM LTDA FILIAL 09-15", "CENTRO DE DIAGNOSTICO POR IMAGEM LTDA FILIAL 10-59", "CENTRO DE DIAGNOSTICO POR IMAGEM LTDA FILIAL 11-30", "CENTRO DE DIAGNOSTICO POR IMAGEM LTDA FILIAL 14-82", "CENTRO DE DIAGNOSTICO POR IMAGEM LTDA FILIAL 17-25", "CENTRO DE DIAGNOSTICO POR IMAGEM LTDA FILIAL 19-97", "CENTRO DE DIAGNOSTICO POR IMAGEM LTDA FILIAL 20-20", "CGA SERVICOS MEDICOS LTDA", "CGI - EMPREENDIMENTOS COMERCIAL LTDA", "CHAVE DE OURO EMPREENDIMENTOS IMOBILIARIOS EIRELI", "CHEL LTDA", "CHEQUER & COELHO LTDA", "CIA ITABIRITO INDUSTRIAL FIACAO E TECELAGEM DE ALGODAO", "CIAZA CONSTRUTORA LTDA", "CLAM CONSULTORIA LTDA", "CLAM ENGENHARIA LTDA", "CLAM ENGENHARIA LTDA FILIAL 03-00", "CLAM ESG LTDA", "CLAM MEIO AMBIENTE LTDA", "CLAM MEIO AMBIENTE LTDA FILIAL 02-49", "CLAM MONITORAMENTO AMBIENTAL LTDA", "CLAM MONITORAMENTO AMBIENTAL LTDA", "CLAM PARTICIPACOES E INVESTIMENTOS S/A", "CLINICA LEV SAVASSI LTDA", "CLINICA RADIOLOGICA ELDORADO LTDA", "CLINICA UNIAO SERVICOS MEDICOS LTDA", "COELHO CONVENIENCIA LTDA", "COELHO E PEREIRA EIRELI", "COLISEU SERVICOS ADMINISTRATIVOS LTDA", "COMERCIAL AVIAMENTOS LTDA", "COMERCIAL FOCCUS LTDA", "COMERCIAL GIULIANO LIMITADA", "COMERCIAL OLIVEIRA & BRANT LTDA", "COMERCIAL OLIVEIRA & BRANT LTDA", "COMERCIO LANCHE KARRAO LTDA", "CONSORCIO ENGEBRAS ILCON SES 0620240094", "CONSORCIO GERASUN SOLAR", "CONSTANTINO MATIAS NOGUEIRA - IMOVEIS", "CONSTANTINO MATIAS NOGUEIRA - PATRIMONIAL LTDA", "CONSTRUTORA AGMAR LTDA", "CONSTRUTORA AGMAR LTDA 07", "CONSTRUTORA AGMAR LTDA FILIAL 02-10", "CONSTRUTORA E INCORPORADORA SPLIT LTDA", "CONTABILIDADE LTDA", "CONVENIENCIA DOIS IRMAOS - EIRELI", "CONVENIENCIA DOIS IRMAOS LTDA", "CORRETORA DE SEGUROS BELO HORIZONTE LTDA", "CRISTAL VALLE ADMINISTRACAO LTDA", "CRISTAL VALLE INDUSTRIA E COMERCIO DE VIDROS LTDA", "CSV GESTAO PATRIMONIAL LTDA", "CVQ I SPE LTDA", "CVQ II SPE LTDA", "D.L.A. SERVICOS ADMINISTRATIVOS LTDA", "DEBURR COMERCIO DE COSMETICOS LTDA", "DEL PAPEIS LTDA", "DEL PAPEIS LTDA FILIAL 03-84", "DELMA - COMERCIO DE COMBUSTIVEIS LTDA", "DH ORIGINAL IMPORTACAO E EXPORTACAO LTDA", "DISTRIBUIDORA BIOCLIN DIAGNOSTICA LTDA", "DJB PARTICIPACOES LTDA", "DOBRAFLEX CORTE E DOBRA DE METAIS LTDA", "DVS PARTICIPACOES LTDA", "E.D. TECNOLOGIA DIGITAL BH LTDA", "EAGLE ADMINISTRACAO LTDA", "EDIFICIO REDE OFFICE I", "ELETROFERRAGENS RM EIRELI", "EMAG CONSTRUTORA LTDA", "EMAG CONSTRUTORA LTDA", "EMIS MINAS DISTRIBUIDORA DE PRODUTOS FARMACEUTICOS LTDA", "EMP - AVALIACAO EM RECURSOS HUMANOS LTDA", "EMPIRE DJB PATRIMONIAL LTDA", "ENERGY TRANSPORTES LTDA", "ENGEBRAS CONSTRUTORA LTDA", "ESMIG INDUSTRIA DE ESCADAS LTDA", "ESMIG INDUSTRIA DE ESCADAS LTDA FILIAL 03-89", "ESTACIONAMENTO AGMAR LTDA", "ESTACIONAMENTO AGMAR LTDA FILIAL 02-06", "ESTACIONAMENTO AGMAR LTDA FILIAL 03-89", "ESTACIONAMENTO AGMAR LTDA FILIAL 04-60", "ESTIVA PARTICIPACOES LTDA","EAT FRUTZ ALIMENTOS LTDA" , "EVELINE DE PAULA BARTELS", "EVERYBODY - CENTRO DE PERFORMANCE E FISIOTERAPIA LTDA", "EVOLUTION CONSULTORIA E GESTAO EMPRESARIAL S/A", "EXPRESSO FERRENSE LTDA", "FAST GESTAO DE RECURSOS LTDA", "FAST TEAM SERVICOS DE ESTETICA AUTOMOTIVA LTDA", "FASTPLOT SERVICOS DE ESTETICA AUTOMOTIVA LTDA", "FATIMA ADMINISTRACAO LTDA", "FCF CONSULTORIA LTDA", "FCK PREMOLDADOS LTDA FILIAL 02", "FCK PREMOLDADOS LTDA FILIAL 03", "FCK PREMOLDADOS LTDA", "FCK TRANSPORTES LTDA", "FEAG - FERRAGENS AGMAR PARA FACHADA EIRELI", "FERREIRA ADMINISTRACAO LTDA", "FERRO E ACO TAKONO LTDA", "FERRO E ACO TAKONO LTDA FILIAL 0028-03", "FERRO E ACO TAKONO LTDA FILIAL 06-06", "FERRO E ACO TAKONO LTDA FILIAL 07-89", "FERRO E ACO TAKONO LTDA FILIAL 08-60", "FERRO E ACO TAKONO LTDA FILIAL 10-84", "FERRO E ACO TAKONO LTDA FILIAL 11-65", "FERRO E ACO TAKONO LTDA FILIAL 12-46", "FERRO E ACO TAKONO LTDA FILIAL 13-27", "FERRO E ACO TAKONO LTDA FILIAL 14-08", "FERRO E ACO TAKONO LTDA FILIAL 15-99", "FERRO E ACO TAKONO LTDA FILIAL 16-70", "FERRO E ACO TAKONO LTDA FILIAL 18-31", "FERRO E ACO TAKONO LTDA FILIAL 19-12", "FERRO E ACO TAKONO LTDA FILIAL 20-56", "FERRO E ACO TAKONO LTDA FILIAL 21-37", "FERRO E ACO TAKONO LTDA FILIAL 22-18", "FERRO E ACO TAKONO LTDA FILIAL 23-07", "FERRO E ACO TAKONO LTDA FILIAL 24-80", "FERRO E ACO TAKONO LTDA FILIAL 25-60", "FERRO E ACO TAKONO LTDA FILIAL 26-41", "FERRO E ACO TAKONO LTDA FILIAL 27-22", "FIX MANUTENCAO PREDIAL LTDA", "FIX MANUTENCOES LTDA", "FLARA GESTAO PATRIMONIAL LTDA", "FMPL PARTICIPACOES LTDA", "FORTRESS GESTAO PARTICIPACOES LTDA", "FRADE PARTICIPACOES LTDA", "FS PROCESSAMENTO DE DADOS LTDA", "GAMA SERV LTDA", "GECORP GESTAO DE BENEFICIOS E CORRETORA DE SEGUROS LTDA", "GENETICENTER - CENTRO DE GENETICA LTDA", "GERTH CONSULTORIA E PROMOCOES DE VENDAS LTDA", "GFF ENGENHARIA LTDA", "GIBRALTAR HOLDING LTDA", "GIOVANNI CARLECH GUIMARAES MARQUEZANI", "GMAC ESTACIONAMENTOS LTDA", "GMB ASSESSORIA LTDA", "GNV SETE BELO LTDA", "GPK PARTICIPACOES LTDA", "GR COMBUSTIVEIS LTDA", "GRB INDUSTRIA E COMERCIO DE EQUIPAMENTOS LTDA", "GRB INDUSTRIA E COMERCIO DE EQUIPAMENTOS LTDA FILIAL 03-50", "GRB INDUSTRIA E COMERCIO DE EQUIPAMENTOS LTDA FILIAL 04-31", "GRB INDUSTRIA E COMERCIO DE EQUIPAMENTOS LTDA FILIAL 05-12", "GROUND GESTAO PATRIMONIAL LTDA", "GSC GESTAO PATRIMONIAL LTDA", "GUIMARAES & VIEIRA DE MELLO SOCIEDADE DE ADVOGADOS", "GUIMARAES E VIEIRA DE MELLO ADVOGADOS", "GVM ADMINISTRACAO E CONSULTORIA LTDA", "GVM CONSORCIO", "GVM CORRETORA DE SEGUROS LTDA", "GWS ENGENHARIA LTDA", "GWS TECH LTDA", "H.C.-COMERCIO DE ALIMENTOS LTDA 04", "H.C.-COMERCIO DE ALIMENTOS LTDA 05", "HAND SHOP SUPRIMENTOS MEDICOS E TERAPEUTICOS LTDA", "HC COMERCIO DE ALIMENTOS LTDA", "HC COMERCIO DE ALIMENTOS LTDA FILIAL 03-63", "HOLDING MAIS MABC LTDA", "HOTEL SAO BENTO LTDA", "HPX PARTICIPACOES LTDA", "HSP GESTAO PATRIMONIAL LTDA", "HVAR INCORPORACOES LTDA", "I9 GESTAO E PARTICIPACOES LTDA", "IB COMBUSTIVEL LTDA", "IB TRANSPORTES & EMPREENDIMENTOS LTDA", "INCONFIDENTES PARTICIPACOES LTDA", "INCORPORADORA MONTE VERDE SPE LTDA", "INDUSTRIA DE TRANSFORMADORES KING LIMITADA", "INFLUXO SOCIEDADE DE PROFISSIONAIS", "INSTITUTO PERSONA INTELIGENCIA EMOCIONAL LTDA", "INTERWEG ADM E CORRETORA DE SEGUROS LTDA", "INTERWEG CORRETORA DE SEGUROS E BENEFICIOS LTDA", "J.V.V. GESTAO PATRIMONIAL LTDA", "JACL PARTICIPACOES LTDA", "JARDINO MALL LTDA", "JCA SERVICOS DE RADIOLOGIA LTDA", "JCM PARTICIPACOES LTDA", "JHCL GESTAO PATRIMONIAL LTDA", "JJA LOCACOES LTDA", "JKV GESTAO PATRIMONIAL LTDA", "JPAMACEDO E PARTICIPACOES LTDA", "JR LAVA JATO EIRELI", "JVC PARTICIPACOES LTDA", "JVP GESTAO PATRIMONIAL LTDA", "K10 PARTICIPACOES LTDA", "KALAB LOPES GESTAO PATRIMONIAL LTDA", "KALAB NEGOCIOS IMOBILIARIOS LTDA", "L.O. IMPORT EXPORT LTDA", "LABORATORIO DE PATOLOGIA CIRURGICA E CITOPATOLOGIA LTDA", "LABORATORIO DE PATOLOGIA CIRURGICA E CITOPATOLOGIA LTDA FILIAL 03-44", "LETOM EMPREENDIMENTOS LTDA", "LGX - PARTICIPACOES E ADMINISTRACAO LTDA", "LINK INDUSTRIA E COMERCIO DE MAQUINAS PARA MINERACAO LTDA", "LINK INDUSTRIA E COMERCIO DE MAQUINAS PARA MINERACAO LTDA FILIAL 03-05", "LOCS LOCADORA DE VEICULOS LTDA", "LS ENTERPRISE SOLLUTIONS LTDA", "M A B COSTA LTDA", "M L SILVEIRA SERVICOS CORPORATIVOS EIRELI", "MADA CLINICA ODONTOLOGICA LTDA", "MAIS CONSTRUCOES LTDA", "MAIS NEGOCIOS E REPRESENTACOES LTDA", "MAQUINAS RABELLO ITABAYANA LIMITADA", "MAR UP CONSULTORIA GESTAO E REPRESENTACAO COMERCIAL LTDA", "MAR9 TRATAMENTO DE DADOS LTDA", "MARCHALENTA AUTO SERVICOS LTDA", "MARCHALIVRE SERVICOS E PECAS LTDA", "MARCO GRILLI COMERCIO DE OBJETOS DE ARTE LTDA", "MARIA CHEQUER PARTICIPACOES LTDA", "MARIA CHEQUER PATRIMONIAL LTDA", "MARIANA CARLECH GUIMARAES MARQUEZANI", "MARICABI GESTAO PATRIMONIAL LTDA", "MASSIME DISTRIBUIDORA DE MEDICAMENTOS LTDA", "MASTER AUTO POSTO LTDA", "MASTER EMPREENDIMENTOS E PARTICIPACOES LTDA", "MASTER PISOS MATERIAL DE CONSTRUCAO EIRELI", "MATTA NUNES REPRESENTACOES COMERCIAIS E GESTAO DE NEGOCIOS LTDA", "MAX GESTAO PATRIMONIAL LTDA", "MD EMPREENDIMENTOS S.A", "MEDWAY SOLUCOES PARA A SAUDE LTDA", "MENDONCA E FERREIRA PARTICIPACOES LTDA", "MENDONCA E FERREIRA PATRIMONIAL LTDA", "MENDONCA E FILHOS GESTAO PATRIMONIAL LTDA", "MENDONCA PARTICIPACOES LTDA", "MEROS GESTAO PATRIMONIAL LTDA", "MG CONVENIENCIA LTDA", "MG CONVENIENCIA LTDA FILIAL 02-57", "MICRONIC COMERCIO E INDUSTRIA LTDA", "MILENE GUIMARAES MARQUEZANI", "MINAS GERAIS ADMINISTRADORA DE IMOVEIS LTDA", "MINEIRAO POSTO DE SERVICOS LTDA", "MLM HOLDING EIRELI", "MM COMERCIO DE DERIVADOS DE PETROLEO LTDA", "MMORAES PARTICIPACOES LTDA", "MONTE VERDE EDIFICACOES I SPE LTDA", "MONTE VERDE URBANIZACOES SPE LTDA", "MP INCORPORACOES LTDA", "MRI MOVIMENTACAO E RECUPERACAO INDUSTRIAL LTDA", "MRLIZ CONSULTORIA LTDA", "MTL PARTICIPACOES LTDA", "MULT SERVICOS ADMINISTRATIVOS LTDA", "MWA PARTICIPACOES LTDA", "MWA PATRIMONIAL LTDA", "NACIONAL RENOVAVEIS LTDA", "NATUREZA X COMERCIO LTDA", "NOSSA OBRA VAREJO DIGITAL LTDA", "NRSM REFORMAS LTDA", "NVB SERVICOS LTDA", "OLE PARTICIPACOES LTDA", "OLIVEIRA SANTOS ADVOGADOS", "OPEN-5 LTDA", "OPEN-5 LTDA 02", "OPX PARTICIPACOES LTDA", "ORGANIZACAO COMERCIAL MARINHO LTDA", "ORGANIZACOES SOUKI EIRELI", "ORGANIZACOES SOUKI EIRELI FILIAL 03-32", "ORIENT AUTOMOVEIS PECAS E SERVICOS LTDA", "ORIENT AUTOMOVEIS PECAS E SERVICOS LTDA FILIAL 03-43", "ORIENT AUTOMOVEIS PECAS E SERVICOS LTDA FILIAL 04-24", "ORIENTE FARMACEUTICA COMERCIO IMPORTACAO E EXPORTACAO LTDA", "PADUA COMERCIO E INDUSTRIA LTDA", "PAIVA BRANT LTDA", "PAIVA EMPREENDIMENTOS E GESTAO DE IMOVEIS PROPRIOS LTDA", "PCFORYOU LTDA", "PEMAX INTERMEDIACAO E NEGOCIOS LTDA", "PERFORMANCE GESTAO EMPRESARIAL LTDA", "PETRODATA PROCESSAMENTO DE DADOS LTDA", "PLATAFORMA AM3 LTDA", "PNEUS JUA COMERCIO DE PNEUS LTDA", "PONTUAUTO CENTRO AUTOMOTIVO LTDA", "POP EMPREENDIMENTOS E PARTICIPACOES S/A", "POSTO AEROPORTO LTDA", "POSTO AGUIA COMERCIO DE COMBUSTIVEIS LTDA", "POSTO ALAMO LTDA", "POSTO ALLGAS LTDA", "POSTO AVENIDA BRASIL COMERCIO DE COMBUSTIVEIS LTDA", "POSTO BALNEARIO AGUA LIMPA LTDA", "POSTO BARAO VPP LTDA", "POSTO BERIMBAU LTDA", "POSTO BURITIS LTDA", "POSTO CATEDRAL LTDA", "POSTO CENTER NORTE LTDA", "POSTO COELHO LTDA", "POSTO DANUBIO LTDA", "POSTO DE COMBUSTIVEIS CENTER SUL LTDA", "POSTO DE COMBUSTIVEIS SANTO AGOSTINHO LTDA", "POSTO DE COMBUSTIVEL PETROLANDIA LTDA", "POSTO DE COMBUSTIVEL VILA CRUZEIRO LIMITADA", "POSTO ESTORIL LTDA", "POSTO FORMULA BR LTDA", "POSTO HUGO WERNECK LTDA", "POSTO IPE COMERCIO DE COMBUSTIVEIS LTDA", "POSTO IRMAOS AULER LTDA", "POSTO JUPITER LTDA", "POSTO LESTE LTDA", "POSTO MARIO WERNECK LIMITADA", "POSTO MAURITANIA LTDA", "POSTO MINAS SHOPPING LTDA", "POSTO MINASLANDIA LTDA", "POSTO MONTE VERDE LTDA", "POSTO MUSTANG LTDA", "POSTO NOGUEIRINHA LTDA", "POSTO OCEANO AZUL LTDA", "POSTO OCEANO LTDA", "POSTO PANAMERA LTDA", "POSTO PARQUE BURITIS LTDA", "POSTO PARQUE JARDIM LTDA", "POSTO PICA PAU LTDA", "POSTO POETA LTDA", "POSTO PORTAL DE BETIM LTDA", "POSTO PORTAL DE CONTAGEM LTDA", "POSTO PORTAL DOS CAICARAS LTDA", "POSTO SIGMA LTDA", "POSTO SOBERANO AUTORAMA LTDA", "POSTO SOBERANO KARRAO LTDA", "POSTO SOBERANO SETE DE SETEMBRO LTDA", "POSTO TATIANA LTDA", "POSTO TROVAO LTDA", "POSTO VIA FERNAO DIAS LTDA", "POSTO VILA CHALE LTDA", "POSTO VILA DA SERRA LTDA", "POSTO VILA PICA PAU LTDA", "POSTO ZEPPE GRAND PRIX LTDA", "POSTO ZEPPE MG LTDA", "POSTO ZEPPE OASIS LTDA", "POSTO ZEPPE SAO JOSE LTDA", "POSTO ZEPPELIN LTDA", "PPML INDUSTRIA E COMERCIO DE ROUPAS EIRELI", "PRESERVAR PARTICIPACOES LTDA", "PRIMA LINEA AUTOMOVEIS LTDA", "PRIMOLA FRAGRANCIAS LTDA FILIAL 04-30", "PROFIT FOODS LTDA", "PROJETOUM COMERCIO E REPRESENTACOES LTDA", "PROJETOUM COMERCIO E REPRESENTACOES LTDA FILIAL 0002-27", "PROPELLER LTDA", "PROSERVICE LTDA", "PROSPECTIVA SOCIEDADE DE PROFISSIONAIS", "PURA SAUDE ALIMENTOS LTDA", "PURA SAUDE ALIMENTOS LTDA FILIAL 02-88", "QUADRIJET ALPHAVILLE COMERCIO LTDA", "QUEOPZ GESTAO PATRIMONIAL LTDA", "QUIBASA QUIMICA BASICA LTDA", "QUIBASA QUIMICA BASICA LTDA FILIAL 02-98", "QUIBASA QUIMICA BASICA LTDA FILIAL 03-79", "QUICK CONVENIENCIAS LTDA", "QUICK LUBE COMERCIO DE PRODUTOS E FRANQUIAS LTDA", "RACCO EQUIPAMENTOS E SERVICOS EIRELI", "RACCO SERVICOS DE PUBLICIDADE E COMUNICACAO LTDA", "RC INVEST PARTICIPACOES LTDA", "RECICLAGEM PASSARELA LTDA", "REDE A PUBLICIDADE E PROPAGANDA LTDA", "REDE OFFICE INCORPORACOES LTDA", "RESIDENCIAL ANDORINHAS SPE LTDA", "RESIDENCIAL PACIFICO RIBEIRAO DAS NEVES SPE LTDA", "RESIDENCIAL PACIFICO RIBEIRAO DAS NEVES SPE LTDA FILIAL 02-72", "RESIDENCIAL VILA AMAZONAS SPE LTDA","RESIDENCIAL VILA AMAZONAS SPE LTDA FILIAL 02-91", "RESIDENCIAL VILA ATLANTICO SABARA SPE LTDA", "RESIDENCIAL VILA ATLANTICO SABARA SPE LTDA", "RESIDENCIAL VILA CONCEICAO SPE LTDA", "RESIDENCIAL VILA CONCEICAO SPE LTDA FILIAL 02-01", "RESIDENCIAL VILA MORGANTI I SCP", "RESIDENCIAL VILA MORGANTI I SPE LTDA", "RESIDENCIAL VILA MORGANTI I SPE LTDA FILIAL 02-05", "RESIDENCIAL VILA SAO JOSE I SPE LTDA", "RESIDENCIAL VILA SAO JOSE I SPE LTDA FILIAL 02-64", "RESIDENCIAL VILA SAO JOSE II SPE LTDA", "RESIDENCIAL VILA SAO JOSE II SPE LTDA FILIAL 0002-01", "RESIDENCIAL VILA SAO JOSE SCP", "RETES IMAGENS SERVICOS E CONSULTORIA LTDA", "RFX ADMINISTRACAO DE RECURSOS LTDA", "RFX CONSULTORIA E GESTAO DE NEGOCIOS LTDA", "RFX DISTRIBUIDORA DE PRODUTOS AUTOMOTIVOS LTDA", "RFX GESTAO PATRIMONIAL LTDA", "RFX LOGISTICA E TRANSPORTES DE COMBUSTIVEIS LTDA", "RFX TREINAMENTO PROFISSIONAL LTDA", "RGGC EMPREENDIMENTOS LTDA", "RH CENTRO DE SAUDE LTDA", "RICARDO SANTOS BRANT", "ROCKET GESTAO PATRIMONIAL LTDA", "ROL COMERCIO DE DERIVADOS DE PETROLEO LTDA", "RPB COMERCIO DE COMBUSTIVEL LTDA", "RSM COMERCIO E GERENCIAMENTO DE RESIDUOS GUAXUPE EIRELI", "SAINT EMILION AUTOMOVEIS PECAS E SERVICOS LTDA", "SAINT EMILION AUTOMOVEIS PECAS E SERVICOS LTDA", "SAINT EMILION AUTOMOVEIS PECAS E SERVICOS LTDA", "SAINT EMILION AUTOMOVEIS PECAS E SERVICOS LTDA", "SANTA CLARA AGROPECUARIA LTDA", "SANTA MARIA ECOLOGIC EQUIPAMENTOS LTDA", "SANTA MARIA ECOLOGIC LTDA", "SANTA MARIA ECOLOGIC 02", "SANTA MARIA ECOLOGIC 04", "SANTA MARIA ECOLOGIC 05", "SANTA MARIA ECOLOGIC 06", "SANTA MARIA ECOLOGIC 08", "SANTA MARIA ECOLOGIC 09", "SANTA MARIA ECOLOGIC 10", "SANTA MARIA ECOLOGIC 11", "SANTA MARIA ECOLOGIC 13", "SANTA MARIA ECOLOGIC 14", "SANTA MARIA ECOLOGIC 15", "SANTA MARIA ECOLOGIC RESIDUOS LTDA", "SANTORINI POSTO DE SERVICOS LTDA", "SARAMENHA ENGENHARIA LTDA", "SCP AUDITORIA DE IMPOSTOS E CONTRIBUICOES", "SCP CLAM ENGENHARIA LTDA", "SCP CLINICA RADIOLOGICA ELDORADO LTDA", "SCP DIAGNOSTICO BETIMBARREIRO LTDA", "SCP RESIDENCIAL VILA CONCEICAO", "SCP VILA PACIFICO SANCRUZA", "SE LOTEAMENTOS LTDA", "SETEC- CONSULTORIA EMPRESARIAL LTDA", "SICAL INDUSTRIAL LTDA", "SIMEX ENTREGAS E MOVIMENTACAO DE CARGAS LTDA", "SIX TRACKS LTDA", "SOBERANO LOJAS DE CONVENIENCIA LTDA", "SOBERANO LUBRIFICANTES LTDA", "SOBERANO SERVICOS LTDA", "SOBERANO TRANSPORTES LTDA", "SOLAR VOLT SOLUCOES COMERCIO E INSTALACAO PARA ENERGIA LTDA", "SOLUCAO CORTE E DOBRA DE METAIS LTDA", "SOLVE OPERACAO, MANUTENCAO E COMISSIONAMENTO DE SISTEMAS FOTOVOLTAICOS LTDA", "SOLVIA SOLUCOES VIARIAS LTDA", "SP IMPORTS LTDA", "SP IMPORTS LTDA FILIAL 02-70", "SP IMPORTS LTDA FILIAL 03-50", "SPE JARDINS DOS BURITIS LTDA", "SPE JARDINS DOS BURITIS LTDA FILIAL 02-60", "SPE LA BRESSE LTDA", "SPE MARIA FAUSTINA LTDA", "SPE MIRANTE DO LAGO SETE LAGOAS LTDA", "SSME EMPREENDIMENTOS IMOBILIARIOS LTDA FILIAL 02-76", "SSME EMPREENDIMENTOS IMOBILIARIOS LTDA", "SSME FLORESTAL LTDA", "SSME FLORESTAL LTDA FILIAL 0002-43", "SSME FLORESTAL LTDA FILIAL 0003-24", "SSME FLORESTAL LTDA FILIAL 0005-96", "SSME FLORESTAL LTDA FILIAL 0006-77", "SSME FLORESTAL LTDA FILIAL 0007-58", "SSME FLORESTAL LTDA FILIAL 0008-39", "SSME FLORESTAL LTDA FILIAL 0009-10", "SSME FLORESTAL LTDA FILIAL 0010-53", "SSME FLORESTAL LTDA FILIAL 0011-34", "SSME FLORESTAL LTDA FILIAL 0012-15", "SSME FLORESTAL LTDA FILIAL 0013-04", "SSME FLORESTAL LTDA FILIAL 0014-87", "SUDESTE ADMINISTRADORA DE SERVICOS LTDA", "SUDESTE ENGENHARIA E COMERCIO LTDA", "SUDESTE ENGENHARIA E COMERCIO LTDA FILIAL 02-39", "SUDESTE ENGENHARIA E COMERCIO LTDA FILIAL 03-10", "SUDESTE PARTICIPACOES LTDA", "SV LOGISTICA LTDA", "SV RANCHO VELHO GERACAO DE ENERGIA SPE LTDA", "SWA PARTICIPACOES LTDA", "SWA PATRIMONIAL LTDA", "TAKONO DISTRIBUICAO LTDA", "TASK SOFTWARE LTDA", "TAX CLOUD SOLUCOES LTDA", "TCX COMERCIO E INDUSTRIA DE EQUIPAMENTOS PECAS E SERVICOS LTDA", "TEBAS ADMINISTRACAO LTDA", "TECHNEACO ENGENHARIA LTDA", "TECHNEACO ENGENHARIA LTDA FILIAL 02-58", "TECNOCAP RECAPAGEM E PNEUS LTDA", "THAISSA CALAB CURSOS LTDA", "THAISSA CALAB ODONTOLOGIA LTDA", "TIMBIRAS PARTICIPACOES LTDA", "TK LOCACAO DE EQUIPAMENTOS LTDA", "TK PATRIMONIAL LTDA", "TLUANER PARTICIPACOES S/A", "TMJ MARCA E PATENTE LTDA", "TOP RAJA CAR LOCADORA DE VEICULOS LTDA", "TOPAZIO IMPERIAL MINERACAO COMERCIO E INDUSTRIA LTDA", "TRANSPORTADORA DONIZETE LTDA", "TRANSPORTES BOA VISTA LOGISTICA LTDA", "TRIACO ESTRUTURAS METALICAS LTDA", "TURMALINA INCORPORACOES SPE LTDA", "USA DIAGNOSTICA LTDA", "VALADAO E SANTOS PARTICIPACOES LTDA", "VALUMA COBRANCA E NEGOCIOS LTDA", "VCA COMERCIO LTDA", "VCS COMERCIO LTDA", "VEIGA ESTRUTURAS METALICAS LTDA", "VENETO EMPREENDIMENTO COMERCIAL LTDA", "VEREDAS DA SERRA COMBUSTIVEL LTDA", "VERO LATTE COMERCIO DE ALIMENTOS LTDA", "VERO LATTE COMERCIO DE ALIMENTOS LTDA", "VERO LATTE COMERCIO DE ALIMENTOS LTDA", "VIA MONDO APS LTDA", "VIA MONDO APS LTDA", "VIA MONDO AUTOMOVEIS E PECAS LTDA", "VIA MONDO AUTOMOVEIS E PECAS LTDA", "VIA MONDO AUTOMOVEIS E PECAS LTDA", "VIA MONDO AUTOMOVEIS E PECAS LTDA", "VIA MONDO AUTOMOVEIS E PECAS LTDA", "VIA MONDO AUTOMOVEIS E PECAS LTDA", "VIA MONDO AUTOMOVEIS E PECAS LTDA", "VIA MONDO AUTOMOVEIS E PECAS LTDA", "VIA MONDO AUTOMOVEIS E PECAS LTDA - FILIAL 08-80", "VIA MONDO AUTOMOVEIS E PECAS LTDA - FILIAL 09-61", "VIA MONDO DISTRIBUIDORA DE PECAS E ACESSORIOS AUTOMOTIVOS LTDA",  "VIA MONDO DISTRIBUIDORA DE PECAS E ACESSORIOS AUTOMOTIVOS LTDA", "VIA MONDO FANDI LTDA", "VIA MONDO LOCADORA LTDA", "VIA MONDO LOCADORA LTDA FILIAL 02-94", "VIA MONDO LOCADORA LTDA FILIAL 03-75", "VIA MONDO MULTIMARCAS LTDA", "VIA MONDO TRANSPORTES LTDA", "VIEIRA ADMINISTRACAO LTDA", "VILA CLARA VITORIA LTDA", "VJ PARTICIPACOES LTDA", "VJ PATRIMONIAL LTDA", "VN EMPREENDIMENTOS LTDA", "VSX VALVULAS E EQUIPAMENTOS LTDA", "WOLF PARTICIPACOES S/A", "WRN PARTICIPACOES LTDA", "ZOX GESTAO PATRIMONIAL LTDA"]
-
-# Lista de funcionalidades disponíveis
-lista_funcionalidades = ["Página Inicial" , "Chat" , "Organizar Arquivos Fiscais", "Controle Importação", "Registros Importação", "Indicadores", "Configurações"]
-
-# Função para hashear senha
-def hash_password(password):
-    return hashlib.sha256(password.encode()).hexdigest()
+# Executar a inicialização (usuário administrador e colunas) uma única vez por processo
+if not inicializar_uma_vez(supabase):
+    st.error("❌ Erro na inicialização do banco de dados. Verifique os logs do servidor.")
 
-# Dados do usuário padrão
-username = "JHENNIFER"
-nova_senha = hash_password("Refinnehj262")
-novas_empresas = ",".join(lista_empresas)
-novas_permissoes = ",".join(lista_funcionalidades)
-
-# Verificar se o usuário existe e criar/atualizar se necessário
-response = supabase.table("users").select("*").eq("username", username).execute()
-
-if not response or (hasattr(response, 'error') and response.error):
-    st.error(f"❌ Erro ao verificar usuário: {response.error.message if hasattr(response, 'error') else 'Erro desconhecido'}")
-else:
-    if not response.data:
-        # Usuário não encontrado, criar um novo
-        insert_response = supabase.table("users").insert({
-            "username": username,
-            "password": nova_senha,
-            "empresas": novas_empresas,
-            "permissoes": novas_permissoes
-        }).execute()
-        
-        if not insert_response or (hasattr(insert_response, 'error') and insert_response.error):
-            st.error(f"❌ Erro ao criar usuário: {insert_response.error.message if hasattr(insert_response, 'error') else 'Erro desconhecido'}")
-        else:
-            print("Novo usuário criado com sucesso!")
-    else:
-        # Usuário encontrado, atualizar dados
-        update_response = supabase.table("users").update({
-            "empresas": novas_empresas,
-            "permissoes": novas_permissoes
-        }).eq("username", username).execute()
-        
-        if not update_response or (hasattr(update_response, 'error') and update_response.error):
-            st.error(f"❌ Erro ao atualizar usuário: {update_response.error.message if hasattr(update_response, 'error') else 'Erro desconhecido'}")
-        else:
-            print("Usuário atualizado com sucesso!")
-
-def check_and_add_columns():
-    response = supabase.rpc("get_columns", {"p_table_name": "users"}).execute()
-    columns = [col["column_name"] for col in response.data]
-
-    # Adicionar colunas se não existirem
-    if "empresas" not in columns:
-        supabase.postgrest.rpc("alter_p_table_name_users", {"query": "ALTER p_table_name users ADD COLUMN empresas TEXT DEFAULT ''"}).execute()
-    if "permissoes" not in columns:
-        supabase.postgrest.rpc("alter_p_table_name_users", {"query": "ALTER p_table_name users ADD COLUMN permissoes TEXT DEFAULT ''"}).execute()
-
-# Executar verificação e alteração
-check_and_add_columns()
-print("Verificação concluída!")
+# Ligar o tempo real (variável TEMPO_REAL), também uma única vez por processo
+tempo_real_ativo = iniciar_tempo_real(url, key)
 
 # Função para adicionar ou atualizar usuário no Supabase
 def save_user(username, password, empresas, permissoes):
@@ -169,6 +170,11 @@ def save_user(username, password, empresas, permissoes):
                 st.error(f"❌ Erro ao inserir usuário: {insert_response.error.message if hasattr(insert_response, 'error') else 'Erro desconhecido'}")
                 return False
 
+        # Empresas do usuário pelo id (a coluna users.empresas continua gravada para as políticas antigas)
+        definir_empresas_usuario(supabase, username, ids_das_empresas(supabase, separar_lista(empresas)))
+
+        invalidar_cache("users")
+        marcar_usuario_alterado(username)
         return True
     except Exception as e:
         st.error(f"❌ Erro ao salvar usuário: {str(e)}")
@@ -177,12 +183,15 @@ def save_user(username, password, empresas, permissoes):
 # Função para excluir usuário do Supabase
 def delete_user(username):
     try:
+        definir_empresas_usuario(supabase, username, [])
         delete_response = supabase.table("users").delete().eq("username", username).execute()
 
         if not delete_response or (hasattr(delete_response, 'error') and delete_response.error):
             st.error(f"❌ Erro ao excluir usuário: {delete_response.error.message if hasattr(delete_response, 'error') else 'Erro desconhecido'}")
             return False
 
+        invalidar_cache("users")
+        marcar_usuario_alterado(username)
         return True
     except Exception as e:
         st.error(f"❌ Erro ao excluir usuário: {str(e)}")
@@ -191,17 +200,26 @@ def delete_user(username):
 # Função para validar login no Supabase
 def validate_login(username, password):
     try:
-        response = supabase.table("users").select("password, empresas, permissoes").eq("username", username).execute()
+        response = supabase.table("users").select("password, permissoes").eq("username", username).execute()
         
         if not response or (hasattr(response, 'error') and response.error):
             st.error(f"❌ Erro ao validar login: {response.error.message if hasattr(response, 'error') else 'Erro desconhecido'}")
             return False
 
         user_data = response.data[0] if response.data else None
-
-        if user_data and user_data["password"] == hash_password(password):
-            st.session_state.empresas = user_data["empresas"].split(",") if user_data["empresas"] else []
-            st.session_state.permissoes = user_data["permissoes"].split(",") if user_data["permissoes"] else []
+        if not user_data:
+            return verificar_senha_ficticia(password)
+
+        if verificar_senha(password, user_data["password"]):
+            # Refazer o hash de senhas antigas (SHA-256) ou com custo diferente do atual
+            if precisa_rehash(user_data["password"]):
+                try:
+                    supabase.table("users").update({"password": hash_password(password)}).eq("username", username).execute()
+                except Exception:
+                    pass  # A senha continua valendo; o hash é refeito no próximo login
+            
+            # Abrir a sessão com um token assinado que leva os ids das empresas e as permissões do usuário
+            iniciar_sessao(supabase, username, empresas_do_usuario(supabase, username), separar_lista(user_data["permissoes"]))
             return True
 
         return False
@@ -210,22 +228,23 @@ def validate_login(username, password):
         return False
 
 # Tela de Login
-if "logged_in" not in st.session_state:
-    st.session_state.logged_in = False
-
-if not st.session_state.logged_in:
+# A sessão é validada a cada execução só pela assinatura do token, sem consultar a tabela users;
+# empresas e permissões são relidas do banco em segundo plano de tempos em tempos.
+if not validar_sessao(supabase):
     st.title("Login")
     username = st.text_input("Nome de usuário")
     password = st.text_input("Senha", type="password")
     if st.button("Entrar"):
         if validate_login(username, password):
-            st.session_state.logged_in = True
-            st.session_state.username = username
             st.rerun()
         else:
             st.error("Usuário ou senha incorretos!")
     st.stop()
 
+if st.sidebar.button("Sair"):
+    encerrar_sessao()
+    st.rerun()
+
 # Menu restrito conforme permissões do usuário
 menu_options = [option for option in lista_funcionalidades if option in st.session_state.permissoes]
 menu = st.sidebar.selectbox("Escolha a funcionalidade", menu_options)
@@ -238,6 +257,21 @@ if menu == "Configurações":
         st.error("Apenas o administrador pode acessar esta página.")
         st.stop()
     
+    # Cadastrar empresas novas no catálogo (ficam associadas ao administrador)
+    with st.form("add_empresa_form"):
+        nova_empresa = st.text_input("Nova empresa")
+        if st.form_submit_button("🏢 Cadastrar Empresa") and nova_empresa.strip():
+            try:
+                cadastrar_empresas(supabase, [nova_empresa])
+                empresas_admin = ",".join(dict.fromkeys(st.session_state.empresas + [nova_empresa.strip()]))
+                if save_user(st.session_state.username, None, empresas_admin, ",".join(st.session_state.permissoes)):
+                    st.success(f"Empresa {nova_empresa.strip()} cadastrada com sucesso!")
+            except Exception as e:
+                st.error(f"❌ Erro ao cadastrar empresa: {str(e)}")
+    
+    # Empresas do novo usuário, com busca no catálogo (fora do formulário para filtrar enquanto se digita)
+    empresas_novo_usuario = selecionar_empresas(supabase, "Empresas associadas", "empresas_novo_usuario")
+    
     with st.form("add_user_form"):
         new_username = st.text_input("Usuário")
         new_password = st.text_input("Senha (deixe em branco para não alterar)", type="password")
@@ -245,9 +279,9 @@ if menu == "Configurações":
         # Adicionar checkbox para selecionar todas as empresas
         todas_empresas = st.checkbox("Selecionar todas as empresas")
         if todas_empresas:
-            empresas_selecionadas = lista_empresas
+            empresas_selecionadas = todas_as_empresas(supabase)
         else:
-            empresas_selecionadas = st.multiselect("Empresas associadas", lista_empresas)
+            empresas_selecionadas = empresas_novo_usuario
             
         permissoes_selecionadas = st.multiselect("Funcionalidades permitidas", lista_funcionalidades)
         empresas_str = ",".join(empresas_selecionadas)
@@ -257,16 +291,29 @@ if menu == "Configurações":
         if save_button and new_username:
             if save_user(new_username, new_password, empresas_str, permissoes_str):
                 st.success("Usuário salvo com sucesso!")
+                st.session_state.pop("empresas_novo_usuario", None)
                 st.rerun()
             else:
                 st.error("Erro ao salvar usuário!")
     
     # Exibir usuários cadastrados
     st.subheader("Usuários Cadastrados")
+    busca_usuarios = st.text_input("Buscar usuário", placeholder="Digite parte do nome do usuário").strip()
+    
+    # Voltar para a primeira página sempre que a busca mudar
+    if st.session_state.get("filtro_usuarios") != busca_usuarios:
+        st.session_state.filtro_usuarios = busca_usuarios
+        st.session_state.cursores_usuarios = [None]
+    
+    # Usuários marcados para a alteração em lote (continuam marcados ao trocar de página)
+    usuarios_selecionados = st.session_state.setdefault("usuarios_selecionados", set())
 
-    # Buscar usuários no Supabase
-    response = supabase.table("users").select("username, empresas, permissoes").execute()
-    users = response.data
+    # Buscar só a página atual, a partir do último usuário da página anterior
+    try:
+        users, tem_mais_usuarios = buscar_pagina_usuarios(supabase, busca_usuarios, st.session_state.cursores_usuarios[-1])
+    except Exception as e:
+        st.error(f"❌ Erro ao buscar usuários: {str(e)}")
+        users, tem_mais_usuarios = [], False
 
     # Exibir usuários em um formato mais compacto
     for user in users:
@@ -274,12 +321,16 @@ if menu == "Configurações":
             col1, col2 = st.columns([3, 1])
             with col1:
                 st.write("**Empresas:**")
-                empresas_list = user['empresas'].split(',') if user['empresas'] else []
-                st.write(f"{len(empresas_list)} empresas associadas")
+                st.write(f"{user['total_empresas']} empresas associadas")
                 
                 st.write("**Permissões:**")
-                permissoes_list = user['permissoes'].split(',') if user['permissoes'] else []
+                permissoes_list = separar_lista(user['permissoes'])
                 st.write(f"{len(permissoes_list)} permissões")
+                
+                if st.checkbox("Selecionar para alteração em lote", value=user['username'] in usuarios_selecionados, key=f"sel_{user['username']}"):
+                    usuarios_selecionados.add(user['username'])
+                else:
+                    usuarios_selecionados.discard(user['username'])
             
             with col2:
                 if st.button("✏️ Editar", key=f"edit_{user['username']}"):
@@ -289,12 +340,66 @@ if menu == "Configurações":
                 if st.button("🗑️ Remover", key=f"del_{user['username']}"):
                     if delete_user(user['username']):
                         st.success(f"Usuário {user['username']} removido com sucesso!")
+                        usuarios_selecionados.discard(user['username'])
                         st.rerun()
+    
+    # Paginação
+    col_anterior, col_pagina, col_proxima = st.columns([1, 2, 1])
+    with col_pagina:
+        st.write(f"Página {len(st.session_state.cursores_usuarios)}")
+    with col_anterior:
+        if len(st.session_state.cursores_usuarios) > 1 and st.button("⬅ Anterior", key="usuarios_anterior"):
+            st.session_state.cursores_usuarios.pop()
+            st.rerun()
+    with col_proxima:
+        if tem_mais_usuarios and st.button("Próxima ➡", key="usuarios_proxima"):
+            st.session_state.cursores_usuarios.append(users[-1]["username"])
+            st.rerun()
+    
+    # Alteração em lote: inclui/remove empresas e funcionalidades de vários usuários num único comando
+    with st.expander("⚡ Alteração em lote", expanded=False):
+        alvo_lote = st.radio(
+            "Usuários alterados",
+            [f"Selecionados ({len(usuarios_selecionados)})", "Todos os usuários da busca"],
+            horizontal=True,
+            help="Com a busca vazia, todos os usuários são alterados."
+        )
+        incluir_empresas_lote = selecionar_empresas(supabase, "Empresas a incluir", "lote_incluir_empresas")
+        remover_empresas_lote = selecionar_empresas(supabase, "Empresas a remover", "lote_remover_empresas")
+        
+        with st.form("alteracao_lote_form"):
+            incluir_permissoes_lote = st.multiselect("Funcionalidades a conceder", lista_funcionalidades)
+            remover_permissoes_lote = st.multiselect("Funcionalidades a retirar", lista_funcionalidades)
+            
+            if st.form_submit_button("Aplicar alteração em lote"):
+                usernames_lote = sorted(usuarios_selecionados) if alvo_lote.startswith("Selecionados") else None
+                if usernames_lote == []:
+                    st.warning("Selecione ao menos um usuário na lista acima.")
+                else:
+                    try:
+                        alterados = alterar_acessos_em_lote(
+                            supabase,
+                            usernames_lote,
+                            busca_usuarios,
+                            ids_das_empresas(supabase, incluir_empresas_lote),
+                            ids_das_empresas(supabase, remover_empresas_lote),
+                            incluir_permissoes_lote,
+                            remover_permissoes_lote
+                        )
+                        for alterado in alterados:
+                            marcar_usuario_alterado(alterado)
+                        st.success(f"✅ {len(alterados)} usuário(s) alterado(s).")
+                    except Exception as e:
+                        st.error(f"❌ Erro na alteração em lote: {str(e)}")
 
     # Formulário de edição
     if "editing_user" in st.session_state:
         st.subheader("✏️ Editar Usuário")
         user = st.session_state.editing_user
+        chave_empresas_edicao = f"empresas_edicao_{user['username']}"
+        if chave_empresas_edicao not in st.session_state:
+            st.session_state[chave_empresas_edicao] = nomes_das_empresas(supabase, empresas_do_usuario(supabase, user['username']))
+        empresas_edicao = selecionar_empresas(supabase, "Empresas associadas", chave_empresas_edicao)
         
         with st.form("edit_user_form"):
             edit_username = st.text_input("Usuário", value=user['username'], disabled=True)
@@ -303,9 +408,9 @@ if menu == "Configurações":
             # Adicionar checkbox para selecionar todas as empresas
             todas_empresas = st.checkbox("Selecionar todas as empresas")
             if todas_empresas:
-                empresas_selecionadas = lista_empresas
+                empresas_selecionadas = todas_as_empresas(supabase)
             else:
-                empresas_selecionadas = st.multiselect("Empresas associadas", lista_empresas, default=user['empresas'].split(',') if user['empresas'] else [])
+                empresas_selecionadas = empresas_edicao
                 
             permissoes_selecionadas = st.multiselect("Funcionalidades permitidas", lista_funcionalidades, default=user['permissoes'].split(',') if user['permissoes'] else [])
             
@@ -317,6 +422,7 @@ if menu == "Configurações":
                     if save_user(edit_username, edit_password, empresas_str, permissoes_str):
                         st.success("Usuário atualizado com sucesso!")
                         del st.session_state.editing_user
+                        st.session_state.pop(chave_empresas_edicao, None)
                         st.rerun()
                     else:
                         st.error("Erro ao atualizar usuário!")
@@ -324,21 +430,24 @@ if menu == "Configurações":
             with col2:
                 if st.form_submit_button("❌ Cancelar"):
                     del st.session_state.editing_user
+                    st.session_state.pop(chave_empresas_edicao, None)
                     st.rerun()
 
+    # Números do cache de anexos em disco, para ajustar CACHE_ANEXOS_MB
+    with st.expander("📦 Cache de anexos", expanded=False):
+        estatisticas_anexos = estatisticas_cache_anexos()
+        consultas_anexos = estatisticas_anexos["acertos"] + estatisticas_anexos["faltas"]
+        col1, col2, col3, col4 = st.columns(4)
+        col1.metric("Acertos", estatisticas_anexos["acertos"], f"{estatisticas_anexos['acertos'] / consultas_anexos:.0%}" if consultas_anexos else None)
+        col2.metric("Faltas", estatisticas_anexos["faltas"])
+        col3.metric("Descartes", estatisticas_anexos["descartes"])
+        col4.metric("Ocupação", f"{estatisticas_anexos['bytes'] / 1024 / 1024:.1f} MB", f"de {estatisticas_anexos['maximo_bytes'] / 1024 / 1024:.0f} MB", delta_color="off")
+
 #Organizador de Arquivos Fiscais
 def create_bucket_if_not_exists():
     try:
-        # Try to list buckets to check if 'arquivos' exists
-        buckets = supabase.storage.list_buckets()
-        bucket_exists = False
-        
-        for bucket in buckets:
-            if isinstance(bucket, dict) and bucket.get('name') == 'arquivos':
-                bucket_exists = True
-                break
-        
-        if not bucket_exists:
+        # Verificar se o bucket 'arquivos' existe (consultado uma vez por processo)
+        if not bucket_existe(supabase, 'arquivos'):
             st.error("❌ O bucket 'arquivos' não existe. Por favor, crie o bucket manualmente no Supabase.")
             return False
             
@@ -406,126 +515,44 @@ def verificar_arquivo(arquivo):
     except Exception as e:
         return False
 
-def verificar_conteudo_arquivo(conteudo):
-    try:
-        # Converter para string se for bytes
-        if isinstance(conteudo, bytes):
-            conteudo = conteudo.decode('utf-8', errors='ignore')
-        
-        # Verificar tipo de documento
-        if "NFe" in conteudo:
-            return "NFE"
-        elif "CTe" in conteudo:
-            return "CTE"
-        elif "NFCe" in conteudo:
-            return "NFCE"
-        elif "SPED" in conteudo or "|C100|" in conteudo or "|C170|" in conteudo:
-            return "SPED"
-        elif "NFSe" in conteudo or "nfse" in conteudo.lower():
-            return "NFS"
-        elif any(ext in conteudo.lower() for ext in [".xls", ".xlsx", "csv"]):
-            return "PLANILHA"
-        else:
-            return "OUTROS"
-    except Exception:
-        return "OUTROS"
-
 def processar_arquivos(uploaded_files, nome_empresa):
     if not nome_empresa:
         st.error("Por favor, digite o nome da empresa antes de processar os arquivos.")
         return
     
+    if aviso_workers_organizador:
+        st.warning(f"⚠️ {aviso_workers_organizador} Usando um processo por núcleo.")
+
     try:
-        # Criar diretório temporário
-        temp_dir = os.path.join(os.getcwd(), "temp_uploads")
-        os.makedirs(temp_dir, exist_ok=True)
-        
-        # Criar pasta da empresa
-        pasta_empresa = os.path.join(temp_dir, nome_empresa)
-        os.makedirs(pasta_empresa, exist_ok=True)
-        
-        for arquivo in uploaded_files:
-            try:
-                # Ler o conteúdo do arquivo
-                conteudo = arquivo.read()
-                
-                if arquivo.name.endswith(".zip"):
-                    # Criar arquivo ZIP temporário
-                    zip_path = os.path.join(temp_dir, arquivo.name)
-                    with open(zip_path, "wb") as f:
-                        f.write(conteudo)
-                    
-                    # Extrair ZIP
-                    with zipfile.ZipFile(zip_path, 'r') as zip_ref:
-                        # Processar cada arquivo dentro do ZIP
-                        for zip_info in zip_ref.filelist:
-                            if not zip_info.filename.endswith('/'):  # Ignorar diretórios
-                                try:
-                                    # Ler o conteúdo do arquivo do ZIP
-                                    conteudo_zip = zip_ref.read(zip_info.filename)
-                                    categoria = verificar_conteudo_arquivo(conteudo_zip)
-                                    
-                                    # Criar pasta da categoria
-                                    pasta_categoria = os.path.join(pasta_empresa, categoria)
-                                    os.makedirs(pasta_categoria, exist_ok=True)
-                                    
-                                    # Salvar arquivo
-                                    nome_arquivo = f"{datetime.now().strftime('%Y%m%d_%H%M%S')}_{os.path.basename(zip_info.filename)}"
-                                    caminho_arquivo = os.path.join(pasta_categoria, nome_arquivo)
-                                    
-                                    with open(caminho_arquivo, "wb") as f:
-                                        f.write(conteudo_zip)
-                                except Exception as e:
-                                    continue
-                    
-                    # Remover ZIP temporário
-                    os.remove(zip_path)
-                else:
-                    # Salvar arquivo individual
-                    categoria = verificar_conteudo_arquivo(conteudo)
-                    pasta_categoria = os.path.join(pasta_empresa, categoria)
-                    os.makedirs(pasta_categoria, exist_ok=True)
-                    
-                    nome_arquivo = f"{datetime.now().strftime('%Y%m%d_%H%M%S')}_{arquivo.name}"
-                    caminho_arquivo = os.path.join(pasta_categoria, nome_arquivo)
-                    
-                    with open(caminho_arquivo, "wb") as f:
-                        f.write(conteudo)
-                
-            except Exception as e:
-                continue
+        # Organizar os arquivos direto no ZIP de saída, sem pastas temporárias
+        zip_organizado, falhas = organizar_arquivos(uploaded_files, max_workers=workers_organizador)
+        if falhas:
+            st.warning(f"⚠️ {len(falhas)} arquivo(s) não puderam ser lidos e ficaram de fora (lista em {NOME_LISTA_FALHAS} no ZIP):")
+            st.code("\n".join(falhas[:20]) + ("\n..." if len(falhas) > 20 else ""))
         
-        # Criar ZIP da pasta da empresa
-        zip_path = os.path.join(temp_dir, f"{nome_empresa}.zip")
-        
-        with zipfile.ZipFile(zip_path, "w", zipfile.ZIP_DEFLATED) as zipf:
-            for root, _, files in os.walk(pasta_empresa):
-                for file in files:
-                    file_path = os.path.join(root, file)
-                    arcname = os.path.relpath(file_path, pasta_empresa)
-                    zipf.write(file_path, arcname)
-        
-        # Fornecer o arquivo ZIP para download
-        with open(zip_path, "rb") as f:
-            st.download_button(
-                "Baixar Arquivos Organizados",
-                f.read(),
-                f"{nome_empresa}.zip",
-                "application/zip"
+        # Fornecer o arquivo ZIP para download; ZIPs grandes vão para o Storage e viram um link
+        with zip_organizado:
+            entrega = entregar_arquivo(
+                supabase, url, key, st.session_state.username, zip_organizado,
+                f"{nome_empresa}.zip", "application/zip", PASTA_ORGANIZADOS
             )
-        
-        # Limpar arquivos temporários
-        shutil.rmtree(pasta_empresa)
-        os.remove(zip_path)
+        exibir_download(entrega, "Baixar Arquivos Organizados")
         
     except Exception as e:
         st.error("❌ Erro ao processar arquivos")
 
+# Função para enviar arquivos ao Supabase Storage, vários ao mesmo tempo
+# Cada conteúdo é guardado uma vez só, pelo hash; arquivos já guardados não são enviados de novo.
+# Arquivos grandes vão em blocos e, se o envio falhar, uma nova tentativa continua de onde parou.
+# Retorna uma lista de (arquivo, caminho no bucket, mensagem de erro ou None), na ordem recebida.
+def enviar_arquivos_storage(arquivos, ao_concluir=None):
+    return enviar_uploads(url, key, arquivos, ao_concluir)
+
 if menu == "Organizar Arquivos Fiscais":
     st.title("Organizador de Arquivos Fiscais")
     
     # Selecionar empresa
-    nome_empresa = st.selectbox("Nome da Empresa", st.session_state.empresas)
+    nome_empresa = selecionar_empresa(supabase, "Nome da Empresa", st.session_state.empresa_ids, "empresa_organizador")
     
     # Upload de arquivos
     uploaded_files = st.file_uploader(
@@ -545,9 +572,73 @@ elif menu == "Controle Importação":
         st.error("❌ Você precisa estar logado para registrar importações.")
         st.stop()
     
+    modo_registro = st.radio("Modo de registro", ["Individual", "Em lote"], horizontal=True)
+    
+    # Registro em lote: vários arquivos ou uma planilha CSV, enviados em inserts de várias linhas
+    if modo_registro == "Em lote":
+        origem_lote = st.radio("Origem dos registros", ["Vários arquivos", "Planilha CSV"], horizontal=True)
+        
+        if origem_lote == "Vários arquivos":
+            empresa_lote = selecionar_empresa(supabase, "Nome da empresa", st.session_state.empresa_ids, "empresa_lote")
+        
+        with st.form("registro_lote_form"):
+            if origem_lote == "Vários arquivos":
+                tipo_nota_lote = st.selectbox("Tipo de Nota", TIPOS_NOTA)
+                erro_lote = st.text_area("Erro (se houver)")
+                arquivos_lote = st.file_uploader("Anexar arquivos", type=["png", "jpeg", "jpg", "pdf", "xml", "txt", "xlsx", "xls", "csv", "zip"], accept_multiple_files=True)
+            else:
+                st.caption("A planilha deve ter as colunas empresa, tipo_nota e, opcionalmente, erro.")
+                planilha_lote = st.file_uploader("Planilha de registros", type=["csv"])
+            submit_lote = st.form_submit_button("Registrar em lote")
+        
+        if submit_lote:
+            try:
+                registros_lote = []
+                linhas_lote = []
+                falhas_lote = []
+                
+                if origem_lote == "Vários arquivos" and arquivos_lote:
+                    # Enviar os anexos ao mesmo tempo, mostrando o progresso
+                    progresso = st.progress(0.0, text="Enviando arquivos...")
+                    enviados = []
+                    
+                    def atualizar_progresso(arquivo_path, erro_upload):
+                        enviados.append(arquivo_path)
+                        progresso.progress(len(enviados) / len(arquivos_lote), text=f"{len(enviados)}/{len(arquivos_lote)} arquivo(s) enviado(s)")
+                    
+                    for arquivo, arquivo_path, erro_upload in enviar_arquivos_storage(arquivos_lote, atualizar_progresso):
+                        if erro_upload:
+                            falhas_lote.append({"Linha": arquivo.name, "Motivo": f"Falha no upload do arquivo: {erro_upload}"})
+                            continue
+                        registros_lote.append(montar_registro(empresa_lote, tipo_nota_lote, erro_lote, arquivo_path, arquivo.type, st.session_state.username, empresa_id=id_da_empresa(supabase, empresa_lote)))
+                        linhas_lote.append(arquivo.name)
+                elif planilha_lote:
+                    planilha = pd.read_csv(planilha_lote, dtype=str).fillna("")
+                    for numero, linha in enumerate(planilha.to_dict("records"), start=2):  # linha 1 é o cabeçalho
+                        empresa_linha = linha.get("empresa", "").strip()
+                        registros_lote.append(montar_registro(empresa_linha, linha.get("tipo_nota", "").strip(), linha.get("erro", "").strip(), usuario=st.session_state.username, empresa_id=id_da_empresa(supabase, empresa_linha)))
+                        linhas_lote.append(f"Linha {numero}")
+                
+                inseridos, falhas = inserir_registros_em_lote(supabase, registros_lote, st.session_state.empresa_ids)
+                if inseridos:
+                    publicar_local("registros", "INSERT")
+                falhas_lote += [{"Linha": linhas_lote[indice], "Motivo": motivo} for indice, motivo in falhas]
+                
+                if inseridos:
+                    st.success(f"✅ {inseridos} registro(s) salvo(s) com sucesso!")
+                if falhas_lote:
+                    st.error(f"❌ {len(falhas_lote)} registro(s) não foram salvos:")
+                    st.dataframe(pd.DataFrame(falhas_lote), use_container_width=True)
+                elif not inseridos:
+                    st.warning("Nenhum registro para salvar.")
+            except Exception as e:
+                st.error(f"❌ Erro ao processar registros em lote: {str(e)}")
+        st.stop()
+    
+    empresa_filtro = selecionar_empresa(supabase, "Nome da empresa", st.session_state.empresa_ids, "empresa_registro")
+    
     with st.form("registro_form"):
-        empresa_filtro = st.selectbox("Nome da empresa", st.session_state.empresas)
-        tipo_nota = st.selectbox("Tipo de Nota", ["NFE entrada", "NFE saída", "CTE entrada", "CTE saída", "CTE cancelado", "SPED", "NFS tomado", "NFS prestado", "Planilha", "NFCE saída"])
+        tipo_nota = st.selectbox("Tipo de Nota", TIPOS_NOTA)
         erro = st.text_area("Erro (se houver)")
         arquivo = st.file_uploader("Anexar arquivo", type=["png", "jpeg", "jpg", "pdf", "xml", "txt", "xlsx", "xls", "csv", "zip"])
         submit = st.form_submit_button("Registrar")
@@ -559,38 +650,11 @@ elif menu == "Controle Importação":
                 upload_success = True
                 
                 if arquivo:
-                    # Criar um nome único para o arquivo
-                    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-                    nome_arquivo = f"{timestamp}_{arquivo.name}"
-                    arquivo_path = f"arquivos/{empresa_filtro}/{nome_arquivo}"
-                    
-                    # Criar diretório temporário
-                    temp_dir = os.path.join(os.getcwd(), "temp_uploads")
-                    os.makedirs(temp_dir, exist_ok=True)
-                    
-                    # Salvar arquivo temporariamente
-                    temp_path = os.path.join(temp_dir, nome_arquivo)
-                    with open(temp_path, "wb") as f:
-                        f.write(arquivo.getvalue())
-                    
                     # Upload do arquivo para o Supabase Storage
-                    try:
-                        response = supabase.storage.from_("arquivos").upload(
-                            arquivo_path,
-                            arquivo.getvalue(),
-                            {"content-type": arquivo.type}
-                        )
-                        
-                        if response.error:
-                            st.error(f"❌ Erro ao salvar arquivo: {response.error.message}")
-                            upload_success = False
-                    except Exception as e:
-                        st.error(f"❌ Erro ao fazer upload do arquivo: {str(e)}")
+                    _, arquivo_path, erro_upload = enviar_arquivos_storage([arquivo])[0]
+                    if erro_upload:
+                        st.error(f"❌ Erro ao fazer upload do arquivo: {erro_upload}")
                         upload_success = False
-                    finally:
-                        # Limpar arquivo temporário
-                        if os.path.exists(temp_path):
-                            os.remove(temp_path)
                 
                 if upload_success:
                     # Definir status baseado no erro
@@ -601,6 +665,7 @@ elif menu == "Controle Importação":
                         registro_data = {
                             "data": data_atual,
                             "empresa": empresa_filtro,
+                            "empresa_id": id_da_empresa(supabase, empresa_filtro),
                             "tipo_nota": tipo_nota,
                             "erro": erro,
                             "arquivo_erro": arquivo_path if erro else None,
@@ -615,6 +680,8 @@ elif menu == "Controle Importação":
                         if not response or (hasattr(response, 'error') and response.error):
                             st.error(f"❌ Erro ao salvar registro: {response.error.message if hasattr(response, 'error') else 'Erro desconhecido'}")
                         else:
+                            invalidar_cache("registros")
+                            publicar_local("registros", "INSERT", response.data[0] if response.data else None)
                             st.success("✅ Registro salvo com sucesso!")
                             st.rerun()
                             
@@ -631,32 +698,50 @@ elif menu == "Registros Importação":
         st.warning("⚠ Você não tem permissão para acessar registros de nenhuma empresa.")
         st.stop()
 
-    empresa_filtro = st.selectbox("Nome da empresa", st.session_state.empresas)
+    empresa_filtro = selecionar_empresa(supabase, "Nome da empresa", st.session_state.empresa_ids, "empresa_busca_registros")
+    empresa_id_filtro = id_da_empresa(supabase, empresa_filtro)
     
-    try:
-        # Buscar registros diretamente do Supabase
-        response = supabase.table("registros").select("*").eq("empresa", empresa_filtro).order("data", desc=True).execute()
+    # Filtros aplicados direto na consulta ao Supabase
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        status_filtro = st.selectbox("Status", ["Todos"] + STATUS_REGISTRO)
+    with col2:
+        tipo_nota_filtro = st.selectbox("Tipo de Nota", ["Todos"] + TIPOS_NOTA)
+    with col3:
+        tamanho_pagina = st.selectbox("Registros por página", TAMANHOS_PAGINA)
+    
+    # Voltar para a primeira página sempre que a empresa ou os filtros mudarem
+    filtros_pagina = (empresa_filtro, status_filtro, tipo_nota_filtro, tamanho_pagina)
+    if st.session_state.get("filtros_pagina_registros") != filtros_pagina:
+        st.session_state.filtros_pagina_registros = filtros_pagina
+        st.session_state.cursores_registros = [None]
+    
+    # Com o tempo real ligado, a página se atualiza sozinha quando um registro da empresa muda
+    # (o cache de registros já foi invalidado ao receber a alteração)
+    if tempo_real_ativo:
+        assinar_sessao()
         
-        if not response or (hasattr(response, 'error') and response.error):
-            st.error(f"❌ Erro ao buscar registros: {response.error.message if hasattr(response, 'error') else 'Erro desconhecido'}")
-            st.stop()
+        @st.fragment(run_every=INTERVALO_TEMPO_REAL)
+        def acompanhar_registros():
+            if any(alteracao_afeta(alteracao, "empresa_id", empresa_id_filtro) for alteracao in alteracoes_da_sessao("registros")):
+                st.rerun()
+        
+        acompanhar_registros()
+    
+    try:
+        # Buscar só a página atual, a partir do cursor (data, id) da página anterior
+        linhas_pagina, tem_mais = buscar_pagina_registros(
+            supabase,
+            empresa_id_filtro,
+            tamanho_pagina,
+            cursor=st.session_state.cursores_registros[-1],
+            status=None if status_filtro == "Todos" else status_filtro,
+            tipo_nota=None if tipo_nota_filtro == "Todos" else tipo_nota_filtro
+        )
         
-        registros = pd.DataFrame(response.data)
+        registros = pd.DataFrame(linhas_pagina)
         
         if not registros.empty:
-            # Adicionar filtros
-            col1, col2 = st.columns(2)
-            with col1:
-                status_filtro = st.selectbox("Status", ["Todos"] + list(registros["status"].unique()))
-            with col2:
-                tipo_nota_filtro = st.selectbox("Tipo de Nota", ["Todos"] + list(registros["tipo_nota"].unique()))
-
-            # Aplicar filtros
-            if status_filtro != "Todos":
-                registros = registros[registros["status"] == status_filtro]
-            if tipo_nota_filtro != "Todos":
-                registros = registros[registros["tipo_nota"] == tipo_nota_filtro]
-
             # Exibir registros
             for index, row in registros.iterrows():
                 with st.expander(f"📌 {row['empresa']} - {row['tipo_nota']} - {row['data']}"):
@@ -665,39 +750,11 @@ elif menu == "Registros Importação":
 
                     # Exibir arquivo de erro se existir
                     if row['arquivo_erro']:
-                        try:
-                            response = supabase.storage.from_("arquivos").download(row['arquivo_erro'])
-                            if response:
-                                if row['arquivo_erro'].lower().endswith(('.png', '.jpg', '.jpeg')):
-                                    image = Image.open(BytesIO(response))
-                                    st.image(image, caption="Imagem do erro", use_container_width=True)
-                                else:
-                                    st.download_button(
-                                        "Baixar arquivo de erro",
-                                        response,
-                                        os.path.basename(row['arquivo_erro']),
-                                        "application/octet-stream"
-                                    )
-                            else:
-                                st.warning("Arquivo não encontrado no armazenamento.")
-                        except Exception as e:
-                            st.error(f"❌ Erro ao carregar arquivo: {str(e)}")
-
-                    # Exibir arquivo principal se existir
-                    if row['arquivo']:
-                        try:
-                            response = supabase.storage.from_("arquivos").download(row['arquivo'])
-                            if response:
-                                st.download_button(
-                                    "Baixar arquivo principal",
-                                    response,
-                                    os.path.basename(row['arquivo']),
-                                    "application/octet-stream"
-                                )
-                            else:
-                                st.warning("Arquivo principal não encontrado no armazenamento.")
-                        except Exception as e:
-                            st.error(f"❌ Erro ao carregar arquivo principal: {str(e)}")
+                        exibir_arquivo_sob_demanda(supabase, row['arquivo_erro'], "Arquivo de Erro", f"erro_{row['id']}")
+
+                    # Exibir arquivo principal se existir (e se não for o mesmo arquivo de erro)
+                    if row['arquivo'] and row['arquivo'] != row['arquivo_erro']:
+                        exibir_arquivo_sob_demanda(supabase, row['arquivo'], "Arquivo Principal", f"principal_{row['id']}")
 
                     if row['erro']:
                         email_cliente = st.text_input(f"Digite o e-mail do cliente para {row['empresa']}", key=f"email_{row['id']}")
@@ -715,12 +772,29 @@ elif menu == "Registros Importação":
                             if not response or (hasattr(response, 'error') and response.error):
                                 st.error(f"❌ Erro ao atualizar status: {response.error.message if hasattr(response, 'error') else 'Erro desconhecido'}")
                             else:
+                                invalidar_cache("registros")
+                                publicar_local("registros", "UPDATE", response.data[0] if response.data else None)
                                 st.success("✅ Status atualizado com sucesso!")
                                 st.rerun()
         else:
             st.info("ℹ️ Nenhum registro encontrado para a empresa selecionada.")
+        
+        # Navegação entre as páginas
+        col_anterior, col_pagina, col_proxima = st.columns([1, 2, 1])
+        with col_pagina:
+            st.write(f"Página {len(st.session_state.cursores_registros)}")
+        with col_anterior:
+            if len(st.session_state.cursores_registros) > 1 and st.button("⬅ Anterior"):
+                st.session_state.cursores_registros.pop()
+                st.rerun()
+        with col_proxima:
+            if tem_mais and st.button("Próxima ➡"):
+                ultimo = linhas_pagina[-1]
+                st.session_state.cursores_registros.append((ultimo["data"], ultimo["id"]))
+                st.rerun()
             
     except Exception as e:
+        registrar_falha_esquema(e)
         st.error(f"❌ Erro ao buscar registros: {str(e)}")
 
 elif menu == "Indicadores":
@@ -736,50 +810,38 @@ elif menu == "Indicadores":
             st.warning("A tabela 'registros' ainda não foi criada no Supabase. Por favor, crie a tabela com as seguintes colunas: id, data, empresa, tipo_nota, erro, arquivo_erro, status")
             st.stop()
 
-        # Filtra os registros apenas das empresas que o usuário tem acesso
-        response = supabase.table("registros").select("*").in_("empresa", st.session_state.empresas).execute()
-
-        if not response or (hasattr(response, 'error') and response.error):
-            st.error(f"❌ Erro ao buscar indicadores: {response.error.message if hasattr(response, 'error') else 'Erro desconhecido'}")
-            st.stop()
-
-        registros = pd.DataFrame(response.data)
-
-        if not registros.empty:
-            st.dataframe(registros)  # Exibe os dados como uma tabela interativa no Streamlit
+        # Indicadores agregados no Postgres, apenas das empresas que o usuário tem acesso
+        # (pelos ids; quem tem acesso a todas as empresas consulta sem filtro)
+        indicadores = buscar_indicadores(supabase, filtro_empresas(supabase, st.session_state.empresa_ids))
 
+        if indicadores["total"]:
             col1, col2 = st.columns(2)
-            empresa_count = registros["empresa"].value_counts().reset_index()
+            empresa_count = pd.DataFrame(indicadores["por_empresa"])
             empresa_count.columns = ["Empresa", "Total de Registros"]
             fig1 = px.pie(empresa_count, names="Empresa", values="Total de Registros", title="📌 Registros por Empresa")
             col1.plotly_chart(fig1)
             
-            tipo_nota_count = registros["tipo_nota"].value_counts().reset_index()
+            tipo_nota_count = pd.DataFrame(indicadores["por_tipo_nota"])
             tipo_nota_count.columns = ["Tipo de Nota", "Quantidade"]
             fig2 = px.pie(tipo_nota_count, names="Tipo de Nota", values="Quantidade", title="📌 Tipos de Nota Registradas")
             col2.plotly_chart(fig2)
             
-            importadas = registros["empresa"].nunique()
-            total_registros = len(registros)
-            df_empresas = pd.DataFrame({"Status": ["Importadas", "Não Importadas"], "Quantidade": [importadas, total_registros - importadas]})
+            importadas = len(indicadores["por_empresa"])
+            df_empresas = pd.DataFrame({"Status": ["Importadas", "Não Importadas"], "Quantidade": [importadas, max(len(st.session_state.empresa_ids) - importadas, 0)]})
             fig3 = px.pie(df_empresas, names="Status", values="Quantidade", title="📌 Empresas Importadas vs. Não Importadas")
             st.plotly_chart(fig3)
             
-            if registros["erro"].notna().sum() > 0:
-                erro_count = registros["erro"].value_counts().reset_index().head(5)
+            if indicadores["erros_frequentes"]:
+                erro_count = pd.DataFrame(indicadores["erros_frequentes"])
                 erro_count.columns = ["Erro", "Frequência"]
                 st.subheader("🔴 Erros Mais Comuns")
                 fig4 = px.pie(erro_count, names="Erro", values="Frequência", title="📌 Erros Mais Frequentes")
                 st.plotly_chart(fig4)
         
             st.subheader("📥 Download de Registros")
-            data_hoje = date.today().strftime("%d-%m-%Y")
-            df_hoje = registros[registros['data'] == data_hoje]
-            if not df_hoje.empty:
-                csv = df_hoje.to_csv(index=False).encode("utf-8")
-                st.download_button("📥 Baixar Planilha do Dia", data=csv, file_name=f"registros_{data_hoje}.csv", mime="text/csv")
-            else:
-                st.info("Nenhum registro encontrado para hoje.")
+            
+            # Exportar o período escolhido (hoje, por padrão) em páginas lidas no Postgres e gravadas em disco
+            exibir_exportacao(supabase, url, key, filtro_empresas(supabase, st.session_state.empresa_ids), "exportacao_indicadores")
         else:
             st.info("ℹ️ Nenhum registro encontrado para as empresas selecionadas.")
     except Exception as e:
@@ -787,86 +849,47 @@ elif menu == "Indicadores":
 
 
 
-# Função para carregar as mensagens do Supabase
-def load_messages():
-    try:
-        # Verificar se a tabela messages existe
-        if not check_table_exists("messages"):
-            st.warning("A tabela 'messages' ainda não foi criada no Supabase. Por favor, crie a tabela com as seguintes colunas: id, username, message, created_at")
-            return []
-
-        response = supabase.table("messages").select("*").order("created_at", desc=True).limit(50).execute()
-        if not response or (hasattr(response, 'error') and response.error):
-            st.error(f"❌ Erro ao carregar mensagens: {response.error.message if hasattr(response, 'error') else 'Erro desconhecido'}")
-            return []
-        return response.data
-    except Exception as e:
-        st.error(f"❌ Erro ao carregar mensagens: {str(e)}")
-        return []
-
-# Função para salvar as mensagens no Supabase
-def save_message(username, message):
-    try:
-        # Verificar se a tabela messages existe
-        if not check_table_exists("messages"):
-            st.warning("A tabela 'messages' ainda não foi criada no Supabase. Por favor, crie a tabela com as seguintes colunas: id, username, message, created_at")
-            return False
-
-        timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-        response = supabase.table("messages").insert({
-            "username": username,
-            "message": message,
-            "created_at": timestamp
-        }).execute()
-        
-        if not response or (hasattr(response, 'error') and response.error):
-            st.error(f"❌ Erro ao salvar mensagem: {response.error.message if hasattr(response, 'error') else 'Erro desconhecido'}")
-            return False
-        return True
-    except Exception as e:
-        st.error(f"❌ Erro ao salvar mensagem: {str(e)}")
-        return False
-
-# Função para pegar o nome do usuário a partir do banco de dados (Supabase)
+# Função para pegar o nome do usuário logado (vem do token da sessão, sem consultar o banco)
 def get_user_name():
-    try:
-        response = supabase.table("users").select("username").eq("username", st.session_state.username).execute()
-        
-        if not response or (hasattr(response, 'error') and response.error):
-            st.error(f"❌ Erro ao buscar usuário: {response.error.message if hasattr(response, 'error') else 'Erro desconhecido'}")
-            return "Usuário desconhecido"
-
-        if response.data:
-            return response.data[0]["username"]
-        
-        return "Usuário desconhecido"
-    except Exception as e:
-        st.error(f"❌ Erro ao buscar usuário: {str(e)}")
-        return "Usuário desconhecido"
+    return st.session_state.get("username") or "Usuário desconhecido"
 
 # Função para exibir o chat
 if menu == "Chat":
     st.title("Chat Entre Usuários")
 
-    # Carregar mensagens antigas
-    messages = load_messages()
-
-    # Área para exibir as mensagens
-    chat_area = st.container()
-    with chat_area:
+    # Assinar as alterações antes de carregar, para não perder mensagens entre a consulta e a assinatura
+    if tempo_real_ativo:
+        assinar_sessao()
+
+    # Carregar mensagens (só as novas, depois da primeira vez)
+    load_messages()
+
+    # Área para exibir as mensagens, da mais nova para a mais antiga
+    # Com o tempo real ligado, só esta área se reexecuta a cada INTERVALO_TEMPO_REAL segundos,
+    # juntando as mensagens recebidas sem consultar o banco.
+    @st.fragment(run_every=INTERVALO_TEMPO_REAL if tempo_real_ativo else None)
+    def exibir_mensagens():
+        if tempo_real_ativo:
+            aplicar_mensagens_recebidas()
+        messages = st.session_state.chat["mensagens"] if "chat" in st.session_state else []
+        
         st.write("### Mensagens:")
-        for msg in messages:
+        for msg in reversed(messages):
             try:
-                # Formatar a data para exibição, removendo a parte do timezone
-                msg_date = msg['created_at'].split('T')[0] + ' ' + msg['created_at'].split('T')[1].split('+')[0]
-                msg_date = datetime.strptime(msg_date, '%Y-%m-%d %H:%M:%S').strftime('%d/%m/%Y %H:%M')
-                # Exibir mensagem com o nome do usuário
-                st.write(f"**{msg['username']}** ({msg_date}):")
+                # Exibir mensagem com o nome do usuário (data já formatada ao carregar)
+                st.write(f"**{msg['username']}** ({msg['data_formatada']}):")
                 st.write(f"{msg['message']}")
                 st.markdown("---")
             except Exception as e:
                 st.error(f"❌ Erro ao exibir mensagem: {str(e)}")
                 continue
+        
+        if messages and st.session_state.chat["tem_anteriores"]:
+            if st.button("⬇️ Carregar mensagens anteriores"):
+                if load_older_messages():
+                    st.rerun()
+    
+    exibir_mensagens()
 
     # Área fixa para digitar a mensagem
     input_area = st.container()
@@ -892,20 +915,13 @@ if menu == "Página Inicial":
     # Exibe o vídeo diretamente na página inicial
     st.video(video_url)
 
-def check_table_exists(table_name):
-    try:
-        response = supabase.table(table_name).select("*").limit(1).execute()
-        return True
-    except Exception as e:
-        if "relation" in str(e) and "does not exist" in str(e):
-            return False
-        raise e
-
 # Função para buscar registros
+@em_cache("registros")
 def buscar_registros(empresa_filtro=None):
     try:
         if not check_table_exists("registros"):
             st.warning("A tabela 'registros' ainda não foi criada no Supabase.")
+            nao_guardar_resultado()
             return pd.DataFrame()
 
         query = supabase.table("registros").select("*")
@@ -917,11 +933,14 @@ def buscar_registros(empresa_filtro=None):
         
         if not response or (hasattr(response, 'error') and response.error):
             st.error(f"❌ Erro ao buscar registros: {response.error.message if hasattr(response, 'error') else 'Erro desconhecido'}")
+            nao_guardar_resultado()
             return pd.DataFrame()
         
         return pd.DataFrame(response.data)
     except Exception as e:
+        registrar_falha_esquema(e)
         st.error(f"❌ Erro ao buscar registros: {str(e)}")
+        nao_guardar_resultado()
         return pd.DataFrame()
 
 # Função para atualizar status no Supabase
@@ -937,9 +956,11 @@ def atualizar_status_resolvido(registro_id):
             st.error(f"❌ Erro ao atualizar status: {response.error.message if hasattr(response, 'error') else 'Erro desconhecido'}")
             return False
         
+        invalidar_cache("registros")
         st.success(f"✅ Status do registro {registro_id} atualizado para 'Resolvido'!")
         return True
     except Exception as e:
+        registrar_falha_esquema(e)
         st.error(f"❌ Erro ao atualizar status: {str(e)}")
         return False
 
@@ -979,9 +1000,11 @@ def salvar_registro(data, empresa, tipo_nota, erro, arquivo_erro, status, arquiv
             
             return False
         
+        invalidar_cache("registros")
         st.success("✅ Registro salvo com sucesso!")
         return True
     except Exception as e:
+        registrar_falha_esquema(e)
         st.error(f"❌ Erro ao salvar registro: {str(e)}")
         return False
 
@@ -1005,7 +1028,8 @@ def inserir_registro_seguro(registro_data):
             error_message = response.error.message if hasattr(response, 'error') else 'Erro desconhecido'
             st.error(f"❌ Erro ao salvar registro: {error_message}")
             return False
-            
+        
+        invalidar_cache("registros")
         return True
     except Exception as e:
         st.error(f"❌ Erro ao salvar registro: {str(e)}")
@@ -0,0 +1,30 @@
+-- Tabelas base da aplicação, que as migrações seguintes supõem existir.
+-- Num projeto do Supabase já em uso as tabelas existem e nada muda; num banco novo
+-- (ou no Postgres local dos testes de planos) elas são criadas aqui.
+
+CREATE TABLE IF NOT EXISTS users (
+    username TEXT PRIMARY KEY,
+    password TEXT,
+    empresas TEXT DEFAULT '',
+    permissoes TEXT DEFAULT ''
+);
+
+CREATE TABLE IF NOT EXISTS registros (
+    id BIGSERIAL PRIMARY KEY,
+    data TIMESTAMP WITH TIME ZONE DEFAULT TIMEZONE('utc'::text, NOW()),
+    empresa TEXT NOT NULL,
+    tipo_nota TEXT NOT NULL,
+    erro TEXT,
+    arquivo_erro TEXT,
+    status TEXT DEFAULT 'Pendente',
+    arquivo TEXT,
+    tipo_arquivo TEXT,
+    usuario TEXT
+);
+
+CREATE TABLE IF NOT EXISTS messages (
+    id BIGSERIAL PRIMARY KEY,
+    username TEXT NOT NULL,
+    message TEXT NOT NULL,
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
+);
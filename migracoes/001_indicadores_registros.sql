@@ -0,0 +1,53 @@
+-- Agregações do painel de Indicadores calculadas no Postgres.
+-- A aplicação chama via supabase.rpc("indicadores_registros", ...) e recebe só os totais,
+-- em vez de baixar a tabela registros inteira.
+-- Roda com os privilégios de quem chama, então as políticas de segurança de registros continuam valendo.
+
+CREATE OR REPLACE FUNCTION indicadores_registros(
+    p_empresas TEXT[],
+    p_data_inicio TIMESTAMP WITH TIME ZONE DEFAULT NULL,
+    p_data_fim TIMESTAMP WITH TIME ZONE DEFAULT NULL,
+    p_top_erros INTEGER DEFAULT 5
+)
+RETURNS JSONB
+LANGUAGE sql
+STABLE
+AS $$
+    WITH base AS (
+        SELECT data, empresa, tipo_nota, status, NULLIF(erro, '') AS erro
+        FROM registros
+        WHERE empresa = ANY(p_empresas)
+          AND (p_data_inicio IS NULL OR data >= p_data_inicio)
+          AND (p_data_fim IS NULL OR data < p_data_fim)
+    )
+    SELECT jsonb_build_object(
+        'total', (SELECT count(*) FROM base),
+        'com_erro', (SELECT count(*) FROM base WHERE erro IS NOT NULL),
+        'por_empresa', COALESCE((
+            SELECT jsonb_agg(jsonb_build_object('empresa', empresa, 'quantidade', quantidade) ORDER BY quantidade DESC, empresa)
+            FROM (SELECT empresa, count(*) AS quantidade FROM base GROUP BY empresa) t
+        ), '[]'::jsonb),
+        'por_tipo_nota', COALESCE((
+            SELECT jsonb_agg(jsonb_build_object('tipo_nota', tipo_nota, 'quantidade', quantidade) ORDER BY quantidade DESC, tipo_nota)
+            FROM (SELECT tipo_nota, count(*) AS quantidade FROM base GROUP BY tipo_nota) t
+        ), '[]'::jsonb),
+        'por_status', COALESCE((
+            SELECT jsonb_agg(jsonb_build_object('status', status, 'quantidade', quantidade) ORDER BY quantidade DESC, status)
+            FROM (SELECT status, count(*) AS quantidade FROM base GROUP BY status) t
+        ), '[]'::jsonb),
+        'erros_frequentes', COALESCE((
+            SELECT jsonb_agg(jsonb_build_object('erro', erro, 'quantidade', quantidade) ORDER BY quantidade DESC, erro)
+            FROM (
+                SELECT erro, count(*) AS quantidade FROM base
+                WHERE erro IS NOT NULL
+                GROUP BY erro
+                ORDER BY quantidade DESC, erro
+                LIMIT p_top_erros
+            ) t
+        ), '[]'::jsonb),
+        'por_dia', COALESCE((
+            SELECT jsonb_agg(jsonb_build_object('dia', dia, 'quantidade', quantidade) ORDER BY dia)
+            FROM (SELECT data::date AS dia, count(*) AS quantidade FROM base GROUP BY data::date) t
+        ), '[]'::jsonb)
+    );
+$$;
@@ -0,0 +1,156 @@
+-- Tabela de totais diários dos registros (dia x empresa x tipo de nota x status),
+-- mantida por trigger a cada insert, update e delete em registros.
+-- Os Indicadores passam a ler estes totais em vez de varrer a tabela registros.
+
+CREATE TABLE IF NOT EXISTS registros_diarios (
+    dia DATE NOT NULL,
+    empresa TEXT NOT NULL,
+    tipo_nota TEXT NOT NULL,
+    status TEXT NOT NULL,
+    quantidade BIGINT NOT NULL DEFAULT 0,
+    com_erro BIGINT NOT NULL DEFAULT 0,
+    PRIMARY KEY (dia, empresa, tipo_nota, status)
+);
+
+ALTER TABLE registros_diarios ENABLE ROW LEVEL SECURITY;
+
+DROP POLICY IF EXISTS "Usuários podem ver totais de suas empresas" ON registros_diarios;
+CREATE POLICY "Usuários podem ver totais de suas empresas"
+ON registros_diarios FOR SELECT
+USING (empresa = ANY(string_to_array((SELECT empresas FROM users WHERE username = current_user), ',')));
+
+-- Ajusta os totais do dia a cada alteração em registros
+-- SECURITY DEFINER com search_path fixo: objetos com o mesmo nome em outros esquemas não são usados
+CREATE OR REPLACE FUNCTION atualizar_registros_diarios()
+RETURNS TRIGGER
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public, pg_temp
+AS $$
+BEGIN
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        UPDATE registros_diarios
+        SET quantidade = quantidade - 1,
+            com_erro = com_erro - (CASE WHEN NULLIF(OLD.erro, '') IS NULL THEN 0 ELSE 1 END)
+        WHERE dia = OLD.data::date
+          AND empresa = OLD.empresa
+          AND tipo_nota = OLD.tipo_nota
+          AND status = COALESCE(OLD.status, '');
+
+        DELETE FROM registros_diarios
+        WHERE dia = OLD.data::date
+          AND empresa = OLD.empresa
+          AND tipo_nota = OLD.tipo_nota
+          AND status = COALESCE(OLD.status, '')
+          AND quantidade <= 0;
+    END IF;
+
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        INSERT INTO registros_diarios (dia, empresa, tipo_nota, status, quantidade, com_erro)
+        VALUES (NEW.data::date, NEW.empresa, NEW.tipo_nota, COALESCE(NEW.status, ''), 1, CASE WHEN NULLIF(NEW.erro, '') IS NULL THEN 0 ELSE 1 END)
+        ON CONFLICT (dia, empresa, tipo_nota, status) DO UPDATE
+        SET quantidade = registros_diarios.quantidade + 1,
+            com_erro = registros_diarios.com_erro + EXCLUDED.com_erro;
+    END IF;
+
+    RETURN NULL;
+END;
+$$;
+
+DROP TRIGGER IF EXISTS registros_diarios_atualizar ON registros;
+CREATE TRIGGER registros_diarios_atualizar
+AFTER INSERT OR DELETE OR UPDATE OF data, empresa, tipo_nota, status, erro ON registros
+FOR EACH ROW EXECUTE FUNCTION atualizar_registros_diarios();
+
+-- Recalcula os totais a partir de registros (carga inicial ou correção de um período).
+-- Bloqueia escritas em registros durante o recálculo para não perder alterações concorrentes,
+-- por isso só a chave service_role (a do comando "python inicializacao.py --recalcular-totais") pode chamar.
+CREATE OR REPLACE FUNCTION recalcular_registros_diarios(
+    p_data_inicio DATE DEFAULT NULL,
+    p_data_fim DATE DEFAULT NULL
+)
+RETURNS BIGINT
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public, pg_temp
+AS $$
+DECLARE
+    linhas BIGINT;
+BEGIN
+    LOCK TABLE registros IN SHARE MODE;
+
+    DELETE FROM registros_diarios
+    WHERE (p_data_inicio IS NULL OR dia >= p_data_inicio)
+      AND (p_data_fim IS NULL OR dia <= p_data_fim);
+
+    INSERT INTO registros_diarios (dia, empresa, tipo_nota, status, quantidade, com_erro)
+    SELECT data::date, empresa, tipo_nota, COALESCE(status, ''), count(*), count(NULLIF(erro, ''))
+    FROM registros
+    WHERE (p_data_inicio IS NULL OR data::date >= p_data_inicio)
+      AND (p_data_fim IS NULL OR data::date <= p_data_fim)
+    GROUP BY 1, 2, 3, 4;
+
+    GET DIAGNOSTICS linhas = ROW_COUNT;
+    RETURN linhas;
+END;
+$$;
+
+REVOKE EXECUTE ON FUNCTION recalcular_registros_diarios(DATE, DATE) FROM PUBLIC, anon, authenticated;
+GRANT EXECUTE ON FUNCTION recalcular_registros_diarios(DATE, DATE) TO service_role;
+
+-- Indicadores a partir dos totais diários; só o ranking de erros ainda lê registros
+-- (apenas as linhas com erro). Os limites de data são considerados por dia.
+CREATE OR REPLACE FUNCTION indicadores_registros(
+    p_empresas TEXT[],
+    p_data_inicio TIMESTAMP WITH TIME ZONE DEFAULT NULL,
+    p_data_fim TIMESTAMP WITH TIME ZONE DEFAULT NULL,
+    p_top_erros INTEGER DEFAULT 5
+)
+RETURNS JSONB
+LANGUAGE sql
+STABLE
+AS $$
+    WITH base AS (
+        SELECT dia, empresa, tipo_nota, status, quantidade, com_erro
+        FROM registros_diarios
+        WHERE empresa = ANY(p_empresas)
+          AND (p_data_inicio IS NULL OR dia >= p_data_inicio::date)
+          AND (p_data_fim IS NULL OR dia < p_data_fim::date)
+    )
+    SELECT jsonb_build_object(
+        'total', (SELECT COALESCE(sum(quantidade), 0) FROM base),
+        'com_erro', (SELECT COALESCE(sum(com_erro), 0) FROM base),
+        'por_empresa', COALESCE((
+            SELECT jsonb_agg(jsonb_build_object('empresa', empresa, 'quantidade', quantidade) ORDER BY quantidade DESC, empresa)
+            FROM (SELECT empresa, sum(quantidade) AS quantidade FROM base GROUP BY empresa) t
+        ), '[]'::jsonb),
+        'por_tipo_nota', COALESCE((
+            SELECT jsonb_agg(jsonb_build_object('tipo_nota', tipo_nota, 'quantidade', quantidade) ORDER BY quantidade DESC, tipo_nota)
+            FROM (SELECT tipo_nota, sum(quantidade) AS quantidade FROM base GROUP BY tipo_nota) t
+        ), '[]'::jsonb),
+        'por_status', COALESCE((
+            SELECT jsonb_agg(jsonb_build_object('status', status, 'quantidade', quantidade) ORDER BY quantidade DESC, status)
+            FROM (SELECT status, sum(quantidade) AS quantidade FROM base GROUP BY status) t
+        ), '[]'::jsonb),
+        'erros_frequentes', COALESCE((
+            SELECT jsonb_agg(jsonb_build_object('erro', erro, 'quantidade', quantidade) ORDER BY quantidade DESC, erro)
+            FROM (
+                SELECT erro, count(*) AS quantidade FROM registros
+                WHERE empresa = ANY(p_empresas)
+                  AND NULLIF(erro, '') IS NOT NULL
+                  AND (p_data_inicio IS NULL OR data::date >= p_data_inicio::date)
+                  AND (p_data_fim IS NULL OR data::date < p_data_fim::date)
+                GROUP BY erro
+                ORDER BY quantidade DESC, erro
+                LIMIT p_top_erros
+            ) t
+        ), '[]'::jsonb),
+        'por_dia', COALESCE((
+            SELECT jsonb_agg(jsonb_build_object('dia', dia, 'quantidade', quantidade) ORDER BY dia)
+            FROM (SELECT dia, sum(quantidade) AS quantidade FROM base GROUP BY dia) t
+        ), '[]'::jsonb)
+    );
+$$;
+
+-- Carga inicial dos totais
+SELECT recalcular_registros_diarios();
@@ -0,0 +1,20 @@
+-- Publica as alterações de messages e registros no Supabase Realtime,
+-- usadas pelo modo TEMPO_REAL=supabase (postgres_changes).
+
+DO $$
+BEGIN
+    IF NOT EXISTS (
+        SELECT 1 FROM pg_publication_tables
+        WHERE pubname = 'supabase_realtime' AND schemaname = 'public' AND tablename = 'messages'
+    ) THEN
+        ALTER PUBLICATION supabase_realtime ADD TABLE messages;
+    END IF;
+
+    IF NOT EXISTS (
+        SELECT 1 FROM pg_publication_tables
+        WHERE pubname = 'supabase_realtime' AND schemaname = 'public' AND tablename = 'registros'
+    ) THEN
+        ALTER PUBLICATION supabase_realtime ADD TABLE registros;
+    END IF;
+END;
+$$;
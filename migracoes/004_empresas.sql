@@ -0,0 +1,284 @@
+-- Empresas com id inteiro e relação usuário <-> empresa.
+-- registros ganha empresa_id, e as consultas por escopo passam a filtrar pelos ids
+-- (inteiros, indexados) em vez de listas com os nomes completos das empresas.
+-- A coluna users.empresas continua sendo gravada, só para as políticas antigas.
+-- As tabelas novas têm RLS: só a chave service_role (a da aplicação) e os administradores gravam nelas.
+
+CREATE TABLE IF NOT EXISTS empresas (
+    id BIGSERIAL PRIMARY KEY,
+    nome TEXT NOT NULL UNIQUE
+);
+
+CREATE TABLE IF NOT EXISTS usuarios_empresas (
+    username TEXT NOT NULL,
+    empresa_id BIGINT NOT NULL REFERENCES empresas(id) ON DELETE CASCADE,
+    PRIMARY KEY (username, empresa_id)
+);
+
+CREATE INDEX IF NOT EXISTS usuarios_empresas_empresa_id ON usuarios_empresas (empresa_id);
+
+-- Usuário atual com acesso às Configurações (administração de usuários e empresas)
+CREATE OR REPLACE FUNCTION usuario_administrador()
+RETURNS BOOLEAN
+LANGUAGE sql
+STABLE
+SECURITY DEFINER
+SET search_path = public, pg_temp
+AS $$
+    SELECT EXISTS (
+        SELECT 1 FROM users
+        WHERE username = current_user AND 'Configurações' = ANY(string_to_array(permissoes, ','))
+    );
+$$;
+
+ALTER TABLE empresas ENABLE ROW LEVEL SECURITY;
+ALTER TABLE usuarios_empresas ENABLE ROW LEVEL SECURITY;
+
+DROP POLICY IF EXISTS "Usuários podem ver suas empresas" ON empresas;
+CREATE POLICY "Usuários podem ver suas empresas"
+ON empresas FOR SELECT
+USING (usuario_administrador() OR id IN (SELECT empresa_id FROM usuarios_empresas WHERE username = current_user));
+
+DROP POLICY IF EXISTS "Administradores podem alterar empresas" ON empresas;
+CREATE POLICY "Administradores podem alterar empresas"
+ON empresas FOR ALL
+USING (usuario_administrador())
+WITH CHECK (usuario_administrador());
+
+DROP POLICY IF EXISTS "Usuários podem ver seus acessos" ON usuarios_empresas;
+CREATE POLICY "Usuários podem ver seus acessos"
+ON usuarios_empresas FOR SELECT
+USING (username = current_user OR usuario_administrador());
+
+DROP POLICY IF EXISTS "Administradores podem alterar acessos" ON usuarios_empresas;
+CREATE POLICY "Administradores podem alterar acessos"
+ON usuarios_empresas FOR ALL
+USING (usuario_administrador())
+WITH CHECK (usuario_administrador());
+
+-- Define as empresas de um usuário num único comando: remove as que saíram e inclui as novas
+CREATE OR REPLACE FUNCTION definir_empresas_usuario(p_username TEXT, p_empresa_ids BIGINT[])
+RETURNS VOID
+LANGUAGE sql
+AS $$
+    DELETE FROM usuarios_empresas
+    WHERE username = p_username AND NOT (empresa_id = ANY(p_empresa_ids));
+
+    INSERT INTO usuarios_empresas (username, empresa_id)
+    SELECT p_username, unnest(p_empresa_ids)
+    ON CONFLICT DO NOTHING;
+$$;
+
+-- Só a aplicação (chave service_role) define acessos; quem tem só a chave pública não chama a função
+REVOKE EXECUTE ON FUNCTION definir_empresas_usuario(TEXT, BIGINT[]) FROM PUBLIC, anon, authenticated;
+GRANT EXECUTE ON FUNCTION definir_empresas_usuario(TEXT, BIGINT[]) TO service_role;
+
+-- Empresas já conhecidas: as dos usuários e as dos registros
+INSERT INTO empresas (nome)
+SELECT DISTINCT btrim(nome)
+FROM (
+    SELECT unnest(string_to_array(empresas, ',')) AS nome FROM users
+    UNION
+    SELECT empresa FROM registros
+) t
+WHERE btrim(nome) <> ''
+ON CONFLICT (nome) DO NOTHING;
+
+-- Relação usuário <-> empresa a partir de users.empresas
+INSERT INTO usuarios_empresas (username, empresa_id)
+SELECT u.username, e.id
+FROM users u
+CROSS JOIN LATERAL unnest(string_to_array(u.empresas, ',')) AS n(nome)
+JOIN empresas e ON e.nome = btrim(n.nome)
+ON CONFLICT DO NOTHING;
+
+ALTER TABLE registros ADD COLUMN IF NOT EXISTS empresa_id BIGINT REFERENCES empresas(id);
+
+UPDATE registros r
+SET empresa_id = e.id
+FROM empresas e
+WHERE e.nome = r.empresa AND r.empresa_id IS NULL;
+
+CREATE INDEX IF NOT EXISTS registros_empresa_id_data ON registros (empresa_id, data DESC, id DESC);
+
+-- Mantém empresa e empresa_id coerentes: quem grava só um dos dois tem o outro preenchido
+CREATE OR REPLACE FUNCTION preencher_empresa_registro()
+RETURNS TRIGGER
+LANGUAGE plpgsql
+AS $$
+BEGIN
+    IF TG_OP = 'UPDATE' AND NEW.empresa IS DISTINCT FROM OLD.empresa AND NEW.empresa_id IS NOT DISTINCT FROM OLD.empresa_id THEN
+        NEW.empresa_id := NULL;
+    END IF;
+
+    IF NEW.empresa_id IS NULL AND NEW.empresa IS NOT NULL THEN
+        SELECT id INTO NEW.empresa_id FROM empresas WHERE nome = NEW.empresa;
+    ELSIF NEW.empresa_id IS NOT NULL THEN
+        SELECT nome INTO NEW.empresa FROM empresas WHERE id = NEW.empresa_id;
+    END IF;
+
+    RETURN NEW;
+END;
+$$;
+
+DROP TRIGGER IF EXISTS registros_preencher_empresa ON registros;
+CREATE TRIGGER registros_preencher_empresa
+BEFORE INSERT OR UPDATE OF empresa, empresa_id ON registros
+FOR EACH ROW EXECUTE FUNCTION preencher_empresa_registro();
+
+-- Totais diários também por id da empresa, para os Indicadores filtrarem pelos ids
+ALTER TABLE registros_diarios ADD COLUMN IF NOT EXISTS empresa_id BIGINT;
+
+UPDATE registros_diarios d
+SET empresa_id = e.id
+FROM empresas e
+WHERE e.nome = d.empresa AND d.empresa_id IS NULL;
+
+CREATE INDEX IF NOT EXISTS registros_diarios_empresa_id_dia ON registros_diarios (empresa_id, dia);
+
+CREATE OR REPLACE FUNCTION atualizar_registros_diarios()
+RETURNS TRIGGER
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public, pg_temp
+AS $$
+BEGIN
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        UPDATE registros_diarios
+        SET quantidade = quantidade - 1,
+            com_erro = com_erro - (CASE WHEN NULLIF(OLD.erro, '') IS NULL THEN 0 ELSE 1 END)
+        WHERE dia = OLD.data::date
+          AND empresa = OLD.empresa
+          AND tipo_nota = OLD.tipo_nota
+          AND status = COALESCE(OLD.status, '');
+
+        DELETE FROM registros_diarios
+        WHERE dia = OLD.data::date
+          AND empresa = OLD.empresa
+          AND tipo_nota = OLD.tipo_nota
+          AND status = COALESCE(OLD.status, '')
+          AND quantidade <= 0;
+    END IF;
+
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        INSERT INTO registros_diarios (dia, empresa, empresa_id, tipo_nota, status, quantidade, com_erro)
+        VALUES (NEW.data::date, NEW.empresa, NEW.empresa_id, NEW.tipo_nota, COALESCE(NEW.status, ''), 1, CASE WHEN NULLIF(NEW.erro, '') IS NULL THEN 0 ELSE 1 END)
+        ON CONFLICT (dia, empresa, tipo_nota, status) DO UPDATE
+        SET quantidade = registros_diarios.quantidade + 1,
+            com_erro = registros_diarios.com_erro + EXCLUDED.com_erro,
+            empresa_id = COALESCE(EXCLUDED.empresa_id, registros_diarios.empresa_id);
+    END IF;
+
+    RETURN NULL;
+END;
+$$;
+
+-- Uma troca só de empresa_id também muda empresa (trigger acima), então também atualiza os totais
+DROP TRIGGER IF EXISTS registros_diarios_atualizar ON registros;
+CREATE TRIGGER registros_diarios_atualizar
+AFTER INSERT OR DELETE OR UPDATE OF data, empresa, empresa_id, tipo_nota, status, erro ON registros
+FOR EACH ROW EXECUTE FUNCTION atualizar_registros_diarios();
+
+CREATE OR REPLACE FUNCTION recalcular_registros_diarios(
+    p_data_inicio DATE DEFAULT NULL,
+    p_data_fim DATE DEFAULT NULL
+)
+RETURNS BIGINT
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public, pg_temp
+AS $$
+DECLARE
+    linhas BIGINT;
+BEGIN
+    LOCK TABLE registros IN SHARE MODE;
+
+    DELETE FROM registros_diarios
+    WHERE (p_data_inicio IS NULL OR dia >= p_data_inicio)
+      AND (p_data_fim IS NULL OR dia <= p_data_fim);
+
+    INSERT INTO registros_diarios (dia, empresa, empresa_id, tipo_nota, status, quantidade, com_erro)
+    SELECT data::date, empresa, max(empresa_id), tipo_nota, COALESCE(status, ''), count(*), count(NULLIF(erro, ''))
+    FROM registros
+    WHERE (p_data_inicio IS NULL OR data::date >= p_data_inicio)
+      AND (p_data_fim IS NULL OR data::date <= p_data_fim)
+    GROUP BY data::date, empresa, tipo_nota, COALESCE(status, '');
+
+    GET DIAGNOSTICS linhas = ROW_COUNT;
+    RETURN linhas;
+END;
+$$;
+
+-- Indicadores pelas empresas informadas por id (NULL = todas as empresas)
+DROP FUNCTION IF EXISTS indicadores_registros(TEXT[], TIMESTAMP WITH TIME ZONE, TIMESTAMP WITH TIME ZONE, INTEGER);
+
+CREATE OR REPLACE FUNCTION indicadores_registros(
+    p_empresa_ids BIGINT[] DEFAULT NULL,
+    p_data_inicio TIMESTAMP WITH TIME ZONE DEFAULT NULL,
+    p_data_fim TIMESTAMP WITH TIME ZONE DEFAULT NULL,
+    p_top_erros INTEGER DEFAULT 5
+)
+RETURNS JSONB
+LANGUAGE sql
+STABLE
+AS $$
+    WITH base AS (
+        SELECT dia, empresa, tipo_nota, status, quantidade, com_erro
+        FROM registros_diarios
+        WHERE (p_empresa_ids IS NULL OR empresa_id = ANY(p_empresa_ids))
+          AND (p_data_inicio IS NULL OR dia >= p_data_inicio::date)
+          AND (p_data_fim IS NULL OR dia < p_data_fim::date)
+    )
+    SELECT jsonb_build_object(
+        'total', (SELECT COALESCE(sum(quantidade), 0) FROM base),
+        'com_erro', (SELECT COALESCE(sum(com_erro), 0) FROM base),
+        'por_empresa', COALESCE((
+            SELECT jsonb_agg(jsonb_build_object('empresa', empresa, 'quantidade', quantidade) ORDER BY quantidade DESC, empresa)
+            FROM (SELECT empresa, sum(quantidade) AS quantidade FROM base GROUP BY empresa) t
+        ), '[]'::jsonb),
+        'por_tipo_nota', COALESCE((
+            SELECT jsonb_agg(jsonb_build_object('tipo_nota', tipo_nota, 'quantidade', quantidade) ORDER BY quantidade DESC, tipo_nota)
+            FROM (SELECT tipo_nota, sum(quantidade) AS quantidade FROM base GROUP BY tipo_nota) t
+        ), '[]'::jsonb),
+        'por_status', COALESCE((
+            SELECT jsonb_agg(jsonb_build_object('status', status, 'quantidade', quantidade) ORDER BY quantidade DESC, status)
+            FROM (SELECT status, sum(quantidade) AS quantidade FROM base GROUP BY status) t
+        ), '[]'::jsonb),
+        'erros_frequentes', COALESCE((
+            SELECT jsonb_agg(jsonb_build_object('erro', erro, 'quantidade', quantidade) ORDER BY quantidade DESC, erro)
+            FROM (
+                SELECT erro, count(*) AS quantidade FROM registros
+                WHERE (p_empresa_ids IS NULL OR empresa_id = ANY(p_empresa_ids))
+                  AND NULLIF(erro, '') IS NOT NULL
+                  AND (p_data_inicio IS NULL OR data::date >= p_data_inicio::date)
+                  AND (p_data_fim IS NULL OR data::date < p_data_fim::date)
+                GROUP BY erro
+                ORDER BY quantidade DESC, erro
+                LIMIT p_top_erros
+            ) t
+        ), '[]'::jsonb),
+        'por_dia', COALESCE((
+            SELECT jsonb_agg(jsonb_build_object('dia', dia, 'quantidade', quantidade) ORDER BY dia)
+            FROM (SELECT dia, sum(quantidade) AS quantidade FROM base GROUP BY dia) t
+        ), '[]'::jsonb)
+    );
+$$;
+
+-- Registros de um período das empresas informadas por id (NULL = todas as empresas)
+-- Os ids vão no corpo da chamada, então a consulta não cresce com a quantidade de empresas na URL.
+CREATE OR REPLACE FUNCTION registros_das_empresas(
+    p_empresa_ids BIGINT[] DEFAULT NULL,
+    p_data_inicio TIMESTAMP WITH TIME ZONE DEFAULT NULL,
+    p_data_fim TIMESTAMP WITH TIME ZONE DEFAULT NULL
+)
+RETURNS SETOF registros
+LANGUAGE sql
+STABLE
+AS $$
+    SELECT *
+    FROM registros
+    WHERE (p_empresa_ids IS NULL OR empresa_id = ANY(p_empresa_ids))
+      AND (p_data_inicio IS NULL OR data >= p_data_inicio)
+      AND (p_data_fim IS NULL OR data < p_data_fim)
+    ORDER BY data, id;
+$$;
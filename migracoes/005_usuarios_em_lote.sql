@@ -0,0 +1,108 @@
+-- Administração de usuários: páginas com busca pelo nome e alterações de acesso em lote.
+-- As alterações em lote rodam num único comando, para qualquer quantidade de usuários.
+-- As duas funções só podem ser chamadas pela chave service_role, a usada pela página Configurações.
+
+-- Padrão do ILIKE para buscar um texto em qualquer parte do nome (sem curingas vindos do texto)
+CREATE OR REPLACE FUNCTION padrao_busca(p_busca TEXT)
+RETURNS TEXT
+LANGUAGE sql
+IMMUTABLE
+AS $$
+    SELECT '%' || replace(replace(replace(p_busca, '\', '\\'), '%', '\%'), '_', '\_') || '%';
+$$;
+
+-- Página de usuários em ordem alfabética, a partir do último username da página anterior.
+-- Traz a quantidade de empresas de cada usuário, e não a lista com os nomes.
+CREATE OR REPLACE FUNCTION usuarios_pagina(
+    p_busca TEXT DEFAULT NULL,
+    p_depois TEXT DEFAULT NULL,
+    p_limite INTEGER DEFAULT 20
+)
+RETURNS TABLE (username TEXT, permissoes TEXT, total_empresas BIGINT)
+LANGUAGE sql
+STABLE
+AS $$
+    SELECT u.username,
+           u.permissoes,
+           (SELECT count(*) FROM usuarios_empresas ue WHERE ue.username = u.username)
+    FROM users u
+    WHERE (p_busca IS NULL OR u.username ILIKE padrao_busca(p_busca))
+      AND (p_depois IS NULL OR u.username > p_depois)
+    ORDER BY u.username
+    LIMIT p_limite;
+$$;
+
+-- Inclui e remove empresas e funcionalidades de vários usuários de uma vez.
+-- Os usuários são os de p_usernames ou, com p_usernames nulo, os que batem com p_busca
+-- (todos, se p_busca também for nulo). Retorna os usuários alterados.
+-- A coluna users.empresas é refeita para os usuários alterados, por causa das políticas antigas.
+CREATE OR REPLACE FUNCTION alterar_acessos_em_lote(
+    p_usernames TEXT[] DEFAULT NULL,
+    p_busca TEXT DEFAULT NULL,
+    p_incluir_empresas BIGINT[] DEFAULT '{}',
+    p_remover_empresas BIGINT[] DEFAULT '{}',
+    p_incluir_permissoes TEXT[] DEFAULT '{}',
+    p_remover_permissoes TEXT[] DEFAULT '{}'
+)
+RETURNS TABLE (username TEXT)
+LANGUAGE plpgsql
+AS $$
+#variable_conflict use_column
+DECLARE
+    v_usernames TEXT[];
+    v_incluir_empresas BIGINT[] := coalesce(p_incluir_empresas, '{}');
+    v_remover_empresas BIGINT[] := coalesce(p_remover_empresas, '{}');
+    v_incluir_permissoes TEXT[] := coalesce(p_incluir_permissoes, '{}');
+    v_remover_permissoes TEXT[] := coalesce(p_remover_permissoes, '{}');
+BEGIN
+    SELECT array_agg(u.username) INTO v_usernames
+    FROM users u
+    WHERE (p_usernames IS NULL OR u.username = ANY(p_usernames))
+      AND (p_usernames IS NOT NULL OR p_busca IS NULL OR u.username ILIKE padrao_busca(p_busca));
+
+    IF v_usernames IS NULL THEN
+        RETURN;
+    END IF;
+
+    DELETE FROM usuarios_empresas ue
+    WHERE ue.username = ANY(v_usernames)
+      AND ue.empresa_id = ANY(v_remover_empresas);
+
+    INSERT INTO usuarios_empresas (username, empresa_id)
+    SELECT alvo.username, empresa.id
+    FROM unnest(v_usernames) AS alvo(username)
+    CROSS JOIN unnest(v_incluir_empresas) AS empresa(id)
+    WHERE NOT (empresa.id = ANY(v_remover_empresas))
+    ON CONFLICT DO NOTHING;
+
+    -- Funcionalidades continuam como texto separado por vírgula, mantendo a ordem das que já existiam
+    UPDATE users u
+    SET permissoes = array_to_string(ARRAY(
+            SELECT t.permissao
+            FROM unnest(string_to_array(coalesce(u.permissoes, ''), ',') || v_incluir_permissoes)
+                 WITH ORDINALITY AS t(permissao, ordem)
+            WHERE t.permissao <> '' AND NOT (t.permissao = ANY(v_remover_permissoes))
+            GROUP BY t.permissao
+            ORDER BY min(t.ordem)
+        ), ','),
+        empresas = CASE
+            WHEN cardinality(v_incluir_empresas) + cardinality(v_remover_empresas) = 0 THEN u.empresas
+            ELSE coalesce((
+                SELECT string_agg(e.nome, ',' ORDER BY e.nome)
+                FROM usuarios_empresas ue
+                JOIN empresas e ON e.id = ue.empresa_id
+                WHERE ue.username = u.username
+            ), '')
+        END
+    WHERE u.username = ANY(v_usernames);
+
+    RETURN QUERY SELECT unnest(v_usernames);
+END;
+$$;
+
+-- Listar usuários e permissões e alterar acessos de todos é coisa da administração:
+-- quem tem só a chave pública (anon) ou um login do Supabase Auth não chama estas funções
+REVOKE EXECUTE ON FUNCTION usuarios_pagina(TEXT, TEXT, INTEGER) FROM PUBLIC, anon, authenticated;
+REVOKE EXECUTE ON FUNCTION alterar_acessos_em_lote(TEXT[], TEXT, BIGINT[], BIGINT[], TEXT[], TEXT[]) FROM PUBLIC, anon, authenticated;
+GRANT EXECUTE ON FUNCTION usuarios_pagina(TEXT, TEXT, INTEGER) TO service_role;
+GRANT EXECUTE ON FUNCTION alterar_acessos_em_lote(TEXT[], TEXT, BIGINT[], BIGINT[], TEXT[], TEXT[]) TO service_role;
@@ -0,0 +1,29 @@
+-- Exportação de registros em páginas: registros_das_empresas ganha um cursor (data, id) e um limite,
+-- para a aplicação ler períodos longos página por página, sempre pelo índice, sem OFFSET.
+
+DROP FUNCTION IF EXISTS registros_das_empresas(BIGINT[], TIMESTAMP WITH TIME ZONE, TIMESTAMP WITH TIME ZONE);
+
+CREATE OR REPLACE FUNCTION registros_das_empresas(
+    p_empresa_ids BIGINT[] DEFAULT NULL,
+    p_data_inicio TIMESTAMP WITH TIME ZONE DEFAULT NULL,
+    p_data_fim TIMESTAMP WITH TIME ZONE DEFAULT NULL,
+    p_depois_data TIMESTAMP WITH TIME ZONE DEFAULT NULL,
+    p_depois_id BIGINT DEFAULT NULL,
+    p_limite INTEGER DEFAULT NULL
+)
+RETURNS SETOF registros
+LANGUAGE sql
+STABLE
+AS $$
+    SELECT *
+    FROM registros
+    WHERE (p_empresa_ids IS NULL OR empresa_id = ANY(p_empresa_ids))
+      AND (p_data_inicio IS NULL OR data >= p_data_inicio)
+      AND (p_data_fim IS NULL OR data < p_data_fim)
+      AND (p_depois_data IS NULL OR (data, id) > (p_depois_data, p_depois_id))
+    ORDER BY data, id
+    LIMIT p_limite;
+$$;
+
+-- Exportações de todas as empresas seguem a ordem (data, id) direto pelo índice
+CREATE INDEX IF NOT EXISTS registros_data_id ON registros (data, id);
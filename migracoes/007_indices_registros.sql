@@ -0,0 +1,91 @@
+-- Índices para os caminhos de leitura de registros e do chat.
+-- Cada índice atende uma consulta da aplicação; tests/test_planos_consultas.py confere com EXPLAIN
+-- que o Postgres usa o índice esperado e que a consulta cabe no tempo combinado.
+-- Em bases grandes já em produção, crie os índices antes com CREATE INDEX CONCURRENTLY
+-- (fora de transação); aqui o IF NOT EXISTS os deixa passar.
+
+-- Consultas por nome da empresa em ordem de data (get_registros, buscar_registros)
+CREATE INDEX IF NOT EXISTS registros_empresa_data ON registros (empresa, data DESC, id DESC);
+
+-- Página de registros com o filtro Pendente: só as linhas pendentes entram no índice
+CREATE INDEX IF NOT EXISTS registros_pendentes_empresa_data ON registros (empresa_id, data DESC, id DESC)
+WHERE status = 'Pendente';
+
+-- Chat: mensagens mais recentes e mensagens novas depois do cursor (created_at, id)
+CREATE INDEX IF NOT EXISTS messages_created_at_id ON messages (created_at, id);
+
+-- Indicadores com filtros de período que usam os índices: a coluna data é comparada direto
+-- (data::date não usa os índices de data) e os limites vazios viram -infinity/infinity.
+-- Funções SQL são planejadas sem os valores dos parâmetros; com "p_data IS NULL OR ..." o plano
+-- não sabe se o filtro vale e varre as tabelas inteiras. O resultado por dia é o mesmo.
+-- Pelo mesmo motivo o filtro de empresas é dividido em dois ramos (todas as empresas ou as de
+-- p_empresa_ids): cada ramo tem o próprio plano e o que não vale é descartado antes de executar.
+CREATE OR REPLACE FUNCTION indicadores_registros(
+    p_empresa_ids BIGINT[] DEFAULT NULL,
+    p_data_inicio TIMESTAMP WITH TIME ZONE DEFAULT NULL,
+    p_data_fim TIMESTAMP WITH TIME ZONE DEFAULT NULL,
+    p_top_erros INTEGER DEFAULT 5
+)
+RETURNS JSONB
+LANGUAGE sql
+STABLE
+AS $$
+    WITH base AS (
+        SELECT dia, empresa, tipo_nota, status, quantidade, com_erro
+        FROM registros_diarios
+        WHERE p_empresa_ids IS NULL
+          AND dia >= COALESCE(p_data_inicio::date, '-infinity')
+          AND dia < COALESCE(p_data_fim::date, 'infinity')
+        UNION ALL
+        SELECT dia, empresa, tipo_nota, status, quantidade, com_erro
+        FROM registros_diarios
+        WHERE empresa_id = ANY(p_empresa_ids)
+          AND dia >= COALESCE(p_data_inicio::date, '-infinity')
+          AND dia < COALESCE(p_data_fim::date, 'infinity')
+    ),
+    erros AS (
+        SELECT erro FROM registros
+        WHERE p_empresa_ids IS NULL
+          AND NULLIF(erro, '') IS NOT NULL
+          AND data >= COALESCE(p_data_inicio::date, '-infinity')
+          AND data < COALESCE(p_data_fim::date, 'infinity')
+        UNION ALL
+        SELECT erro FROM registros
+        WHERE empresa_id = ANY(p_empresa_ids)
+          AND NULLIF(erro, '') IS NOT NULL
+          AND data >= COALESCE(p_data_inicio::date, '-infinity')
+          AND data < COALESCE(p_data_fim::date, 'infinity')
+    )
+    SELECT jsonb_build_object(
+        'total', (SELECT COALESCE(sum(quantidade), 0) FROM base),
+        'com_erro', (SELECT COALESCE(sum(com_erro), 0) FROM base),
+        'por_empresa', COALESCE((
+            SELECT jsonb_agg(jsonb_build_object('empresa', empresa, 'quantidade', quantidade) ORDER BY quantidade DESC, empresa)
+            FROM (SELECT empresa, sum(quantidade) AS quantidade FROM base GROUP BY empresa) t
+        ), '[]'::jsonb),
+        'por_tipo_nota', COALESCE((
+            SELECT jsonb_agg(jsonb_build_object('tipo_nota', tipo_nota, 'quantidade', quantidade) ORDER BY quantidade DESC, tipo_nota)
+            FROM (SELECT tipo_nota, sum(quantidade) AS quantidade FROM base GROUP BY tipo_nota) t
+        ), '[]'::jsonb),
+        'por_status', COALESCE((
+            SELECT jsonb_agg(jsonb_build_object('status', status, 'quantidade', quantidade) ORDER BY quantidade DESC, status)
+            FROM (SELECT status, sum(quantidade) AS quantidade FROM base GROUP BY status) t
+        ), '[]'::jsonb),
+        'erros_frequentes', COALESCE((
+            SELECT jsonb_agg(jsonb_build_object('erro', erro, 'quantidade', quantidade) ORDER BY quantidade DESC, erro)
+            FROM (
+                SELECT erro, count(*) AS quantidade FROM erros
+                GROUP BY erro
+                ORDER BY quantidade DESC, erro
+                LIMIT p_top_erros
+            ) t
+        ), '[]'::jsonb),
+        'por_dia', COALESCE((
+            SELECT jsonb_agg(jsonb_build_object('dia', dia, 'quantidade', quantidade) ORDER BY dia)
+            FROM (SELECT dia, sum(quantidade) AS quantidade FROM base GROUP BY dia) t
+        ), '[]'::jsonb)
+    );
+$$;
+
+ANALYZE registros;
+ANALYZE messages;
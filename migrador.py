@@ -0,0 +1,82 @@
+import argparse
+import os
+import re
+from pathlib import Path
+
+# Pasta com as migrações, aplicadas em ordem pelo número do nome (NNN_descricao.sql)
+PASTA_MIGRACOES = Path(__file__).resolve().parent / "migracoes"
+PADRAO_MIGRACAO = re.compile(r"^(\d{3})_.+\.sql$")
+
+# Tabela com as versões já aplicadas em cada banco
+SQL_CONTROLE = """
+CREATE TABLE IF NOT EXISTS migracoes_aplicadas (
+    versao INTEGER PRIMARY KEY,
+    nome TEXT NOT NULL,
+    aplicada_em TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT NOW()
+)
+"""
+
+# Função para listar as migrações da pasta em ordem: [(versão, nome do arquivo, caminho)]
+def listar_migracoes(pasta=PASTA_MIGRACOES):
+    migracoes = []
+    for caminho in sorted(Path(pasta).glob("*.sql")):
+        encontrado = PADRAO_MIGRACAO.match(caminho.name)
+        if encontrado:
+            migracoes.append((int(encontrado.group(1)), caminho.name, caminho))
+
+    versoes = [versao for versao, _, _ in migracoes]
+    repetidas = sorted({versao for versao in versoes if versoes.count(versao) > 1})
+    if repetidas:
+        raise ValueError(f"Versões de migração repetidas: {repetidas}")
+    return migracoes
+
+# Função para buscar as versões já aplicadas num banco (cria a tabela de controle, se faltar)
+def versoes_aplicadas(conexao):
+    with conexao.transaction():
+        conexao.execute(SQL_CONTROLE)
+        return {linha[0] for linha in conexao.execute("SELECT versao FROM migracoes_aplicadas")}
+
+# Função para aplicar as migrações pendentes, cada uma na sua transação
+# conexao é uma conexão do psycopg com autocommit. ate limita a última versão aplicada;
+# apenas_marcar registra as versões sem rodar o SQL (bancos em que ele já foi rodado à mão).
+# Retorna os nomes das migrações aplicadas.
+def aplicar_migracoes(conexao, ate=None, apenas_marcar=False, pasta=PASTA_MIGRACOES):
+    ja_aplicadas = versoes_aplicadas(conexao)
+    aplicadas = []
+    for versao, nome, caminho in listar_migracoes(pasta):
+        if versao in ja_aplicadas or (ate is not None and versao > ate):
+            continue
+        with conexao.transaction():
+            if not apenas_marcar:
+                conexao.execute(caminho.read_text(encoding="utf-8"))
+            conexao.execute("INSERT INTO migracoes_aplicadas (versao, nome) VALUES (%s, %s)", (versao, nome))
+        aplicadas.append(nome)
+    return aplicadas
+
+if __name__ == "__main__":
+    import psycopg
+    from dotenv import load_dotenv
+
+    parser = argparse.ArgumentParser(description="Aplica as migrações pendentes da pasta migracoes.")
+    parser.add_argument("--banco", help="URL de conexão do Postgres (padrão: variável DATABASE_URL)")
+    parser.add_argument("--ate", type=int, help="última versão a aplicar")
+    parser.add_argument("--marcar-aplicadas", action="store_true", help="só registra as versões, sem rodar o SQL")
+    parser.add_argument("--listar", action="store_true", help="mostra as migrações e se já foram aplicadas")
+    argumentos = parser.parse_args()
+
+    load_dotenv()
+    url_banco = argumentos.banco or os.getenv("DATABASE_URL")
+    if not url_banco:
+        parser.error("informe --banco ou defina DATABASE_URL")
+
+    with psycopg.connect(url_banco, autocommit=True) as conexao:
+        if argumentos.listar:
+            ja_aplicadas = versoes_aplicadas(conexao)
+            for versao, nome, _ in listar_migracoes():
+                print(f"{'✅' if versao in ja_aplicadas else '⏳'} {nome}")
+            raise SystemExit(0)
+
+        aplicadas = aplicar_migracoes(conexao, argumentos.ate, argumentos.marcar_aplicadas)
+        for nome in aplicadas:
+            print(f"{'Marcada' if argumentos.marcar_aplicadas else 'Aplicada'}: {nome}")
+        print(f"{len(aplicadas)} migração(ões) {'marcada(s)' if argumentos.marcar_aplicadas else 'aplicada(s)'}.")
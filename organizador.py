@@ -0,0 +1,270 @@
+import multiprocessing
+import os
+import re
+import shutil
+import tempfile
+import threading
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from datetime import datetime
+
+# Tamanho máximo (em bytes) do ZIP de saída mantido em memória antes de ir para o disco
+LIMITE_MEMORIA_SAIDA = 64 * 1024 * 1024
+
+# Quantidade de arquivos enviada de uma vez para classificação
+TAMANHO_LOTE_CLASSIFICACAO = 512
+
+# Abaixo desta quantidade de arquivos o lote é classificado sem o pool de processos
+MINIMO_PARALELO = 32
+
+# Quantidade de arquivos entregue a cada processo por vez
+CHUNKSIZE_CLASSIFICACAO = 16
+
+# Bytes do início do arquivo examinados na classificação
+TAMANHO_PREFIXO = 8 * 1024
+
+# Tamanho do bloco usado ao copiar os arquivos para o ZIP de saída
+TAMANHO_BLOCO_COPIA = 1024 * 1024
+
+# Tamanho máximo (em bytes) de um membro mantido em memória enquanto é conferido, antes de ir para o disco
+LIMITE_MEMORIA_MEMBRO = 8 * 1024 * 1024
+
+# Nome do arquivo, na raiz do ZIP de saída, com os arquivos que não puderam ser lidos
+NOME_LISTA_FALHAS = "ARQUIVOS_COM_FALHA.txt"
+
+# Pool de processos da classificação, criado na primeira organização e reaproveitado pelo processo
+# Os processos são iniciados por forkserver (ou spawn): o servidor do Streamlit tem várias threads
+# e um fork direto dele copiaria travas em uso por outras threads.
+executor_classificacao = None
+trava_executor = threading.Lock()
+
+# Assinaturas binárias conhecidas
+ASSINATURA_ZIP = b"PK\x03\x04"
+ASSINATURA_OLE2 = b"\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1"  # .xls antigo
+BOM_UTF8 = b"\xef\xbb\xbf"
+
+# Modelo da NFC-e (posições 21-22 da chave de acesso ou tag <mod>)
+MODELO_NFCE = b"65"
+
+REGEX_TAG_RAIZ = re.compile(rb"<(?![?!])(?:[\w.-]+:)?([\w.-]+)")
+REGEX_CHAVE_NFE = re.compile(rb'(?:Id="NFe|<chNFe>)(\d{44})')
+REGEX_MODELO = re.compile(rb"<mod>(\d{2})</mod>")
+
+# Função para obter o modelo de um XML da família NF-e (55 = NF-e, 65 = NFC-e)
+def modelo_nfe(prefixo):
+    chave = REGEX_CHAVE_NFE.search(prefixo)
+    if chave:
+        return chave.group(1)[20:22]
+    modelo = REGEX_MODELO.search(prefixo)
+    return modelo.group(1) if modelo else None
+
+# Função para classificar um XML pelo elemento raiz e pelo namespace
+def identificar_xml(prefixo):
+    minusculo = prefixo.lower()
+    raiz = REGEX_TAG_RAIZ.search(prefixo)
+    raiz = raiz.group(1).lower() if raiz else b""
+
+    if b"portalfiscal.inf.br/nfe" in minusculo or raiz in (b"nfeproc", b"nfe", b"envinfe", b"proceventonfe"):
+        return "NFCE" if modelo_nfe(prefixo) == MODELO_NFCE else "NFE"
+    if b"portalfiscal.inf.br/cte" in minusculo or raiz.startswith(b"cte") or raiz == b"proceventocte":
+        return "CTE"
+    if b"nfse" in minusculo:
+        return "NFS"
+    return None
+
+# Função para identificar o tipo de documento fiscal pelos primeiros bytes do arquivo
+# Só os primeiros TAMANHO_PREFIXO bytes são examinados, então o custo não cresce com o arquivo.
+def identificar_tipo_documento(prefixo):
+    prefixo = prefixo[:TAMANHO_PREFIXO]
+
+    if prefixo.startswith(ASSINATURA_ZIP):
+        # .xlsx é um ZIP com as planilhas em xl/
+        return "PLANILHA" if b"xl/" in prefixo else "OUTROS"
+    if prefixo.startswith(ASSINATURA_OLE2):
+        return "PLANILHA"
+
+    texto = prefixo[len(BOM_UTF8):] if prefixo.startswith(BOM_UTF8) else prefixo
+    texto = texto.lstrip()
+
+    if texto.startswith(b"|0000|"):
+        return "SPED"
+    if texto.startswith(b"<"):
+        categoria = identificar_xml(texto)
+        if categoria:
+            return categoria
+
+    # Arquivos sem cabeçalho reconhecido: mesmas pistas de antes, só no prefixo
+    minusculo = texto.lower()
+    if b"|c100|" in minusculo or b"|c170|" in minusculo:
+        return "SPED"
+    if b"nfse" in minusculo:
+        return "NFS"
+    if any(ext in minusculo for ext in [b".xls", b".xlsx", b"csv"]):
+        return "PLANILHA"
+    return "OUTROS"
+
+# Função para identificar o tipo de documento fiscal pelo conteúdo
+def verificar_conteudo_arquivo(conteudo):
+    try:
+        # Só o início do arquivo interessa para a classificação
+        if isinstance(conteudo, str):
+            conteudo = conteudo[:TAMANHO_PREFIXO].encode('utf-8', errors='ignore')
+        return identificar_tipo_documento(bytes(conteudo[:TAMANHO_PREFIXO]))
+    except Exception:
+        return "OUTROS"
+
+# Função para gerar um nome ainda não usado dentro do ZIP de saída
+def nome_unico(nome, nomes_usados):
+    base, extensao = os.path.splitext(nome)
+    candidato = nome
+    contador = 1
+    while candidato in nomes_usados:
+        candidato = f"{base}_{contador}{extensao}"
+        contador += 1
+    nomes_usados.add(candidato)
+    return candidato
+
+# Função para ler um membro inteiro para um arquivo temporário, em blocos
+# A leitura até o fim confere o CRC do membro; um membro corrompido falha aqui, antes de
+# qualquer entrada ser aberta no ZIP de saída.
+def copiar_para_temporario(origem):
+    copia = tempfile.SpooledTemporaryFile(max_size=LIMITE_MEMORIA_MEMBRO)
+    try:
+        shutil.copyfileobj(origem, copia, TAMANHO_BLOCO_COPIA)
+    except BaseException:
+        copia.close()
+        raise
+    copia.seek(0)
+    return copia
+
+# Função para copiar um arquivo já classificado para o ZIP de saída, em blocos
+def gravar_no_zip(zip_saida, categoria, nome_original, origem, tamanho, timestamp, nomes_usados):
+    nome_arquivo = f"{timestamp}_{os.path.basename(nome_original)}"
+    nome_destino = nome_unico(f"{categoria}/{nome_arquivo}", nomes_usados)
+    with zip_saida.open(nome_destino, "w", force_zip64=tamanho >= zipfile.ZIP64_LIMIT) as destino:
+        shutil.copyfileobj(origem, destino, TAMANHO_BLOCO_COPIA)
+
+# Função para dividir uma lista em lotes de tamanho fixo
+def agrupar_em_lotes(itens, tamanho_lote=TAMANHO_LOTE_CLASSIFICACAO):
+    for inicio in range(0, len(itens), tamanho_lote):
+        yield itens[inicio:inicio + tamanho_lote]
+
+# Função para interpretar a quantidade de processos configurada (vazio = um por núcleo, 1 = sequencial)
+# Valores inválidos levantam ValueError com a mensagem a mostrar; quem lê a configuração decide o padrão.
+def interpretar_workers(valor):
+    if valor is None or not valor.strip():
+        return None
+    try:
+        workers = int(valor)
+    except ValueError:
+        workers = 0
+    if workers < 1:
+        raise ValueError(f"ORGANIZADOR_WORKERS inválido ({valor!r}): use um inteiro maior que zero.")
+    return workers
+
+# Função para obter o pool de processos da classificação (None = modo sequencial)
+# O pool é criado uma vez por processo, com o max_workers da primeira chamada.
+def obter_executor(max_workers=None):
+    global executor_classificacao
+    if max_workers == 1:
+        return None
+    with trava_executor:
+        if executor_classificacao is None:
+            metodo = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+            try:
+                executor_classificacao = ProcessPoolExecutor(max_workers=max_workers, mp_context=multiprocessing.get_context(metodo))
+            except Exception:
+                return None
+        return executor_classificacao
+
+# Função para descartar um pool quebrado (um processo morreu); o próximo obter_executor cria outro
+def descartar_executor(executor):
+    global executor_classificacao
+    with trava_executor:
+        if executor_classificacao is executor:
+            executor_classificacao = None
+    executor.shutdown(wait=False)
+
+# Função para classificar um lote de prefixos, mantendo a ordem de entrada
+# Lotes pequenos, ou qualquer falha do pool, caem no modo sequencial.
+def classificar_lote(prefixos, executor=None):
+    if executor is not None and len(prefixos) >= MINIMO_PARALELO:
+        try:
+            return list(executor.map(verificar_conteudo_arquivo, prefixos, chunksize=CHUNKSIZE_CLASSIFICACAO))
+        except BrokenProcessPool:
+            descartar_executor(executor)
+        except Exception:
+            pass
+    return [verificar_conteudo_arquivo(prefixo) for prefixo in prefixos]
+
+# Função para ler o prefixo de cada membro do lote (None se o membro estiver corrompido)
+def ler_prefixos(zip_entrada, lote):
+    prefixos = []
+    for zip_info in lote:
+        try:
+            with zip_entrada.open(zip_info) as membro:
+                prefixos.append(membro.read(TAMANHO_PREFIXO))
+        except Exception:
+            prefixos.append(None)
+    return prefixos
+
+# Função para organizar os membros de um ZIP enviado, lote a lote
+# Membros que não puderam ser lidos vão para falhas como "arquivo.zip/membro: motivo".
+def organizar_zip(arquivo, zip_saida, executor, timestamp, nomes_usados, falhas):
+    try:
+        zip_entrada = zipfile.ZipFile(arquivo, 'r')
+    except Exception as e:
+        falhas.append(f"{arquivo.name}: {e}")
+        return
+
+    with zip_entrada:
+        membros = [zip_info for zip_info in zip_entrada.infolist() if not zip_info.is_dir()]  # Ignorar diretórios
+
+        for lote in agrupar_em_lotes(membros):
+            prefixos = ler_prefixos(zip_entrada, lote)
+            falhas.extend(f"{arquivo.name}/{zip_info.filename}: não foi possível ler" for zip_info, prefixo in zip(lote, prefixos) if prefixo is None)
+            validos = [(zip_info, prefixo) for zip_info, prefixo in zip(lote, prefixos) if prefixo is not None]
+            categorias = classificar_lote([prefixo for _, prefixo in validos], executor)
+
+            for (zip_info, _), categoria in zip(validos, categorias):
+                try:
+                    with zip_entrada.open(zip_info) as membro:
+                        copia = copiar_para_temporario(membro)
+                except Exception as e:
+                    falhas.append(f"{arquivo.name}/{zip_info.filename}: {e}")
+                    continue
+                with copia:
+                    gravar_no_zip(zip_saida, categoria, zip_info.filename, copia, zip_info.file_size, timestamp, nomes_usados)
+
+# Função para organizar os arquivos por categoria direto em um ZIP de saída
+# Cada arquivo é classificado só pelo prefixo e copiado em blocos para o ZIP de
+# saída; o ZIP de saída só é despejado em um arquivo temporário quando passa de
+# limite_memoria. A classificação dos membros de ZIP roda em lotes no pool de
+# processos compartilhado (max_workers=1 desliga o pool).
+# Arquivos que não puderam ser lidos ficam fora das pastas e são listados em NOME_LISTA_FALHAS.
+# Retorna o ZIP de saída e a lista de falhas.
+def organizar_arquivos(uploaded_files, limite_memoria=LIMITE_MEMORIA_SAIDA, max_workers=None):
+    saida = tempfile.SpooledTemporaryFile(max_size=limite_memoria)
+    timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+    nomes_usados = set()
+    falhas = []
+    executor = obter_executor(max_workers)
+
+    with zipfile.ZipFile(saida, "w", zipfile.ZIP_DEFLATED) as zip_saida:
+        for arquivo in uploaded_files:
+            arquivo.seek(0)
+
+            if arquivo.name.endswith(".zip"):
+                organizar_zip(arquivo, zip_saida, executor, timestamp, nomes_usados, falhas)
+            else:
+                # Arquivos avulsos já estão inteiros em memória (UploadedFile)
+                categoria = verificar_conteudo_arquivo(arquivo.read(TAMANHO_PREFIXO))
+                arquivo.seek(0)
+                gravar_no_zip(zip_saida, categoria, arquivo.name, arquivo, getattr(arquivo, "size", 0), timestamp, nomes_usados)
+
+        if falhas:
+            zip_saida.writestr(nome_unico(NOME_LISTA_FALHAS, nomes_usados), "\n".join(falhas) + "\n")
+
+    saida.seek(0)
+    return saida, falhas
@@ -0,0 +1,212 @@
+import re
+import time
+from datetime import datetime
+
+import httpx
+import pandas as pd
+
+from cache import em_cache, invalidar_cache
+
+# Tipos de nota aceitos nos registros de importação
+TIPOS_NOTA = ["NFE entrada", "NFE saída", "CTE entrada", "CTE saída", "CTE cancelado", "SPED", "NFS tomado", "NFS prestado", "Planilha", "NFCE saída"]
+
+# Status possíveis de um registro de importação
+STATUS_REGISTRO = ["Pendente", "OK", "Resolvido"]
+
+# Opções de tamanho de página na listagem de registros
+TAMANHOS_PAGINA = [25, 50, 100, 200]
+
+# Quantidade de erros no ranking de erros mais frequentes
+TOP_ERROS = 5
+
+# Quantidade máxima de registros enviada em cada insert
+TAMANHO_LOTE_INSERCAO = 500
+
+# Códigos do Postgres de erros causados por linhas do lote (dados inválidos, restrições, política de RLS)
+# Só esses erros fazem o lote ser dividido para isolar as linhas com problema.
+PADRAO_ERRO_DE_LINHA = re.compile(r"^(22|23)[0-9A-Z]{3}$|^42501$")
+
+# Tentativas de um insert quando a conexão nem chega a abrir, e espera (em segundos) antes da segunda
+TENTATIVAS_INSERCAO = 3
+ESPERA_INICIAL_INSERCAO = 1
+
+# Função para extrair a mensagem de erro de uma resposta do Supabase (None se não houver erro)
+def erro_da_resposta(response):
+    if not response:
+        return "Erro desconhecido"
+    if hasattr(response, 'error') and response.error:
+        return response.error.message if hasattr(response.error, 'message') else str(response.error)
+    return None
+
+# Função para montar os dados de um registro de importação
+# empresa_id vazio é preenchido pelo banco a partir do nome (trigger registros_preencher_empresa).
+def montar_registro(empresa, tipo_nota, erro, arquivo_path=None, tipo_arquivo=None, usuario=None, data=None, empresa_id=None):
+    return {
+        "data": data or datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+        "empresa": empresa,
+        "empresa_id": empresa_id,
+        "tipo_nota": tipo_nota,
+        "erro": erro or None,
+        "arquivo_erro": arquivo_path if erro else None,
+        "status": "OK" if not erro else "Pendente",
+        "arquivo": arquivo_path or None,
+        "tipo_arquivo": tipo_arquivo,
+        "usuario": usuario
+    }
+
+# Função para validar um registro localmente, sem ir ao banco (None se estiver válido)
+# empresas_permitidas é o conjunto de ids das empresas do usuário.
+def validar_registro(registro, empresas_permitidas):
+    if not registro.get("empresa"):
+        return "Empresa não informada"
+    if registro.get("empresa_id") is None:
+        return f"Empresa não cadastrada: {registro['empresa']}"
+    if registro["empresa_id"] not in empresas_permitidas:
+        return f"Sem permissão para a empresa {registro['empresa']}"
+    if registro.get("tipo_nota") not in TIPOS_NOTA:
+        return f"Tipo de nota inválido: {registro.get('tipo_nota')}"
+    return None
+
+# Função para fazer um insert de várias linhas
+# Só falhas ao abrir a conexão são repetidas (com espera dobrando): nelas o pedido não chegou
+# ao servidor. Depois de um timeout ou de um 5xx o insert pode ter sido gravado, então não há
+# nova tentativa, para não duplicar registros.
+# Retorna (mensagem de erro, código do Postgres), ou (None, None) se deu certo.
+def tentar_insert(supabase, linhas):
+    espera = ESPERA_INICIAL_INSERCAO
+    for tentativa in range(TENTATIVAS_INSERCAO):
+        try:
+            response = supabase.table("registros").insert(linhas).execute()
+        except (httpx.ConnectError, httpx.ConnectTimeout, httpx.PoolTimeout) as e:
+            if tentativa == TENTATIVAS_INSERCAO - 1:
+                return str(e), None
+            time.sleep(espera)
+            espera *= 2
+            continue
+        except Exception as e:
+            return str(e), getattr(e, "code", None)
+
+        erro = erro_da_resposta(response)
+        return erro, getattr(getattr(response, "error", None), "code", None) if erro else None
+
+# Função para enviar um lote em um único insert
+# Se o banco recusar linhas do lote (PADRAO_ERRO_DE_LINHA), ele é dividido ao meio até isolar
+# as linhas com problema; qualquer outra falha vale para o lote inteiro.
+def enviar_lote(supabase, lote, falhas):
+    erro, codigo = tentar_insert(supabase, [registro for _, registro in lote])
+    if not erro:
+        return len(lote)
+
+    if len(lote) == 1 or not PADRAO_ERRO_DE_LINHA.match(str(codigo or "")):
+        falhas.extend((indice, erro) for indice, _ in lote)
+        return 0
+
+    meio = len(lote) // 2
+    return enviar_lote(supabase, lote[:meio], falhas) + enviar_lote(supabase, lote[meio:], falhas)
+
+# Função para inserir vários registros com inserts de várias linhas
+# empresas_permitidas é o conjunto de ids das empresas do usuário.
+# Retorna a quantidade inserida e a lista de falhas como (índice da linha, motivo).
+def inserir_registros_em_lote(supabase, registros, empresas_permitidas, tamanho_lote=TAMANHO_LOTE_INSERCAO):
+    empresas_permitidas = frozenset(empresas_permitidas)
+    falhas = []
+    validos = []
+
+    for indice, registro in enumerate(registros):
+        erro = validar_registro(registro, empresas_permitidas)
+        if erro:
+            falhas.append((indice, erro))
+        else:
+            validos.append((indice, registro))
+
+    inseridos = 0
+    for inicio in range(0, len(validos), tamanho_lote):
+        inseridos += enviar_lote(supabase, validos[inicio:inicio + tamanho_lote], falhas)
+
+    if inseridos:
+        invalidar_cache("registros")
+
+    falhas.sort()
+    return inseridos, falhas
+
+# Função para buscar uma página de registros de uma empresa (pelo id), do mais recente para o mais antigo
+# A paginação é por cursor: cursor é o par (data, id) do último registro da página anterior,
+# e a ordem (data, id) garante que registros com a mesma data não se repitam nem se percam.
+# Retorna as linhas da página e se ainda existe uma próxima página.
+@em_cache("registros")
+def buscar_pagina_registros(supabase, empresa_id, tamanho_pagina, cursor=None, status=None, tipo_nota=None):
+    query = supabase.table("registros").select("*").eq("empresa_id", empresa_id)
+
+    if status:
+        query = query.eq("status", status)
+    if tipo_nota:
+        query = query.eq("tipo_nota", tipo_nota)
+    if cursor:
+        data, registro_id = cursor
+        query = query.or_(f'data.lt."{data}",and(data.eq."{data}",id.lt.{registro_id})')
+
+    # Uma linha a mais só para saber se existe próxima página
+    response = query.order("data", desc=True).order("id", desc=True).limit(tamanho_pagina + 1).execute()
+
+    erro = erro_da_resposta(response)
+    if erro:
+        raise Exception(erro)
+
+    linhas = response.data or []
+    return linhas[:tamanho_pagina], len(linhas) > tamanho_pagina
+
+# Função para buscar os indicadores já agregados no Postgres (função indicadores_registros)
+# Só os totais trafegam: contagens por empresa, tipo de nota, status, erros mais frequentes e por dia.
+# empresa_ids é a tupla de ids das empresas, ou None para todas (ver empresas.filtro_empresas).
+@em_cache("registros")
+def buscar_indicadores(supabase, empresa_ids, data_inicio=None, data_fim=None, top_erros=TOP_ERROS):
+    response = supabase.rpc("indicadores_registros", {
+        "p_empresa_ids": list(empresa_ids) if empresa_ids is not None else None,
+        "p_data_inicio": data_inicio.isoformat() if data_inicio else None,
+        "p_data_fim": data_fim.isoformat() if data_fim else None,
+        "p_top_erros": top_erros
+    }).execute()
+
+    erro = erro_da_resposta(response)
+    if erro:
+        raise Exception(erro)
+
+    return response.data
+
+# Função para contar os valores de uma coluna no formato devolvido por indicadores_registros
+def contar_valores(serie, nome_coluna):
+    return [{nome_coluna: valor, "quantidade": int(quantidade)} for valor, quantidade in serie.value_counts().items()]
+
+# Função para calcular os mesmos indicadores a partir de um DataFrame já carregado
+def agregar_registros(registros, top_erros=TOP_ERROS):
+    if registros.empty:
+        return {"total": 0, "com_erro": 0, "por_empresa": [], "por_tipo_nota": [], "por_status": [], "erros_frequentes": [], "por_dia": []}
+
+    erros = registros["erro"].dropna()
+    erros = erros[erros != ""]
+    por_dia = registros.groupby(pd.to_datetime(registros["data"]).dt.date).size()
+
+    return {
+        "total": len(registros),
+        "com_erro": len(erros),
+        "por_empresa": contar_valores(registros["empresa"], "empresa"),
+        "por_tipo_nota": contar_valores(registros["tipo_nota"], "tipo_nota"),
+        "por_status": contar_valores(registros["status"], "status"),
+        "erros_frequentes": contar_valores(erros, "erro")[:top_erros],
+        "por_dia": [{"dia": dia.isoformat(), "quantidade": int(quantidade)} for dia, quantidade in por_dia.items()]
+    }
+
+# Função para recalcular a tabela registros_diarios a partir de registros (datas incluídas)
+# No dia a dia a tabela é mantida por trigger; isto serve para a carga inicial ou para corrigir um período.
+def recalcular_registros_diarios(supabase, data_inicio=None, data_fim=None):
+    response = supabase.rpc("recalcular_registros_diarios", {
+        "p_data_inicio": data_inicio.isoformat() if data_inicio else None,
+        "p_data_fim": data_fim.isoformat() if data_fim else None
+    }).execute()
+
+    erro = erro_da_resposta(response)
+    if erro:
+        raise Exception(erro)
+
+    invalidar_cache("registros")
+    return response.data
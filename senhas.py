@@ -0,0 +1,108 @@
+import argparse
+import base64
+import hashlib
+import hmac
+import os
+import statistics
+import time
+
+# Custo do scrypt (variáveis SENHA_SCRYPT_N, SENHA_SCRYPT_R e SENHA_SCRYPT_P)
+# N dobra o tempo e a memória de cada login; use "python senhas.py --benchmark" para escolher.
+SCRYPT_N = int(os.getenv("SENHA_SCRYPT_N", str(2 ** 14)))
+SCRYPT_R = int(os.getenv("SENHA_SCRYPT_R", "8"))
+SCRYPT_P = int(os.getenv("SENHA_SCRYPT_P", "1"))
+
+TAMANHO_SAL = 16
+TAMANHO_HASH = 32
+
+# Hash de uma senha qualquer, comparado quando o usuário não existe,
+# para o login demorar o mesmo tempo com ou sem usuário
+hash_ficticio = None
+
+# Função para codificar bytes em base64 sem o preenchimento
+def codificar(dados):
+    return base64.b64encode(dados).decode("ascii").rstrip("=")
+
+# Função para decodificar base64 sem o preenchimento
+def decodificar(texto):
+    return base64.b64decode(texto + "=" * (-len(texto) % 4))
+
+# Função para derivar a chave de uma senha com scrypt
+def derivar_scrypt(password, sal, n, r, p):
+    return hashlib.scrypt(password.encode(), salt=sal, n=n, r=r, p=p, maxmem=256 * n * r + 1024 * 1024, dklen=TAMANHO_HASH)
+
+# Função para hashear senha (scrypt com sal aleatório)
+# Formato: scrypt$N$r$p$sal$hash, com o custo guardado junto para poder ser aumentado depois.
+def hash_password(password, n=None, r=None, p=None):
+    n, r, p = n or SCRYPT_N, r or SCRYPT_R, p or SCRYPT_P
+    sal = os.urandom(TAMANHO_SAL)
+    return f"scrypt${n}${r}${p}${codificar(sal)}${codificar(derivar_scrypt(password, sal, n, r, p))}"
+
+# Função para saber se um hash é do formato antigo (SHA-256 sem sal, em hexadecimal)
+def hash_legado(hash_guardado):
+    return len(hash_guardado) == 64 and "$" not in hash_guardado
+
+# Função para conferir uma senha com o hash guardado, em tempo constante
+# Aceita o formato scrypt e os hashes SHA-256 antigos.
+def verificar_senha(password, hash_guardado):
+    if not hash_guardado:
+        return False
+
+    if hash_legado(hash_guardado):
+        return hmac.compare_digest(hashlib.sha256(password.encode()).hexdigest(), hash_guardado)
+
+    try:
+        algoritmo, n, r, p, sal, esperado = hash_guardado.split("$")
+        if algoritmo != "scrypt":
+            return False
+        calculado = derivar_scrypt(password, decodificar(sal), int(n), int(r), int(p))
+        return hmac.compare_digest(calculado, decodificar(esperado))
+    except (ValueError, TypeError):
+        return False
+
+# Função para gastar o mesmo tempo de uma verificação quando o usuário não existe
+def verificar_senha_ficticia(password):
+    global hash_ficticio
+    if hash_ficticio is None:
+        hash_ficticio = hash_password("senha-ficticia")
+    verificar_senha(password, hash_ficticio)
+    return False
+
+# Função para saber se um hash deve ser refeito no próximo login (formato antigo ou custo diferente do atual)
+def precisa_rehash(hash_guardado):
+    if not hash_guardado or hash_legado(hash_guardado):
+        return True
+    partes = hash_guardado.split("$")
+    return len(partes) != 6 or partes[0] != "scrypt" or partes[1:4] != [str(SCRYPT_N), str(SCRYPT_R), str(SCRYPT_P)]
+
+# Função para medir o tempo de um login (uma verificação) com o custo informado
+# Retorna os tempos de cada repetição, em segundos.
+def medir_login(n=None, r=None, p=None, repeticoes=20):
+    hash_guardado = hash_password("senha-de-teste", n, r, p)
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        verificar_senha("senha-de-teste", hash_guardado)
+        tempos.append(time.perf_counter() - inicio)
+    return tempos
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Mede o tempo de login com o custo do scrypt.")
+    parser.add_argument("--benchmark", action="store_true", help="mede a latência de uma verificação de senha")
+    parser.add_argument("-n", type=int, action="append", help="valores de N a medir (padrão: o configurado)")
+    parser.add_argument("-r", type=int, default=SCRYPT_R, help="parâmetro r do scrypt")
+    parser.add_argument("-p", type=int, default=SCRYPT_P, help="parâmetro p do scrypt")
+    parser.add_argument("--repeticoes", type=int, default=20, help="verificações medidas por valor de N")
+    argumentos = parser.parse_args()
+
+    if not argumentos.benchmark:
+        parser.print_help()
+        raise SystemExit(0)
+
+    for n in argumentos.n or [SCRYPT_N]:
+        tempos = sorted(medir_login(n, argumentos.r, argumentos.p, argumentos.repeticoes))
+        media = statistics.mean(tempos)
+        p95 = tempos[min(len(tempos) - 1, int(len(tempos) * 0.95))]
+        memoria = 128 * n * argumentos.r / 1024 / 1024
+        print(f"N={n} r={argumentos.r} p={argumentos.p}: média {media * 1000:.1f} ms, p95 {p95 * 1000:.1f} ms, "
+              f"{memoria:.0f} MB por login, ~{1 / media:.1f} logins/s por núcleo")
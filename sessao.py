@@ -0,0 +1,152 @@
+import base64
+import hashlib
+import hmac
+import json
+import os
+import secrets
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import streamlit as st
+
+from empresas import empresas_do_usuario, nomes_das_empresas
+from registros import erro_da_resposta
+
+# Chave usada para assinar os tokens de sessão (variável SESSAO_SEGREDO)
+# Sem a variável, cada processo gera a sua; as sessões do Streamlit também não passam de um processo para outro.
+SEGREDO_SESSAO = os.getenv("SESSAO_SEGREDO", "").encode("utf-8") or secrets.token_bytes(32)
+
+# Validade do token (em segundos) e intervalo em que empresas e permissões são relidas do banco
+VALIDADE_SESSAO = 8 * 60 * 60
+INTERVALO_RENOVACAO = 5 * 60
+
+# Renovações rodam fora da execução da página; o resultado é aplicado na execução seguinte
+executor_renovacao = ThreadPoolExecutor(max_workers=2, thread_name_prefix="renovacao-sessao")
+
+# Usuários alterados pelo administrador neste processo: username -> instante da alteração
+# Sessões com token anterior à alteração são renovadas na próxima execução, sem esperar o intervalo.
+usuarios_alterados = {}
+trava_sessao = threading.Lock()
+
+# Função para codificar bytes em base64 de URL, sem o preenchimento
+def codificar(dados):
+    return base64.urlsafe_b64encode(dados).rstrip(b"=").decode("ascii")
+
+# Função para decodificar base64 de URL sem o preenchimento
+def decodificar(texto):
+    return base64.urlsafe_b64decode(texto + "=" * (-len(texto) % 4))
+
+# Função para assinar o conteúdo de um token
+def assinar(conteudo):
+    return codificar(hmac.new(SEGREDO_SESSAO, conteudo.encode("ascii"), hashlib.sha256).digest())
+
+# Função para emitir um token de sessão assinado com o usuário, os ids das empresas e as permissões
+def emitir_token(username, empresa_ids, permissoes, agora=None):
+    agora = int(agora or time.time())
+    dados = {"u": username, "e": sorted(empresa_ids), "p": list(permissoes), "iat": agora, "exp": agora + VALIDADE_SESSAO}
+    conteudo = codificar(json.dumps(dados, separators=(",", ":")).encode("utf-8"))
+    return f"{conteudo}.{assinar(conteudo)}"
+
+# Função para validar um token e devolver os dados dele (None se a assinatura não confere ou se expirou)
+def ler_token(token, agora=None):
+    try:
+        conteudo, assinatura = token.split(".")
+        if not hmac.compare_digest(assinatura, assinar(conteudo)):
+            return None
+        dados = json.loads(decodificar(conteudo))
+    except Exception:
+        return None
+
+    if dados["exp"] < (agora or time.time()):
+        return None
+    return dados
+
+# Função para separar as listas de empresas e permissões gravadas como texto na tabela users
+def separar_lista(texto):
+    return texto.split(",") if texto else []
+
+# Função para buscar os ids das empresas e as permissões atuais de um usuário (None se ele não existe mais)
+def buscar_acessos(supabase, username):
+    response = supabase.table("users").select("permissoes").eq("username", username).execute()
+    erro = erro_da_resposta(response)
+    if erro:
+        raise Exception(erro)
+    if not response.data:
+        return None
+    return empresas_do_usuario(supabase, username), separar_lista(response.data[0]["permissoes"])
+
+# Função para reemitir o token com os acessos atuais do usuário (None se ele não existe mais)
+def renovar_token(supabase, username):
+    acessos = buscar_acessos(supabase, username)
+    if acessos is None:
+        return None
+    return emitir_token(username, *acessos)
+
+# Função para marcar que os acessos de um usuário mudaram (chamar depois de salvar ou remover)
+def marcar_usuario_alterado(username):
+    with trava_sessao:
+        usuarios_alterados[username] = time.time()
+
+# Função para saber se os dados de um token precisam ser relidos do banco
+def precisa_renovar(dados, agora=None):
+    agora = agora or time.time()
+    with trava_sessao:
+        alterado_em = usuarios_alterados.get(dados["u"], 0)
+    return alterado_em >= dados["iat"] or agora - dados["iat"] > INTERVALO_RENOVACAO
+
+# Função para copiar os dados do token para o estado da sessão usado pelas páginas
+# empresa_ids (conjunto) é usado nas verificações de escopo; empresas (nomes) só nas telas.
+# Os nomes são montados pelo catálogo só quando o token muda.
+def aplicar_dados(supabase, dados):
+    st.session_state.logged_in = True
+    st.session_state.username = dados["u"]
+    st.session_state.permissoes = dados["p"]
+    if st.session_state.get("empresas_do_token") != dados["e"]:
+        st.session_state.empresa_ids = frozenset(dados["e"])
+        st.session_state.empresas = nomes_das_empresas(supabase, dados["e"])
+        st.session_state.empresas_do_token = dados["e"]
+
+# Função para abrir a sessão depois do login
+def iniciar_sessao(supabase, username, empresa_ids, permissoes):
+    st.session_state.token_sessao = emitir_token(username, empresa_ids, permissoes)
+    st.session_state.pop("renovacao_sessao", None)
+    aplicar_dados(supabase, ler_token(st.session_state.token_sessao))
+
+# Função para encerrar a sessão
+def encerrar_sessao():
+    for chave in ["token_sessao", "renovacao_sessao", "username", "empresas", "empresa_ids", "empresas_do_token", "permissoes"]:
+        st.session_state.pop(chave, None)
+    st.session_state.logged_in = False
+
+# Função para validar a sessão a cada execução da página (retorna se o usuário está logado)
+# A validação só confere a assinatura e a validade do token; a renovação com os acessos do
+# banco roda em segundo plano a cada INTERVALO_RENOVACAO segundos e entra na execução seguinte.
+def validar_sessao(supabase):
+    token = st.session_state.get("token_sessao")
+    dados = ler_token(token) if token else None
+    if dados is None:
+        if token:
+            encerrar_sessao()
+            st.warning("Sua sessão expirou. Entre novamente.")
+        return False
+
+    renovacao = st.session_state.get("renovacao_sessao")
+    if renovacao is not None and renovacao.done():
+        del st.session_state.renovacao_sessao
+        try:
+            novo_token = renovacao.result()
+        except Exception:
+            novo_token = token  # Falha ao consultar o banco: segue com o token atual e tenta depois
+        if novo_token is None:
+            encerrar_sessao()
+            st.warning("Seu usuário não existe mais. Entre novamente.")
+            return False
+        if novo_token != token:
+            st.session_state.token_sessao = novo_token
+            dados = ler_token(novo_token)
+    elif renovacao is None and precisa_renovar(dados):
+        st.session_state.renovacao_sessao = executor_renovacao.submit(renovar_token, supabase, dados["u"])
+
+    aplicar_dados(supabase, dados)
+    return True
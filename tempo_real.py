@@ -0,0 +1,167 @@
+import asyncio
+import os
+import threading
+import time
+import uuid
+from collections import deque
+
+import streamlit as st
+
+from cache import invalidar_cache
+from inicializacao import INTERVALO_NOVA_TENTATIVA
+
+# Modo do tempo real (variável TEMPO_REAL):
+#   "supabase" - assina o Supabase Realtime (postgres_changes em messages e registros)
+#   "local"    - sem Supabase; as gravações feitas neste processo são publicadas direto (para testes)
+#   vazio      - desligado; as páginas só se atualizam quando o usuário interage
+MODO_TEMPO_REAL = os.getenv("TEMPO_REAL", "").lower()
+
+# Tabelas acompanhadas pelo tempo real
+TABELAS_TEMPO_REAL = ["messages", "registros"]
+
+# Intervalo (em segundos) em que as páginas conferem a fila de alterações da sessão
+# Conferir a fila é só olhar a memória do processo; nenhuma consulta vai ao banco.
+INTERVALO_TEMPO_REAL = 2
+
+# Quantidade máxima de alterações guardadas por tabela para cada sessão
+MAXIMO_EVENTOS_FILA = 500
+
+# Tempo (em segundos) sem consumir a fila até a assinatura de uma sessão ser descartada
+TEMPO_INATIVIDADE = 600
+
+# Assinaturas das sessões: id -> {"filas": {tabela: deque}, "visto_em": instante}
+assinantes = {}
+trava_tempo_real = threading.Lock()
+
+# Estado da ligação do tempo real no processo: se está ligado e quando falhou pela última vez
+tempo_real_ligado = False
+falhou_em = None
+trava_inicio = threading.Lock()
+loop_tempo_real = None
+cliente_tempo_real = None
+
+# Função para entregar uma alteração a todas as sessões assinantes
+# Alterações em registros também invalidam o cache de consultas, para a próxima leitura vir atualizada.
+def publicar(tabela, evento, registro=None, antigo=None):
+    if tabela == "registros":
+        invalidar_cache("registros")
+
+    alteracao = {"evento": evento, "registro": registro, "antigo": antigo}
+    with trava_tempo_real:
+        for assinante in assinantes.values():
+            assinante["filas"].setdefault(tabela, deque(maxlen=MAXIMO_EVENTOS_FILA)).append(alteracao)
+
+# Função para publicar uma gravação feita por esta aplicação, no modo local
+# No modo "supabase" não faz nada: a mesma alteração chega pelo Realtime.
+def publicar_local(tabela, evento, registro=None, antigo=None):
+    if MODO_TEMPO_REAL == "local":
+        publicar(tabela, evento, registro, antigo)
+
+# Função para receber uma alteração do Supabase Realtime
+def receber_alteracao(payload):
+    dados = payload["data"]
+    evento = getattr(dados["type"], "value", dados["type"])
+    publicar(dados["table"], evento, dados.get("record"), dados.get("old_record"))
+
+# Função assíncrona para conectar ao Supabase Realtime e assinar as tabelas
+async def conectar_realtime(url, chave_api):
+    global cliente_tempo_real
+    from realtime import AsyncRealtimeClient
+
+    cliente_tempo_real = AsyncRealtimeClient(f"{url.rstrip('/')}/realtime/v1", chave_api)
+    await cliente_tempo_real.connect()
+
+    canal = cliente_tempo_real.channel("alteracoes")
+    for tabela in TABELAS_TEMPO_REAL:
+        canal.on_postgres_changes("*", callback=receber_alteracao, table=tabela, schema="public")
+    await canal.subscribe()
+
+# Função assíncrona para fechar uma conexão ao Realtime que falhou no meio do caminho
+async def desconectar_realtime():
+    global cliente_tempo_real
+    cliente, cliente_tempo_real = cliente_tempo_real, None
+    if cliente is not None:
+        try:
+            await cliente.close()
+        except Exception:
+            pass
+
+# Função para ligar o tempo real uma vez por processo (retorna se está ligado)
+# Se a conexão falhar, a aplicação segue sem tempo real e tenta de novo depois de
+# INTERVALO_NOVA_TENTATIVA segundos (na próxima execução do script depois disso).
+def iniciar_tempo_real(url, chave_api):
+    global tempo_real_ligado, falhou_em, loop_tempo_real
+
+    if MODO_TEMPO_REAL not in ("supabase", "local"):
+        return False
+
+    if tempo_real_ligado:
+        return True
+
+    with trava_inicio:
+        if tempo_real_ligado:
+            return True
+        if falhou_em is not None and time.monotonic() - falhou_em < INTERVALO_NOVA_TENTATIVA:
+            return False
+
+        if MODO_TEMPO_REAL == "supabase":
+            try:
+                if loop_tempo_real is None:
+                    loop_tempo_real = asyncio.new_event_loop()
+                    threading.Thread(target=loop_tempo_real.run_forever, name="tempo-real", daemon=True).start()
+                asyncio.run_coroutine_threadsafe(conectar_realtime(url, chave_api), loop_tempo_real).result()
+            except Exception as e:
+                print(f"❌ Erro ao conectar ao tempo real: {str(e)}")
+                if loop_tempo_real is not None:
+                    asyncio.run_coroutine_threadsafe(desconectar_realtime(), loop_tempo_real).result()
+                falhou_em = time.monotonic()
+                return False
+
+        tempo_real_ligado = True
+        falhou_em = None
+        return True
+
+# Função para criar a assinatura de uma sessão, descartando as abandonadas
+def assinar():
+    assinatura = uuid.uuid4().hex
+    agora = time.monotonic()
+    with trava_tempo_real:
+        for inativa in [chave for chave, assinante in assinantes.items() if agora - assinante["visto_em"] > TEMPO_INATIVIDADE]:
+            del assinantes[inativa]
+        assinantes[assinatura] = {"filas": {}, "visto_em": agora}
+    return assinatura
+
+# Função para retirar as alterações pendentes de uma tabela (None se a assinatura não existe mais)
+def consumir(assinatura, tabela):
+    with trava_tempo_real:
+        assinante = assinantes.get(assinatura)
+        if assinante is None:
+            return None
+        assinante["visto_em"] = time.monotonic()
+        fila = assinante["filas"].get(tabela)
+        if not fila:
+            return []
+        alteracoes = list(fila)
+        fila.clear()
+        return alteracoes
+
+# Função para saber se uma alteração pode afetar as linhas com coluna = valor
+# Alterações sem os dados da linha (ex.: DELETE só com o id) são tratadas como relevantes.
+def alteracao_afeta(alteracao, coluna, valor):
+    linha = alteracao["registro"] or alteracao["antigo"] or {}
+    return linha.get(coluna, valor) == valor
+
+# Função para garantir que a sessão tem uma assinatura (chamar antes de carregar os dados da página)
+def assinar_sessao():
+    if "assinatura_tempo_real" not in st.session_state:
+        st.session_state.assinatura_tempo_real = assinar()
+
+# Função para obter as alterações de uma tabela recebidas desde a última chamada nesta sessão
+def alteracoes_da_sessao(tabela):
+    assinar_sessao()
+    alteracoes = consumir(st.session_state.assinatura_tempo_real, tabela)
+    if alteracoes is None:
+        # A assinatura expirou por inatividade; as alterações perdidas vêm na próxima consulta
+        st.session_state.assinatura_tempo_real = assinar()
+        return []
+    return alteracoes
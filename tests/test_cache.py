@@ -0,0 +1,74 @@
+# Testes do cache de leituras (cache.em_cache) com as funções de leitura de registros e usuários.
+# Não precisam de banco: o cliente Supabase é trocado por um objeto que só conta as consultas.
+from types import SimpleNamespace
+
+import pytest
+
+from cache import limpar_cache
+from registros import buscar_indicadores, buscar_pagina_registros
+from usuarios import buscar_pagina_usuarios
+
+
+# Cliente falso: qualquer cadeia table(...)/rpc(...).método(...).execute() devolve as linhas informadas
+class ClienteFalso:
+    def __init__(self, dados):
+        self.dados = dados
+        self.consultas = []
+
+    def table(self, nome):
+        self.consultas.append(nome)
+        return ConsultaFalsa(self.dados)
+
+    def rpc(self, nome, parametros):
+        self.consultas.append(nome)
+        return ConsultaFalsa(self.dados)
+
+
+class ConsultaFalsa:
+    def __init__(self, dados):
+        self.dados = dados
+
+    def __getattr__(self, nome):
+        return lambda *args, **kwargs: self
+
+    def execute(self):
+        return SimpleNamespace(data=self.dados, error=None)
+
+
+@pytest.fixture(autouse=True)
+def cache_vazio():
+    limpar_cache()
+    yield
+    limpar_cache()
+
+
+# O Streamlit pode criar outro cliente a cada execução do script; o resultado deve ser reaproveitado
+@pytest.mark.parametrize("ler", [
+    lambda cliente: buscar_pagina_registros(cliente, 7, 25),
+    lambda cliente: buscar_indicadores(cliente, (7, 8)),
+    lambda cliente: buscar_pagina_usuarios(cliente, "ana"),
+], ids=["pagina_registros", "indicadores", "pagina_usuarios"])
+def test_outro_cliente_usa_o_cache(ler):
+    primeiro = ClienteFalso([{"id": 1}])
+    segundo = ClienteFalso([{"id": 2}])
+
+    assert ler(primeiro) == ler(segundo)
+    assert len(primeiro.consultas) == 1
+    assert segundo.consultas == []
+
+
+def test_cliente_por_nome_usa_o_cache():
+    primeiro = ClienteFalso([{"id": 1}])
+    segundo = ClienteFalso([{"id": 2}])
+
+    buscar_pagina_registros(primeiro, 7, 25)
+    buscar_pagina_registros(supabase=segundo, empresa_id=7, tamanho_pagina=25)
+    assert segundo.consultas == []
+
+
+def test_parametros_diferentes_consultam_de_novo():
+    cliente = ClienteFalso([{"id": 1}])
+
+    buscar_pagina_registros(cliente, 7, 25)
+    buscar_pagina_registros(cliente, 8, 25)
+    assert len(cliente.consultas) == 2
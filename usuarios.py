@@ -0,0 +1,43 @@
+from cache import em_cache, invalidar_cache
+from registros import erro_da_resposta
+
+# Quantidade de usuários por página na administração
+TAMANHO_PAGINA_USUARIOS = 20
+
+# Função para buscar uma página de usuários em ordem alfabética (função usuarios_pagina no Postgres)
+# Cada linha traz username, permissoes e total_empresas. Retorna as linhas e se existe próxima página.
+@em_cache("users")
+def buscar_pagina_usuarios(supabase, busca=None, cursor=None, tamanho_pagina=TAMANHO_PAGINA_USUARIOS):
+    response = supabase.rpc("usuarios_pagina", {
+        "p_busca": busca or None,
+        "p_depois": cursor,
+        # Uma linha a mais só para saber se existe próxima página
+        "p_limite": tamanho_pagina + 1
+    }).execute()
+
+    erro = erro_da_resposta(response)
+    if erro:
+        raise Exception(erro)
+
+    linhas = response.data or []
+    return linhas[:tamanho_pagina], len(linhas) > tamanho_pagina
+
+# Função para incluir e remover empresas (ids) e funcionalidades de vários usuários num único comando
+# Os usuários são os de usernames ou, sem usernames, os que batem com a busca (todos, sem busca).
+# Retorna os usernames alterados.
+def alterar_acessos_em_lote(supabase, usernames=None, busca=None, incluir_empresas=(), remover_empresas=(), incluir_permissoes=(), remover_permissoes=()):
+    response = supabase.rpc("alterar_acessos_em_lote", {
+        "p_usernames": list(usernames) if usernames is not None else None,
+        "p_busca": busca or None,
+        "p_incluir_empresas": list(incluir_empresas),
+        "p_remover_empresas": list(remover_empresas),
+        "p_incluir_permissoes": list(incluir_permissoes),
+        "p_remover_permissoes": list(remover_permissoes)
+    }).execute()
+
+    erro = erro_da_resposta(response)
+    if erro:
+        raise Exception(erro)
+
+    invalidar_cache("users")
+    return [linha["username"] for linha in response.data or []]
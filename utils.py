@@ -2,27 +2,28 @@ import streamlit as st
 from supabase import create_client, Client
 import pandas as pd
 import plotly.express as px
-from datetime import datetime
-import os
-from io import BytesIO
-from PIL import Image
-import hashlib
+from datetime import datetime, timedelta
+from armazenamento import enviar_uploads, exibir_arquivo, exibir_arquivo_sob_demanda
+from cache import em_cache, invalidar_cache, nao_guardar_resultado
+from empresas import filtro_empresas, id_da_empresa, ids_das_empresas
+from esquema import tabela_existe
+from exportacao import exibir_exportacao
+from registros import agregar_registros, buscar_indicadores, inserir_registros_em_lote
+
+# Função para criar o cliente Supabase uma única vez por processo (reaproveitado entre as execuções do script)
+@st.cache_resource
+def criar_cliente_supabase(url, key):
+    return create_client(url, key)
 
 # Inicialização do cliente Supabase
-supabase: Client = create_client(
+supabase: Client = criar_cliente_supabase(
     st.secrets["supabase_url"],
     st.secrets["supabase_key"]
 )
 
-# Função para verificar se uma tabela existe no Supabase
+# Função para verificar se uma tabela existe no Supabase (consultado uma vez por processo)
 def check_table_exists(table_name):
-    try:
-        response = supabase.table(table_name).select("*").limit(1).execute()
-        return True
-    except Exception as e:
-        if "relation" in str(e) and "does not exist" in str(e):
-            return False
-        raise e
+    return tabela_existe(supabase, table_name)
 
 # Função para criar tabelas se não existirem
 def create_tables_if_not_exist():
@@ -87,60 +88,44 @@ def create_tables_if_not_exist():
         return False
 
 # Função para processar upload de arquivos
-def process_upload(arquivo, empresa):
+# Retorna o caminho do arquivo no bucket (arquivos/sha256/<digest>/<nome>), ou None se não houver
+# arquivo ou o envio falhar. Se o mesmo conteúdo já estiver no Storage, nada é enviado.
+def process_upload(arquivo):
     try:
         if not arquivo:
-            return True
+            return None
             
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        nome_arquivo = f"{timestamp}_{arquivo.name}"
-        arquivo_path = f"arquivos/{empresa}/{nome_arquivo}"
-        
-        # Criar diretório temporário
-        temp_dir = os.path.join(os.getcwd(), "temp_uploads")
-        os.makedirs(temp_dir, exist_ok=True)
-        
-        # Salvar arquivo temporariamente
-        temp_path = os.path.join(temp_dir, nome_arquivo)
-        with open(temp_path, "wb") as f:
-            f.write(arquivo.getvalue())
-        
-        # Verificar se o bucket existe
-        try:
-            supabase.storage.from_("arquivos").list()
-        except Exception:
-            # Criar o bucket se não existir
-            supabase.storage.create_bucket("arquivos")
+        # Upload do arquivo para o Supabase Storage; arquivos grandes vão em blocos
+        # e uma nova tentativa com o mesmo arquivo continua de onde o envio parou
+        _, arquivo_path, erro_upload = enviar_uploads(
+            st.secrets["supabase_url"],
+            st.secrets["supabase_key"],
+            [arquivo]
+        )[0]
         
-        # Upload do arquivo para o Supabase Storage
-        response = supabase.storage.from_("arquivos").upload(
-            arquivo_path,
-            arquivo.getvalue(),
-            {"content-type": arquivo.type}
-        )
-        
-        if response.error:
-            st.error(f"❌ Erro ao salvar arquivo: {response.error.message}")
-            return False
+        if erro_upload:
+            st.error(f"❌ Erro ao salvar arquivo: {erro_upload}")
+            return None
             
-        return True
+        return arquivo_path
     except Exception as e:
         st.error(f"❌ Erro ao processar upload: {str(e)}")
-        return False
-    finally:
-        # Limpar arquivo temporário
-        if os.path.exists(temp_path):
-            os.remove(temp_path)
+        return None
 
 # Função para salvar registro
-def save_record(empresa, tipo_nota, erro, arquivo):
+# arquivo_path é o caminho devolvido por process_upload; sem ele, o arquivo é enviado aqui.
+def save_record(empresa, tipo_nota, erro, arquivo, arquivo_path=None):
     try:
         data_atual = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        arquivo_path = f"arquivos/{empresa}/{datetime.now().strftime('%Y%m%d_%H%M%S')}_{arquivo.name}" if arquivo else None
+        if arquivo and not arquivo_path:
+            arquivo_path = process_upload(arquivo)
+            if not arquivo_path:
+                return False
         
         registro_data = {
             "data": data_atual,
             "empresa": empresa,
+            "empresa_id": id_da_empresa(supabase, empresa),
             "tipo_nota": tipo_nota,
             "erro": erro,
             "arquivo_erro": arquivo_path if erro else None,
@@ -155,16 +140,30 @@ def save_record(empresa, tipo_nota, erro, arquivo):
         if not response or (hasattr(response, 'error') and response.error):
             st.error(f"❌ Erro ao salvar registro: {response.error.message if hasattr(response, 'error') else 'Erro desconhecido'}")
             return False
-            
+        
+        invalidar_cache("registros")
         return True
     except Exception as e:
         st.error(f"❌ Erro ao salvar registro: {str(e)}")
         return False
 
+# Função para salvar vários registros de uma vez, em inserts de várias linhas
+# Os registros devem vir de montar_registro com o empresa_id preenchido.
+def save_records(registros):
+    try:
+        inseridos, falhas = inserir_registros_em_lote(supabase, registros, st.session_state.empresa_ids)
+        for indice, motivo in falhas:
+            st.error(f"❌ Erro ao salvar registro {indice + 1}: {motivo}")
+        return inseridos, falhas
+    except Exception as e:
+        st.error(f"❌ Erro ao salvar registros: {str(e)}")
+        return 0, [(indice, str(e)) for indice in range(len(registros))]
+
 # Função para buscar registros
+@em_cache("registros")
 def get_registros(empresa, data_inicio=None, data_fim=None):
     try:
-        query = supabase.table("registros").select("*").eq("empresa", empresa)
+        query = supabase.table("registros").select("*").eq("empresa_id", id_da_empresa(supabase, empresa))
         
         if data_inicio and data_fim:
             query = query.gte("data", data_inicio.strftime("%Y-%m-%d")).lte("data", data_fim.strftime("%Y-%m-%d"))
@@ -173,14 +172,17 @@ def get_registros(empresa, data_inicio=None, data_fim=None):
         
         if not response or (hasattr(response, 'error') and response.error):
             st.error(f"❌ Erro ao buscar registros: {response.error.message if hasattr(response, 'error') else 'Erro desconhecido'}")
+            nao_guardar_resultado()
             return pd.DataFrame()
             
         return pd.DataFrame(response.data)
     except Exception as e:
         st.error(f"❌ Erro ao buscar registros: {str(e)}")
+        nao_guardar_resultado()
         return pd.DataFrame()
 
 # Função para buscar registros por período
+@em_cache("registros")
 def get_registros_periodo(data_inicio, data_fim):
     try:
         query = supabase.table("registros").select("*")
@@ -192,13 +194,24 @@ def get_registros_periodo(data_inicio, data_fim):
         
         if not response or (hasattr(response, 'error') and response.error):
             st.error(f"❌ Erro ao buscar registros: {response.error.message if hasattr(response, 'error') else 'Erro desconhecido'}")
+            nao_guardar_resultado()
             return pd.DataFrame()
             
         return pd.DataFrame(response.data)
     except Exception as e:
         st.error(f"❌ Erro ao buscar registros: {str(e)}")
+        nao_guardar_resultado()
         return pd.DataFrame()
 
+# Função para buscar os indicadores agregados no Postgres (período com data_fim incluída)
+def get_indicadores(empresas, data_inicio=None, data_fim=None):
+    try:
+        empresa_ids = filtro_empresas(supabase, ids_das_empresas(supabase, empresas))
+        return buscar_indicadores(supabase, empresa_ids, data_inicio, data_fim + timedelta(days=1) if data_fim else None)
+    except Exception as e:
+        st.error(f"❌ Erro ao buscar indicadores: {str(e)}")
+        return agregar_registros(pd.DataFrame())
+
 # Função para exibir registros
 def display_registros(registros):
     for index, row in registros.iterrows():
@@ -207,11 +220,11 @@ def display_registros(registros):
             st.write(f"**Erro:** {row['erro']}" if row['erro'] else "**Sem erro registrado.**")
             st.write(f"**Usuário:** {row['usuario']}")
 
-            # Exibir arquivos
+            # Exibir arquivos (baixados só quando o usuário pedir)
             if row['arquivo_erro']:
-                display_arquivo(row['arquivo_erro'], "Arquivo de Erro")
-            if row['arquivo']:
-                display_arquivo(row['arquivo'], "Arquivo Principal")
+                exibir_arquivo_sob_demanda(supabase, row['arquivo_erro'], "Arquivo de Erro", f"erro_{row['id']}")
+            if row['arquivo'] and row['arquivo'] != row['arquivo_erro']:
+                exibir_arquivo_sob_demanda(supabase, row['arquivo'], "Arquivo Principal", f"principal_{row['id']}")
 
             # Ações
             if row['status'] == "Pendente":
@@ -220,56 +233,7 @@ def display_registros(registros):
 
 # Função para exibir arquivo
 def display_arquivo(arquivo_path, titulo):
-    try:
-        response = supabase.storage.from_("arquivos").download(arquivo_path)
-        if response:
-            # Verificar extensão do arquivo
-            extensao = os.path.splitext(arquivo_path)[1].lower()
-            
-            # Imagens
-            if extensao in ['.png', '.jpg', '.jpeg', '.gif', '.bmp', '.webp']:
-                image = Image.open(BytesIO(response))
-                st.image(image, caption=titulo, use_container_width=True)
-            
-            # PDFs
-            elif extensao == '.pdf':
-                st.download_button(
-                    f"📄 Baixar PDF - {titulo}",
-                    response,
-                    os.path.basename(arquivo_path),
-                    "application/pdf"
-                )
-            
-            # Planilhas
-            elif extensao in ['.xlsx', '.xls', '.csv']:
-                st.download_button(
-                    f"📊 Baixar Planilha - {titulo}",
-                    response,
-                    os.path.basename(arquivo_path),
-                    "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
-                )
-            
-            # XML
-            elif extensao == '.xml':
-                st.download_button(
-                    f"📋 Baixar XML - {titulo}",
-                    response,
-                    os.path.basename(arquivo_path),
-                    "application/xml"
-                )
-            
-            # Outros tipos de arquivo
-            else:
-                st.download_button(
-                    f"📎 Baixar {titulo}",
-                    response,
-                    os.path.basename(arquivo_path),
-                    "application/octet-stream"
-                )
-        else:
-            st.warning(f"{titulo} não encontrado no armazenamento.")
-    except Exception as e:
-        st.error(f"❌ Erro ao carregar arquivo: {str(e)}")
+    exibir_arquivo(supabase, arquivo_path, titulo)
 
 # Função para atualizar status
 def update_status(registro_id, novo_status):
@@ -278,21 +242,28 @@ def update_status(registro_id, novo_status):
         if not response or (hasattr(response, 'error') and response.error):
             st.error(f"❌ Erro ao atualizar status: {response.error.message if hasattr(response, 'error') else 'Erro desconhecido'}")
         else:
+            invalidar_cache("registros")
             st.success("✅ Status atualizado com sucesso!")
             st.rerun()
     except Exception as e:
         st.error(f"❌ Erro ao atualizar status: {str(e)}")
 
+# Função para obter os indicadores agregados de um DataFrame ou de buscar_indicadores
+def obter_indicadores(registros):
+    return agregar_registros(registros) if isinstance(registros, pd.DataFrame) else registros
+
 # Função para exibir métricas
+# Aceita os registros carregados ou, de preferência, os indicadores já agregados no Postgres.
 def display_metricas(registros):
-    if registros.empty:
+    indicadores = obter_indicadores(registros)
+    if not indicadores["total"]:
         st.warning("Não há dados suficientes para exibir métricas.")
         return
         
     col1, col2, col3, col4 = st.columns(4)
     
     with col1:
-        total_registros = len(registros)
+        total_registros = indicadores["total"]
         st.metric(
             "Total de Registros",
             total_registros,
@@ -300,7 +271,7 @@ def display_metricas(registros):
         )
     
     with col2:
-        registros_erro = len(registros[registros['erro'].notna()])
+        registros_erro = indicadores["com_erro"]
         st.metric(
             "Registros com Erro",
             registros_erro,
@@ -316,7 +287,7 @@ def display_metricas(registros):
         )
     
     with col4:
-        empresas_unicas = registros['empresa'].nunique()
+        empresas_unicas = len(indicadores["por_empresa"])
         st.metric(
             "Empresas Ativas",
             empresas_unicas,
@@ -328,20 +299,20 @@ def display_metricas(registros):
     col5, col6 = st.columns(2)
     
     with col5:
-        tipos_nota = registros['tipo_nota'].value_counts()
         st.write("**Tipos de Nota:**")
-        for tipo, quantidade in tipos_nota.items():
-            st.write(f"- {tipo}: {quantidade}")
+        for item in indicadores["por_tipo_nota"]:
+            st.write(f"- {item['tipo_nota']}: {item['quantidade']}")
     
     with col6:
-        status_count = registros['status'].value_counts()
         st.write("**Status dos Registros:**")
-        for status, quantidade in status_count.items():
-            st.write(f"- {status}: {quantidade}")
+        for item in indicadores["por_status"]:
+            st.write(f"- {item['status']}: {item['quantidade']}")
 
 # Função para exibir gráficos
+# Aceita os registros carregados ou, de preferência, os indicadores já agregados no Postgres.
 def display_graficos(registros):
-    if registros.empty:
+    indicadores = obter_indicadores(registros)
+    if not indicadores["total"]:
         st.warning("Não há dados suficientes para exibir gráficos.")
         return
         
@@ -349,7 +320,7 @@ def display_graficos(registros):
     
     # Gráfico de registros por empresa
     with col1:
-        empresa_count = registros["empresa"].value_counts().reset_index()
+        empresa_count = pd.DataFrame(indicadores["por_empresa"])
         empresa_count.columns = ["Empresa", "Total de Registros"]
         fig1 = px.pie(
             empresa_count,
@@ -363,7 +334,7 @@ def display_graficos(registros):
     
     # Gráfico de tipos de nota
     with col2:
-        tipo_nota_count = registros["tipo_nota"].value_counts().reset_index()
+        tipo_nota_count = pd.DataFrame(indicadores["por_tipo_nota"])
         tipo_nota_count.columns = ["Tipo de Nota", "Quantidade"]
         fig2 = px.pie(
             tipo_nota_count,
@@ -377,7 +348,7 @@ def display_graficos(registros):
     
     # Gráfico de linha temporal
     st.subheader("📈 Registros por Dia")
-    registros_por_dia = registros.groupby(pd.to_datetime(registros['data']).dt.date).size().reset_index()
+    registros_por_dia = pd.DataFrame(indicadores["por_dia"])
     registros_por_dia.columns = ['Data', 'Quantidade']
     fig3 = px.line(
         registros_por_dia,
@@ -394,9 +365,9 @@ def display_graficos(registros):
     st.plotly_chart(fig3, use_container_width=True)
     
     # Gráfico de erros
-    if registros["erro"].notna().sum() > 0:
+    if indicadores["erros_frequentes"]:
         st.subheader("🔴 Erros Mais Comuns")
-        erro_count = registros["erro"].value_counts().reset_index().head(5)
+        erro_count = pd.DataFrame(indicadores["erros_frequentes"])
         erro_count.columns = ["Erro", "Frequência"]
         fig4 = px.pie(
             erro_count,
@@ -417,20 +388,12 @@ def display_tabela(registros):
     st.subheader("📊 Dados Detalhados")
     st.dataframe(registros)
 
-# Função para exportar dados
-def export_data(registros):
+# Função para exportar os registros das empresas informadas (CSV, CSV com gzip ou Parquet)
+# Os registros são lidos em páginas e gravados em disco, sem montar a tabela inteira na memória.
+def export_data(empresas):
     st.subheader("📥 Download de Dados")
-    csv = registros.to_csv(index=False).encode("utf-8")
-    st.download_button(
-        "📥 Baixar Planilha Completa",
-        data=csv,
-        file_name=f"registros_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv",
-        mime="text/csv"
-    )
-
-# Função para hashear senha
-def hash_password(password):
-    return hashlib.sha256(password.encode()).hexdigest() 
+    empresa_ids = filtro_empresas(supabase, ids_das_empresas(supabase, empresas))
+    exibir_exportacao(supabase, st.secrets["supabase_url"], st.secrets["supabase_key"], empresa_ids, "exportacao_dados")
 
 
      